@@ -0,0 +1,232 @@
+# Adaptive assessments over a calibrated item bank (see assessments/irt.py).
+#
+# The bank is filled from past assessments: calibrate_bank() reads the
+# answers of completed assessments, adds every question it has not seen as
+# a BankQuestion (the same question is recognised across assessments by a
+# fingerprint of trade, text, options and answer), and fits the 2PL
+# parameters of the questions of each trade answered at least
+# IRT_MIN_RESPONSES times. Adaptive assessments feed the next calibration
+# like any other.
+#
+# An adaptive assessment starts at the population's mean ability and asks
+# one calibrated question at a time: after each answer the ability
+# estimate is updated and the most informative unused question comes next,
+# until the standard error is at most ADAPTIVE_TARGET_SE (after at least
+# ADAPTIVE_MIN_ITEMS questions) or ADAPTIVE_MAX_ITEMS have been asked.
+# Questions are stored in Assessment.questions with the parameters they
+# had when asked, so a recalibration never changes a running estimate.
+
+import hashlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from craftconnect import metrics
+from craftconnect.cache import invalidate_tags, tiered_cache
+from . import irt
+from .models import OPTIONS, Assessment, BankQuestion
+
+adaptive_items = metrics.registry.histogram(
+    "craftconnect_adaptive_items",
+    "Questions asked per completed adaptive assessment.",
+    buckets=(3, 4, 5, 6, 8, 10, 12, 15, 20, 30),
+)
+
+
+def trade_key(trade):
+    return " ".join(str(trade).split()).lower()
+
+
+def normalize(text):
+    return " ".join(str(text).split()).lower()
+
+
+def is_valid(question):
+    return (
+        isinstance(question, dict)
+        and isinstance(question.get("question"), str)
+        and isinstance(question.get("options"), dict)
+        and set(question["options"]) == set(OPTIONS)
+        and question.get("answer") in OPTIONS
+    )
+
+
+def fingerprint(trade, question):
+    parts = [trade_key(trade), normalize(question["question"])]
+    parts += [normalize(question["options"][option]) for option in OPTIONS]
+    parts.append(question["answer"])
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+# --------------------------------------------------------
+# BANK LOOKUP
+# --------------------------------------------------------
+def load_bank(trade):
+    """(ids, a, b) arrays of the calibrated questions of a trade, cached until the next calibration."""
+    key = trade_key(trade)
+
+    def compute():
+        rows = list(
+            BankQuestion.objects.filter(trade_category=key, calibrated_at__isnull=False, discrimination__isnull=False)
+            .order_by("id")
+            .values_list("id", "discrimination", "difficulty")
+        )
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+        ids, a, b = zip(*rows)
+        return np.array(ids, dtype=np.int64), np.array(a), np.array(b)
+
+    return tiered_cache.get_or_set(
+        "item_bank", key, compute, getattr(settings, "ITEM_BANK_CACHE_TTL", 300), tags=(f"item_bank:{key}",)
+    )
+
+
+def next_question(trade, asked, theta):
+    """The question (as stored in Assessment.questions) to ask at ability theta, or None when none is left."""
+    ids, a, b = load_bank(trade)
+    used = np.isin(ids, [question["bank_id"] for question in asked])
+    index = irt.select_item(theta, a, b, used, top=getattr(settings, "ADAPTIVE_TOP_K", 3))
+    if index is None:
+        return None
+    row = BankQuestion.objects.filter(pk=int(ids[index])).values("id", "question", "options", "answer").first()
+    if row is None:  # Deleted since the bank was cached
+        return None
+    return {
+        "bank_id": row["id"],
+        "question": row["question"],
+        "options": row["options"],
+        "answer": row["answer"],
+        "discrimination": float(a[index]),
+        "difficulty": float(b[index]),
+    }
+
+
+def public_question(question):
+    """What the artisan sees of a question: no answer, no parameters."""
+    return {"id": question["bank_id"], "question": question["question"], "options": question["options"]}
+
+
+# --------------------------------------------------------
+# SESSION
+# --------------------------------------------------------
+def update_ability(assessment):
+    """Re-estimate the ability of an adaptive assessment from its answers; True when it should stop."""
+    asked = assessment.questions[:len(assessment.answers)]
+    theta, se = irt.estimate_ability(
+        [question["discrimination"] for question in asked],
+        [question["difficulty"] for question in asked],
+        [answer == question["answer"] for question, answer in zip(asked, assessment.answers)],
+    )
+    assessment.ability, assessment.ability_se = theta, se
+    answered = len(assessment.answers)
+    return answered >= getattr(settings, "ADAPTIVE_MAX_ITEMS", 12) or (
+        answered >= getattr(settings, "ADAPTIVE_MIN_ITEMS", 3) and se <= getattr(settings, "ADAPTIVE_TARGET_SE", 0.4)
+    )
+
+
+def complete(assessment):
+    assessment.score = irt.ability_score(assessment.ability)
+    assessment.status = "completed"
+    adaptive_items.observe(len(assessment.answers))
+
+
+# --------------------------------------------------------
+# CALIBRATION
+# --------------------------------------------------------
+def collect_responses(trade=None):
+    """
+    Responses in completed assessments, per trade key: the questions seen
+    (fingerprint -> question) and parallel person / item / correct lists.
+    """
+    assessments = Assessment.objects.filter(status="completed", answers__isnull=False).order_by("id")
+    if trade:
+        assessments = assessments.filter(trade_category__iexact=trade.strip())
+
+    trades = {}
+    rows = assessments.values_list("trade_category", "questions", "answers")
+    for trade_category, questions, answers in rows.iterator(chunk_size=getattr(settings, "EXPORT_CHUNK_SIZE", 2000)):
+        if not isinstance(questions, list) or not isinstance(answers, list):
+            continue
+        data = trades.setdefault(trade_key(trade_category), {
+            "questions": {}, "index": {}, "assessments": 0, "person": [], "item": [], "correct": [],
+        })
+        answered = False
+        for question, answer in zip(questions, answers):
+            if not is_valid(question):
+                continue
+            key = fingerprint(trade_category, question)
+            if key not in data["index"]:
+                data["index"][key] = len(data["index"])
+                data["questions"][key] = question
+            data["person"].append(data["assessments"])
+            data["item"].append(data["index"][key])
+            data["correct"].append(answer == question["answer"])
+            answered = True
+        data["assessments"] += answered
+    return trades
+
+
+def calibrate_bank(trade=None, min_responses=None, dry_run=False):
+    """Collect and calibrate the bank of one trade (or all); a summary dict per trade."""
+    if min_responses is None:
+        min_responses = getattr(settings, "IRT_MIN_RESPONSES", 30)
+    summaries = []
+    for key, data in sorted(collect_responses(trade).items()):
+        person = np.array(data["person"], dtype=np.int64)
+        item = np.array(data["item"], dtype=np.int64)
+        correct = np.array(data["correct"], dtype=bool)
+        counts = np.bincount(item, minlength=len(data["index"]))
+        keep = counts >= min_responses
+
+        a = b = None
+        if keep.sum() >= 2:
+            # Only responses to questions with enough of them; renumber those questions 0..n-1
+            mask = keep[item]
+            renumber = np.cumsum(keep) - 1
+            a, b = irt.calibrate(person[mask], renumber[item[mask]], correct[mask])
+        else:
+            keep[:] = False
+
+        summaries.append({
+            "trade": key,
+            "assessments": data["assessments"],
+            "responses": len(item),
+            "questions": len(data["index"]),
+            "calibrated": int(keep.sum()),
+        })
+        if not dry_run:
+            save_bank(key, data["questions"], counts, keep, a, b)
+    return summaries
+
+
+def save_bank(trade, questions, counts, keep, a, b):
+    fingerprints = list(questions)
+    with transaction.atomic():
+        BankQuestion.objects.bulk_create(
+            [
+                BankQuestion(
+                    trade_category=trade, fingerprint=key, question=question["question"],
+                    options={option: question["options"][option] for option in OPTIONS}, answer=question["answer"],
+                )
+                for key, question in questions.items()
+            ],
+            batch_size=500, ignore_conflicts=True,
+        )
+        rows = BankQuestion.objects.in_bulk(fingerprints, field_name="fingerprint")
+        now = timezone.now()
+        position = np.cumsum(keep) - 1
+        for index, key in enumerate(fingerprints):
+            row = rows[key]
+            row.responses = int(counts[index])
+            if keep[index]:
+                row.discrimination = float(a[position[index]])
+                row.difficulty = float(b[position[index]])
+                row.calibrated_at = now
+            else:
+                row.discrimination = row.difficulty = row.calibrated_at = None
+        BankQuestion.objects.bulk_update(
+            rows.values(), ["responses", "discrimination", "difficulty", "calibrated_at"], batch_size=500
+        )
+        invalidate_tags(f"item_bank:{trade}")
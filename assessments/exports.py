@@ -0,0 +1,30 @@
+# Columns and rows of the assessment export (see craftconnect/exports.py).
+
+from .models import Assessment
+
+ASSESSMENT_COLUMNS = [
+    ("id", "id"),
+    ("artisan_id", "artisan_id"),
+    ("artisan_email", "artisan__email_address"),
+    ("trade_category", "trade_category"),
+    ("status", "status"),
+    ("score", "score"),
+    ("mode", "mode"),
+    ("ability", "ability"),
+    ("questions", "questions"),
+    ("answers", "answers"),
+    ("ai_feedback", "ai_feedback"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+]
+
+
+def assessment_export(since=None, until=None, trade=None):
+    assessments = Assessment.objects.order_by("id")
+    if since:
+        assessments = assessments.filter(created_at__gte=since)
+    if until:
+        assessments = assessments.filter(created_at__lt=until)
+    if trade:
+        assessments = assessments.filter(trade_category__iexact=trade)
+    return [assessments]
@@ -1,29 +1,48 @@
 # groq_client.py
+import time
+
 import requests
 from django.conf import settings
 
+from craftconnect import fastjson, metrics
+
 GROQ_API_KEY = settings.GROQ_API_KEY
 GROQ_MODEL = "llama-3.1-8b-instant"
-BASE_URL = "https://api.groq.com/openai/v1/chat/completions"
+BASE_URL = settings.GROQ_BASE_URL
 
 def groq_generate(prompt):
     """Send a prompt to Groq API and return text output."""
-    response = requests.post(
-        BASE_URL,
-        headers={
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        },
-        json={
-            "model": GROQ_MODEL,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.4
-        }
-    )
+    started = time.perf_counter()
+    try:
+        response = requests.post(
+            BASE_URL,
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": GROQ_MODEL,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.4
+            }
+        )
+    except requests.RequestException as e:
+        metrics.llm_duration.observe(time.perf_counter() - started, model=GROQ_MODEL, outcome="error")
+        metrics.llm_errors.inc(model=GROQ_MODEL, reason=type(e).__name__)
+        raise
+
+    elapsed = time.perf_counter() - started
 
     if response.status_code != 200:
+        metrics.llm_duration.observe(elapsed, model=GROQ_MODEL, outcome="error")
+        metrics.llm_errors.inc(model=GROQ_MODEL, reason=f"http_{response.status_code}")
         raise Exception(f"Groq Error: {response.text}")
 
-    return response.json()["choices"][0]["message"]["content"]
-
+    data = fastjson.loads(response.content)
+    metrics.llm_duration.observe(elapsed, model=GROQ_MODEL, outcome="ok")
+    usage = data.get("usage") or {}
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage.get(kind):
+            metrics.llm_tokens.inc(usage[kind], model=GROQ_MODEL, kind=kind.replace("_tokens", ""))
 
+    return data["choices"][0]["message"]["content"]
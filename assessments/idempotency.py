@@ -0,0 +1,163 @@
+# Idempotency-Key support for POST views that are expensive to repeat.
+#
+# The first request with a given key (per user and view) claims it by
+# inserting an IdempotencyKey row, runs the view and stores a 2xx response
+# in the row. Retries with the same key get that response back (with an
+# Idempotent-Replayed header) instead of running the view again; retries
+# that arrive while the first request is still running wait for it, up to
+# IDEMPOTENCY_WAIT seconds, then get a 409. Error responses are not stored,
+# so a retry after one runs the view again. A key sent with a different
+# body is refused with 422. Rows expire after IDEMPOTENCY_TTL seconds
+# (`manage.py purge_idempotency_keys` deletes them).
+#
+# A claim is a lease: a request that is still running after
+# IDEMPOTENCY_LEASE seconds (its worker died or was killed mid-request) is
+# presumed dead, and the next retry of the same request takes the key over
+# and runs the view. Anonymous callers are told apart by client IP.
+
+import datetime
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from craftconnect import metrics
+from craftconnect.ratelimit import client_ip
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+POLL_INTERVAL = 0.1
+
+idempotency_requests = metrics.registry.counter(
+    "craftconnect_idempotency_requests_total",
+    "Requests sent with an Idempotency-Key, by view and result (first, replayed, "
+    "in_progress: gave up waiting for the first request, mismatch: key reused with another body, "
+    "taken_over: the first request's lease ran out).",
+    ("view", "result"),
+)
+
+
+def request_hash(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def lease_expiry(now):
+    return now + datetime.timedelta(seconds=getattr(settings, "IDEMPOTENCY_LEASE", 120))
+
+
+def lease_expired(record, now):
+    return record.status_code is None and (record.locked_until is None or record.locked_until <= now)
+
+
+def claim(key, owner, route, digest):
+    """
+    (record, "first") if this request claimed the key, (record, "taken_over")
+    if it took over the expired lease of an unfinished request with the
+    same body, (existing record, None) otherwise.
+    """
+    while True:
+        now = timezone.now()
+        # Retries are the common case for a key that exists: one lookup
+        existing = IdempotencyKey.objects.filter(key=key, owner=owner, route=route).first()
+        if existing is not None and existing.expires_at > now:
+            if existing.request_hash != digest or not lease_expired(existing, now):
+                return existing, None
+            locked_until = lease_expiry(now)
+            taken = IdempotencyKey.objects.filter(
+                Q(locked_until__isnull=True) | Q(locked_until__lte=now), pk=existing.pk, status_code__isnull=True,
+            ).update(locked_until=locked_until)
+            if taken:
+                existing.locked_until = locked_until
+                return existing, "taken_over"
+            continue  # A concurrent retry took it over first
+        if existing is not None:
+            IdempotencyKey.objects.filter(pk=existing.pk, expires_at__lte=now).delete()
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(
+                    key=key, owner=owner, route=route, request_hash=digest, locked_until=lease_expiry(now),
+                    expires_at=now + datetime.timedelta(seconds=getattr(settings, "IDEMPOTENCY_TTL", 86400)),
+                ), "first"
+        except IntegrityError:
+            continue  # A concurrent duplicate claimed it first
+
+
+def wait_for(record):
+    """
+    The record once its response is stored, None if it was released, or
+    the pending record on timeout or once its lease has expired.
+    """
+    deadline = time.monotonic() + getattr(settings, "IDEMPOTENCY_WAIT", 30.0)
+    while record.status_code is None and time.monotonic() < deadline and not lease_expired(record, timezone.now()):
+        time.sleep(POLL_INTERVAL)
+        record = IdempotencyKey.objects.filter(pk=record.pk).first()
+        if record is None:
+            return None
+    return record
+
+
+def idempotent(view):
+    """
+    Replay the first response of requests carrying an Idempotency-Key
+    header. Goes under @api_view, above @rate_limit so replays are free.
+    """
+    route = view.__name__
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({"error": f"{HEADER} must be at most 255 characters."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.user and request.user.is_authenticated:
+            owner = str(request.user.pk)
+        else:
+            owner = f"ip:{client_ip(request)}"
+        digest = request_hash(request)
+        while True:
+            record, result = claim(key, owner, route, digest)
+            if result:
+                break
+            if record.request_hash != digest:
+                idempotency_requests.inc(view=route, result="mismatch")
+                return Response(
+                    {"error": f"{HEADER} was already used with a different request."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            record = wait_for(record)
+            if record is None or lease_expired(record, timezone.now()):
+                continue
+            if record.status_code is None:
+                idempotency_requests.inc(view=route, result="in_progress")
+                return Response(
+                    {"error": f"A request with this {HEADER} is still in progress."},
+                    status=status.HTTP_409_CONFLICT, headers={"Retry-After": "1"},
+                )
+            idempotency_requests.inc(view=route, result="replayed")
+            return Response(record.response, status=record.status_code, headers={"Idempotent-Replayed": "true"})
+
+        idempotency_requests.inc(view=route, result=result)
+        # Only while this request still holds the lease: a retry may have taken it over
+        held = IdempotencyKey.objects.filter(pk=record.pk, locked_until=record.locked_until)
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            held.delete()
+            raise
+        if 200 <= response.status_code < 300:
+            held.update(status_code=response.status_code, response=response.data)
+        else:
+            held.delete()
+        return response
+
+    return wrapper
@@ -0,0 +1,141 @@
+# Two-parameter logistic (2PL) item response model for adaptive assessments.
+#
+# An artisan of ability theta answers an item of discrimination a and
+# difficulty b correctly with probability 1 / (1 + exp(-a (theta - b))).
+# Abilities are on the scale of the calibration population: standard
+# normal, so 0 is a typical artisan of the trade and ability_score() maps
+# theta to the share of that population below it, 0-100.
+#
+# Everything is evaluated on a fixed grid of abilities (QUADRATURE), in
+# NumPy arrays over all items / responses at once:
+# - estimate_ability(ies): expected a posteriori (EAP) ability and its
+#   standard error from the items answered so far, of one or many artisans.
+# - select_item: the unused item with the most Fisher information at the
+#   current estimate (randomly among the top few, so the first items of a
+#   test are not always the same).
+# - calibrate: marginal maximum likelihood (EM over the grid) of a and b
+#   for every item from historical responses, with weak priors so items
+#   answered by few or very similar artisans stay finite.
+
+import math
+import random
+
+import numpy as np
+
+QUADRATURE = np.linspace(-4.0, 4.0, 41)
+LOG_PRIOR = -QUADRATURE ** 2 / 2  # standard normal, up to a constant
+
+# Priors of the calibration: log a ~ N(0, 0.5²), b ~ N(0, 2²)
+LOG_A_SD = 0.5
+B_SD = 2.0
+NEWTON_STEPS = 5
+
+
+def probability(theta, a, b):
+    """P(correct); broadcasts over theta and the item parameters."""
+    return 1.0 / (1.0 + np.exp(-a * (theta - b)))
+
+
+def information(theta, a, b):
+    p = probability(theta, a, b)
+    return a ** 2 * p * (1.0 - p)
+
+
+def estimate_ability(a, b, correct):
+    """(theta, standard error) after answering items a, b (arrays); correct: bools."""
+    a, b, correct = (np.asarray(values, float)[None, :] for values in (a, b, correct))
+    theta, se = estimate_abilities(a, b, correct.astype(bool), np.ones_like(a, bool))
+    return float(theta[0]), float(se[0])
+
+
+def estimate_abilities(a, b, correct, answered):
+    """
+    EAP abilities and standard errors of many artisans at once: (artisans,
+    items) arrays of item parameters and correctness, `answered` masking
+    the padding of artisans who answered fewer items.
+    """
+    p = probability(QUADRATURE, a[..., None], b[..., None])  # (artisans, items, grid)
+    loglik = np.where(correct[..., None], np.log(p), np.log1p(-p))
+    loglik = np.where(answered[..., None], loglik, 0.0).sum(axis=1) + LOG_PRIOR
+    weights = np.exp(loglik - loglik.max(axis=1, keepdims=True))
+    weights /= weights.sum(axis=1, keepdims=True)
+    theta = weights @ QUADRATURE
+    se = np.sqrt((weights * (QUADRATURE - theta[:, None]) ** 2).sum(axis=1))
+    return theta, se
+
+
+def select_item(theta, a, b, used, top=1):
+    """Index of the next item among a, b (arrays) not in `used` (bool mask), or None."""
+    info = np.where(used, -np.inf, information(theta, a, b))
+    available = int(np.isfinite(info).sum())
+    if not available:
+        return None
+    top = min(top, available)
+    best = np.argpartition(-info, top - 1)[:top]
+    return int(random.choice(best))
+
+
+def ability_score(theta):
+    """Percentage of the calibration population below theta (0-100)."""
+    return round(50 * (1 + math.erf(theta / math.sqrt(2))), 1)
+
+
+def calibrate(person, item, correct, iterations=200, tolerance=1e-4):
+    """
+    2PL parameters (a, b arrays) of items 0..J-1 from responses: parallel
+    arrays of person index (sorted, so each person's responses are
+    adjacent), item index and correctness. Every item needs a response.
+    """
+    person = np.asarray(person)
+    item = np.asarray(item)
+    correct = np.asarray(correct, bool)
+    n_items = int(item.max()) + 1
+
+    # Row groups per person, and per item in item order, for np.add.reduceat
+    person_starts = np.flatnonzero(np.r_[True, person[1:] != person[:-1]])
+    person_rows = np.repeat(np.arange(len(person_starts)), np.diff(np.r_[person_starts, len(person)]))
+    order = np.argsort(item, kind="stable")
+    item_starts = np.flatnonzero(np.r_[True, np.diff(item[order]) != 0])
+
+    # Start from a = 1 and the difficulty matching each item's share of correct answers
+    share = np.bincount(item, weights=correct, minlength=n_items) / np.bincount(item, minlength=n_items)
+    share = share.clip(0.02, 0.98)
+    a = np.ones(n_items)
+    b = -np.log(share / (1 - share))
+
+    previous = -np.inf
+    for _ in range(iterations):
+        # E step: posterior of each person over the grid, then the expected
+        # number of attempts (n) and correct answers (r) per item and grid point
+        p = probability(QUADRATURE[None, :], a[:, None], b[:, None])  # (items, grid)
+        contributions = np.where(correct[:, None], np.log(p)[item], np.log1p(-p)[item])
+        loglik = np.add.reduceat(contributions, person_starts, axis=0) + LOG_PRIOR
+        peak = loglik.max(axis=1, keepdims=True)
+        posterior = np.exp(loglik - peak)
+        total = posterior.sum(axis=1, keepdims=True)
+        posterior /= total
+        marginal = float((peak + np.log(total)).sum())
+
+        weights = posterior[person_rows][order]
+        n = np.add.reduceat(weights, item_starts, axis=0)
+        r = np.add.reduceat(weights * correct[order, None], item_starts, axis=0)
+
+        # M step: Fisher scoring of (a, b) for all items at once
+        for _ in range(NEWTON_STEPS):
+            d = QUADRATURE[None, :] - b[:, None]
+            p = probability(d, a[:, None], 0.0)
+            residual = r - n * p
+            w = n * p * (1 - p)
+            grad_a = (residual * d).sum(axis=1) - (np.log(a) / LOG_A_SD ** 2 + 1) / a
+            grad_b = -a * residual.sum(axis=1) - b / B_SD ** 2
+            info_aa = (w * d ** 2).sum(axis=1) + 1 / (LOG_A_SD * a) ** 2
+            info_bb = a ** 2 * w.sum(axis=1) + 1 / B_SD ** 2
+            info_ab = -a * (w * d).sum(axis=1)
+            det = info_aa * info_bb - info_ab ** 2
+            a = np.clip(a + (info_bb * grad_a - info_ab * grad_b) / det, 0.1, 5.0)
+            b = np.clip(b + (info_aa * grad_b - info_ab * grad_a) / det, -5.0, 5.0)
+
+        if abs(marginal - previous) <= tolerance * abs(marginal):
+            break
+        previous = marginal
+    return a, b
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from assessments.adaptive import calibrate_bank
+
+
+class Command(BaseCommand):
+    help = (
+        "Add the questions of completed assessments to the adaptive item bank and fit "
+        "their 2PL difficulty/discrimination from the recorded answers. Questions with "
+        "fewer than --min-responses answers are kept but not used by adaptive assessments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--trade", help="Only this trade category.")
+        parser.add_argument("--min-responses", type=int, default=None,
+                            help="Answers a question needs to be calibrated (default: IRT_MIN_RESPONSES).")
+        parser.add_argument("--dry-run", action="store_true", help="Fit and report without saving.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        summaries = calibrate_bank(options["trade"], options["min_responses"], options["dry_run"])
+        for summary in summaries:
+            self.stdout.write(
+                "{trade}: {calibrated}/{questions} questions calibrated from {responses} answers "
+                "in {assessments} assessments".format(**summary)
+            )
+        verb = "Would calibrate" if options["dry_run"] else "Calibrated"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(summaries)} trades in {time.perf_counter() - started:.2f}s."
+        ))
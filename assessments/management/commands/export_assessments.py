@@ -0,0 +1,10 @@
+from assessments.exports import ASSESSMENT_COLUMNS, assessment_export
+from craftconnect.exports import ExportCommand
+
+
+class Command(ExportCommand):
+    help = "Stream assessments (with questions, answers and AI feedback) as CSV or JSON Lines."
+    columns = ASSESSMENT_COLUMNS
+
+    def querysets(self, since, until, trade):
+        return assessment_export(since, until, trade)
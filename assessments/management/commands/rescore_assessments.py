@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from assessments.rescoring import rescore
+
+
+class Command(BaseCommand):
+    help = (
+        "Correct the answer of one or more questions in every stored assessment and "
+        "rescore the completed ones in bulk. Give the corrections as a JSON file (a list "
+        'of {"question", "answer", "trade_category"?, "previous_answer"?}) or one with '
+        "--question/--answer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corrections", help="JSON file with a list of corrections.")
+        parser.add_argument("--question", help="Text of the question to correct.")
+        parser.add_argument("--answer", help="Its right answer (A-D).")
+        parser.add_argument("--trade", help="Only this question in this trade category.")
+        parser.add_argument("--previous-answer", help="Only where the question has this (wrong) answer.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without saving.")
+        parser.add_argument("--report", help="File to write every score change to (JSON Lines).")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Assessments read and written per transaction.")
+
+    def handle(self, *args, **options):
+        if bool(options["corrections"]) == bool(options["question"]):
+            raise CommandError("Give either --corrections or --question/--answer.")
+        if options["corrections"]:
+            with open(options["corrections"]) as f:
+                corrections = json.load(f)
+        else:
+            corrections = [{
+                "question": options["question"], "answer": options["answer"],
+                "trade_category": options["trade"], "previous_answer": options["previous_answer"],
+            }]
+
+        report_file = open(options["report"], "w") if options["report"] else None
+        try:
+            def write_diffs(diffs):
+                report_file.writelines(json.dumps(diff) + "\n" for diff in diffs)
+
+            report = rescore(
+                corrections, dry_run=options["dry_run"], chunk_size=options["chunk_size"],
+                on_diffs=write_diffs if report_file else None,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if report_file:
+                report_file.close()
+
+        self.stdout.write(json.dumps(report, indent=2))
+        action = "Would change" if options["dry_run"] else "Changed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {report['changed']} scores; {report['matched']} of {report['scanned']} assessments scanned "
+            "had a corrected question."
+        ))
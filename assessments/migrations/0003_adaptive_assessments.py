@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0002_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='ability',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='ability_se',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='mode',
+            field=models.CharField(choices=[('fixed', 'Fixed'), ('adaptive', 'Adaptive')], default='fixed', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='BankQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trade_category', models.CharField(max_length=100)),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('question', models.TextField()),
+                ('options', models.JSONField()),
+                ('answer', models.CharField(max_length=1)),
+                ('discrimination', models.FloatField(blank=True, null=True)),
+                ('difficulty', models.FloatField(blank=True, null=True)),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('calibrated_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trade_category', 'calibrated_at'], name='assess_bank_trade_idx')],
+            },
+        ),
+    ]
@@ -1,12 +1,19 @@
 from django.db import models
+from rest_framework.utils.encoders import JSONEncoder
 from users.models import Artisan
 
+OPTIONS = ("A", "B", "C", "D")  # Answer options of every question
+
 class Assessment(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
     ]
+    MODE_CHOICES = [
+        ('fixed', 'Fixed'),        # 5 generated questions, scored on correct answers
+        ('adaptive', 'Adaptive'),  # bank questions picked one at a time (see assessments/adaptive.py)
+    ]
 
     artisan = models.ForeignKey(
         Artisan,
@@ -19,8 +26,66 @@ class Assessment(models.Model):
     ai_feedback = models.TextField(null=True, blank=True)  # Optional AI comments
     score = models.FloatField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default='fixed')
+    ability = models.FloatField(null=True, blank=True)  # adaptive: estimated ability (theta)
+    ability_se = models.FloatField(null=True, blank=True)  # adaptive: its standard error
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.artisan.first_name} - {self.trade_category} ({self.status})"
+
+
+class BankQuestion(models.Model):
+    """
+    A question of the adaptive item bank, collected from past assessments,
+    with its 2PL parameters once calibrated (manage.py calibrate_item_bank).
+    fingerprint identifies the same question across assessments.
+    """
+    trade_category = models.CharField(max_length=100)  # lowercased
+    fingerprint = models.CharField(max_length=64, unique=True)
+    question = models.TextField()
+    options = models.JSONField()
+    answer = models.CharField(max_length=1)
+    discrimination = models.FloatField(null=True, blank=True)  # a
+    difficulty = models.FloatField(null=True, blank=True)  # b
+    responses = models.PositiveIntegerField(default=0)  # answers seen at the last calibration
+    calibrated_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["trade_category", "calibrated_at"], name="assess_bank_trade_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.trade_category}: {self.question[:60]}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    First response to a POST sent with an Idempotency-Key header, replayed
+    for retries of the same request (see assessments/idempotency.py).
+    status_code is null while the first request is still running, which
+    holds the key until locked_until.
+    """
+    key = models.CharField(max_length=255)
+    owner = models.CharField(max_length=64, blank=True)  # user pk, or "ip:<client ip>" for anonymous callers
+    route = models.CharField(max_length=100)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=JSONEncoder)  # as DRF renders it
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["key", "owner", "route"], name="assess_idem_key_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="assess_idem_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.route} {self.key} ({self.status_code or 'in progress'})"
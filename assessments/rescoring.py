@@ -0,0 +1,283 @@
+# Rescoring of stored assessments after an answer key is corrected.
+#
+# A correction names a question (its text, optionally its trade and the
+# wrong answer it has now) and its right answer. rescore() walks the
+# assessments in id order, RESCORE_CHUNK_SIZE rows at a time: it rewrites
+# the answer of every matching question in Assessment.questions,
+# recomputes the scores of the completed ones and writes both back with
+# one executemany UPDATE per chunk, in a transaction with the chunk's rows
+# locked (bulk_update's CASE expressions cost far more than the scoring).
+# Scores of a whole chunk are computed at once with NumPy: fixed
+# assessments as int(correct / total * 100) like submit_assessment (an
+# AI-adjusted score is replaced), adaptive ones by re-estimating their
+# ability from the stored item parameters.
+#
+# updated_at is left alone: an artisan's latest assessment is found by it.
+# Artisans whose scores changed get their best_score and candidate rows
+# recomputed once all chunks are written. Matching bank questions are
+# corrected too and left uncalibrated until the next calibrate_item_bank
+# (their parameters were fitted against the wrong key). AI feedback is not
+# regenerated. With dry_run nothing is written; the report says what would
+# change.
+
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from craftconnect.cache import invalidate_tags
+from jobs.matching import refresh_candidates
+from users.reputation import refresh_best_scores
+from . import irt
+from .adaptive import fingerprint, normalize, trade_key
+from .models import OPTIONS, Assessment, BankQuestion
+
+CODES = {option: code for code, option in enumerate(OPTIONS)}
+WRITE_FIELDS = ("questions", "score", "ability", "ability_se")
+SAMPLE_SIZE = 20
+
+
+def parse_corrections(corrections):
+    """
+    {(trade key or None, normalized question text): (previous answer or
+    None, answer)} from a list of correction dicts. Raises ValueError.
+    """
+    if not isinstance(corrections, list) or not corrections:
+        raise ValueError("corrections must be a non-empty list.")
+    parsed = {}
+    for number, correction in enumerate(corrections, start=1):
+        if not isinstance(correction, dict) or not str(correction.get("question") or "").strip():
+            raise ValueError(f"Correction {number}: question is required.")
+        if correction.get("answer") not in OPTIONS:
+            raise ValueError(f"Correction {number}: answer must be A, B, C or D.")
+        previous = correction.get("previous_answer")
+        if previous is not None and previous not in OPTIONS:
+            raise ValueError(f"Correction {number}: previous_answer must be A, B, C or D.")
+        trade = correction.get("trade_category")
+        key = (trade_key(trade) if trade else None, normalize(correction["question"]))
+        if key in parsed:
+            raise ValueError(f"Correction {number}: the same question is corrected twice.")
+        parsed[key] = (previous, correction["answer"])
+    return parsed
+
+
+def corrected_answer(corrections, trade, question):
+    """The right answer of a question dict if a correction changes it, else None."""
+    text = normalize(question["question"])
+    match = corrections.get((trade_key(trade), text)) or corrections.get((None, text))
+    if match is None:
+        return None
+    previous, answer = match
+    if question.get("answer") == answer or previous not in (None, question.get("answer")):
+        return None
+    return answer
+
+
+def correct_questions(corrections, trade, questions):
+    """Copy of an assessment's questions with corrected answers, and how many were corrected."""
+    corrected, count = [], 0
+    for question in questions:
+        if isinstance(question, dict) and isinstance(question.get("question"), str):
+            answer = corrected_answer(corrections, trade, question)
+            if answer is not None:
+                question = {**question, "answer": answer}
+                count += 1
+        corrected.append(question)
+    return corrected, count
+
+
+# --------------------------------------------------------
+# VECTORIZED SCORING
+# --------------------------------------------------------
+def padded(rows, fill, dtype):
+    """(rows, longest row) array of the values of rows, padded with fill, and the mask of real values."""
+    lengths = np.fromiter((len(row) for row in rows), np.int64, count=len(rows))
+    width = max(int(lengths.max(initial=0)), 1)
+    values = np.full((len(rows), width), fill, dtype)
+    mask = np.arange(width) < lengths[:, None]
+    values[mask] = np.fromiter(chain.from_iterable(rows), dtype, count=int(lengths.sum()))
+    return values, mask
+
+
+def code(value, missing):
+    return CODES.get(value, missing) if type(value) is str else missing
+
+
+def correct_matrix(questions, answers):
+    """(assessments, questions) bools: answered and right. Padding never matches."""
+    keys, asked = padded([[code(q.get("answer"), -1) for q in qs] for qs in questions], -1, np.int8)
+    responses, _ = padded([[code(answer, -2) for answer in row] for row in answers], -2, np.int8)
+    return (keys == responses) & asked, asked
+
+
+def fixed_scores(questions, answers):
+    correct, asked = correct_matrix(questions, answers)
+    # Same float operations as submit_assessment's int((correct / total) * 100)
+    return np.floor(correct.sum(axis=1) / asked.sum(axis=1) * 100)
+
+
+def adaptive_abilities(questions, answers):
+    asked = [qs[:len(row)] for qs, row in zip(questions, answers)]
+    correct, mask = correct_matrix(asked, answers)
+    a, _ = padded([[q.get("discrimination", 1.0) for q in qs] for qs in asked], 1.0, float)
+    b, _ = padded([[q.get("difficulty", 0.0) for q in qs] for qs in asked], 0.0, float)
+    return irt.estimate_abilities(a, b, correct, mask)
+
+
+# --------------------------------------------------------
+# RESCORE
+# --------------------------------------------------------
+def rescore(corrections, dry_run=False, chunk_size=None, on_diffs=None):
+    """
+    Apply answer key corrections to every stored assessment and rescore
+    them. on_diffs(list) receives the score changes of each chunk.
+    Returns a report. Raises ValueError for invalid corrections.
+    """
+    corrections = parse_corrections(corrections)
+    chunk_size = chunk_size or getattr(settings, "RESCORE_CHUNK_SIZE", 2000)
+    report = {
+        "scanned": 0, "matched": 0, "questions_corrected": 0, "rescored": 0,
+        "changed": 0, "raised": 0, "lowered": 0, "artisans": 0, "bank_questions": 0,
+        "dry_run": dry_run, "sample": [],
+    }
+
+    assessments = Assessment.objects.order_by("id")
+    trades = {trade for trade, _ in corrections}
+    if None not in trades:
+        # A superset (the trade key is matched exactly per row)
+        query = Q()
+        for trade in trades:
+            query |= Q(trade_category__icontains=trade)
+        assessments = assessments.filter(query)
+    fields = ("id", "artisan_id", "trade_category", "mode", "status", "questions", "answers", "score", "ability", "ability_se")
+
+    alias = router.db_for_write(Assessment)
+    artisans = set()
+    last_id = 0
+    while True:
+        with transaction.atomic(using=alias):
+            chunk = assessments.filter(id__gt=last_id)
+            if not dry_run:
+                chunk = chunk.using(alias).select_for_update()
+            rows = list(chunk.values_list(*fields)[:chunk_size])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            report["scanned"] += len(rows)
+            updates, diffs = rescore_chunk(corrections, rows, report)
+            if updates and not dry_run:
+                write_back(alias, updates)
+
+        artisans.update(diff["artisan_id"] for diff in diffs)
+        if diffs and on_diffs is not None:
+            on_diffs(diffs)
+
+    report["artisans"] = len(artisans)
+    if not dry_run:
+        # Once per artisan, not per chunk: an artisan's assessments span many chunks
+        artisans = sorted(artisans)
+        for start in range(0, len(artisans), chunk_size):
+            batch = artisans[start:start + chunk_size]
+            refresh_best_scores(batch)
+            refresh_candidates(batch)
+    report["bank_questions"] = correct_bank(corrections, dry_run)
+    return report
+
+
+def rescore_chunk(corrections, rows, report):
+    """Assessments of a chunk to write back (with corrected questions and scores), and their score changes."""
+    updates, fixed, adaptive = [], [], []
+    for assessment_id, artisan_id, trade, mode, status, questions, answers, score, ability, ability_se in rows:
+        if not isinstance(questions, list):
+            continue
+        questions, count = correct_questions(corrections, trade, questions)
+        if not count:
+            continue
+        report["matched"] += 1
+        report["questions_corrected"] += count
+        assessment = Assessment(
+            id=assessment_id, artisan_id=artisan_id, mode=mode, questions=questions, answers=answers,
+            score=score, ability=ability, ability_se=ability_se,
+        )
+        updates.append(assessment)
+        if status != "completed" or not isinstance(answers, list) or not answers:
+            continue
+        if mode == "adaptive":
+            adaptive.append(assessment)
+        elif len(answers) == len(questions):
+            fixed.append(assessment)
+
+    rescored = []
+    if fixed:
+        scores = fixed_scores([a.questions for a in fixed], [a.answers for a in fixed])
+        rescored += zip(fixed, scores.tolist())
+    if adaptive:
+        thetas, errors = adaptive_abilities([a.questions for a in adaptive], [a.answers for a in adaptive])
+        for assessment, theta, se in zip(adaptive, thetas.tolist(), errors.tolist()):
+            assessment.ability, assessment.ability_se = theta, se
+            rescored.append((assessment, irt.ability_score(theta)))
+    report["rescored"] += len(rescored)
+
+    diffs = []
+    for assessment, score in rescored:
+        previous, assessment.score = assessment.score, score
+        if previous == score:
+            continue
+        diff = {
+            "id": assessment.id, "artisan_id": assessment.artisan_id, "mode": assessment.mode,
+            "old_score": previous, "new_score": score,
+        }
+        diffs.append(diff)
+        report["changed"] += 1
+        report["raised" if previous is None or score > previous else "lowered"] += 1
+        if len(report["sample"]) < SAMPLE_SIZE:
+            report["sample"].append(diff)
+    return updates, diffs
+
+
+def write_back(alias, assessments):
+    connection = connections[alias]
+    quote = connection.ops.quote_name
+    fields = [Assessment._meta.get_field(name) for name in WRITE_FIELDS]
+    sql = "UPDATE {} SET {} WHERE {} = %s".format(
+        quote(Assessment._meta.db_table),
+        ", ".join(f"{quote(field.column)} = %s" for field in fields),
+        quote(Assessment._meta.pk.column),
+    )
+    params = [
+        [field.get_db_prep_save(getattr(assessment, field.attname), connection) for field in fields] + [assessment.pk]
+        for assessment in assessments
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def correct_bank(corrections, dry_run):
+    """Correct matching bank questions; returns how many matched."""
+    trades = {trade for trade, _ in corrections}
+    bank = BankQuestion.objects.order_by("id")
+    if None not in trades:
+        bank = bank.filter(trade_category__in=trades)
+
+    matched, touched = 0, set()
+    with transaction.atomic():
+        for row in list(bank.select_for_update() if not dry_run else bank):
+            answer = corrected_answer(corrections, row.trade_category, {"question": row.question, "answer": row.answer})
+            if answer is None:
+                continue
+            matched += 1
+            if dry_run:
+                continue
+            touched.add(row.trade_category)
+            row.answer = answer
+            key = fingerprint(row.trade_category, {"question": row.question, "options": row.options, "answer": answer})
+            if BankQuestion.objects.filter(fingerprint=key).exists():
+                row.delete()  # The corrected question is already in the bank
+                continue
+            row.fingerprint = key
+            row.discrimination = row.difficulty = row.calibrated_at = None
+            row.save(update_fields=["answer", "fingerprint", "discrimination", "difficulty", "calibrated_at"])
+        invalidate_tags(*(f"item_bank:{trade}" for trade in touched))
+    return matched
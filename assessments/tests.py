@@ -1,3 +1,374 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from benchmarks.fake_groq import FakeGroqServer
+from craftconnect.cache import tiered_cache
+from craftconnect.querycheck import QueryBudgetMixin
+from users.models import Artisan, ArtisanReputation, TradeCategory
+from . import adaptive, irt
+from .models import Assessment, BankQuestion, IdempotencyKey
+
+
+class AssessmentQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.groq = FakeGroqServer().start()
+        cls.addClassCleanup(cls.groq.stop)
+
+    def setUp(self):
+        category = TradeCategory.objects.create(name="Tailor")
+        self.artisan = Artisan.objects.create(
+            first_name="Ngozi", last_name="Eze", phone_number="08033334444", email_address="ngozi@example.com",
+            password="pw", trade_category=category, location="Enugu", language="Igbo",
+        )
+        self.api = APIClient()
+        patcher = mock.patch("assessments.groq_client.BASE_URL", self.groq.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_start_and_submit(self):
+        with self.assertMaxQueries(1):
+            response = self.api.post(
+                "/api/assessment/start/", {"trade_category": "Tailor", "artisan": self.artisan.id}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        assessment_id = response.json()["assessment"]["id"]
+
+        with self.assertMaxQueries(16, threshold=3):
+            response = self.api.post(
+                "/api/assessment/submit/", {"assessment_id": assessment_id, "answers": list("ABCDA")}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["result"]["score"], 100)
+
+
+class IdempotencyKeyTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.groq = FakeGroqServer().start()
+        cls.addClassCleanup(cls.groq.stop)
+
+    def setUp(self):
+        category = TradeCategory.objects.create(name="Tailor")
+        self.artisan = Artisan.objects.create(
+            first_name="Ngozi", last_name="Eze", phone_number="08033334444", email_address="ngozi@example.com",
+            password="pw", trade_category=category, location="Enugu", language="Igbo",
+        )
+        self.api = APIClient()
+        patcher = mock.patch("assessments.groq_client.BASE_URL", self.groq.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start(self, key, remote_addr="127.0.0.1", **data):
+        return self.api.post(
+            "/api/assessment/start/", {"trade_category": "Tailor", "artisan": self.artisan.id, **data},
+            format="json", HTTP_IDEMPOTENCY_KEY=key, REMOTE_ADDR=remote_addr,
+        )
+
+    def test_retry_replays_first_response(self):
+        calls = self.groq.calls
+        first = self.start("attempt-1")
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(1):
+            retry = self.start("attempt-1")
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(self.groq.calls, calls + 1)
+        self.assertEqual(Assessment.objects.count(), 1)
+
+        self.assertEqual(self.start("attempt-2").status_code, 200)
+        self.assertEqual(Assessment.objects.count(), 2)
+
+    def test_key_reused_with_other_body(self):
+        self.start("attempt-1")
+        self.assertEqual(self.start("attempt-1", trade_category="Welder").status_code, 422)
+
+    def test_errors_are_not_replayed(self):
+        response = self.api.post("/api/assessment/start/", {}, format="json", HTTP_IDEMPOTENCY_KEY="attempt-1")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_duplicate_waits_for_first_request(self):
+        self.start("attempt-1")
+        pending = IdempotencyKey.objects.filter(key="attempt-1")
+        pending.update(status_code=None, response=None)
+
+        def first_request_finishes(seconds):
+            pending.update(status_code=201, response={"message": "done"})
+
+        with mock.patch("assessments.idempotency.time.sleep", side_effect=first_request_finishes):
+            response = self.start("attempt-1")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"message": "done"})
+
+    @override_settings(IDEMPOTENCY_WAIT=0)
+    def test_duplicate_of_unfinished_request_conflicts(self):
+        self.start("probe")
+        IdempotencyKey.objects.filter(key="probe").update(status_code=None)
+        response = self.start("probe")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_retry_takes_over_expired_lease(self):
+        self.start("attempt-1")
+        # The worker running the first request died before storing its response
+        IdempotencyKey.objects.update(status_code=None, response=None, locked_until=timezone.now())
+        response = self.start("attempt-1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 200)
+        self.assertEqual(self.start("attempt-1")["Idempotent-Replayed"], "true")
+
+    def test_anonymous_callers_keyed_by_ip(self):
+        self.start("attempt-1", remote_addr="10.0.0.1")
+        other = self.start("attempt-1", remote_addr="10.0.0.2")
+        self.assertNotIn("Idempotent-Replayed", other)
+        self.assertEqual(
+            sorted(IdempotencyKey.objects.values_list("owner", flat=True)), ["ip:10.0.0.1", "ip:10.0.0.2"]
+        )
+
+    def test_expired_key_runs_again(self):
+        self.start("attempt-1")
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+        self.assertNotIn("Idempotent-Replayed", self.start("attempt-1"))
+        self.assertEqual(Assessment.objects.count(), 2)
+
+
+class ExportAssessmentsTests(TestCase):
+    def test_command_writes_json_lines(self):
+        artisan = Artisan.objects.create(
+            first_name="Ngozi", last_name="Eze", phone_number="08033334444", email_address="ngozi@example.com",
+            password="pw", location="Enugu", language="Igbo",
+        )
+        questions = [{"question": "Which stitch?", "options": {"A": "1", "B": "2", "C": "3", "D": "4"}, "answer": "A"}]
+        Assessment.objects.create(artisan=artisan, trade_category="Tailor", questions=questions, answers=["A"], score=100)
+        Assessment.objects.create(artisan=artisan, trade_category="Welder", questions=questions)
+
+        path = os.path.join(tempfile.mkdtemp(), "assessments.jsonl")
+        call_command("export_assessments", format="jsonl", trade="Tailor", output=path, chunk_size=1)
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["artisan_email"], "ngozi@example.com")
+        self.assertEqual(rows[0]["questions"], questions)
+        self.assertEqual(rows[0]["answers"], ["A"])
+
+
+def bank_question(number, answer="A"):
+    return {
+        "question": f"Tailoring question {number}?",
+        "options": {"A": "Yes", "B": "No", "C": "Maybe", "D": "Never"},
+        "answer": answer,
+    }
+
+
+@override_settings(ADAPTIVE_TOP_K=1, ADAPTIVE_MIN_ITEMS=3, ADAPTIVE_MAX_ITEMS=8, ADAPTIVE_TARGET_SE=0.5)
+class AdaptiveAssessmentTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        tiered_cache.clear_local()
+        self.artisan = Artisan.objects.create(
+            first_name="Ngozi", last_name="Eze", phone_number="08033334444", email_address="ngozi@example.com",
+            password="pw", location="Enugu", language="Igbo",
+        )
+        self.api = APIClient()
+
+    def create_bank(self, count=20):
+        now = timezone.now()
+        BankQuestion.objects.bulk_create([
+            BankQuestion(
+                trade_category="tailor", fingerprint=f"q{number}", **bank_question(number),
+                discrimination=1.5, difficulty=-2 + 4 * number / (count - 1), responses=100, calibrated_at=now,
+            )
+            for number in range(count)
+        ])
+
+    def answer(self, assessment_id, question_id, answer):
+        return self.api.post(
+            "/api/assessment/adaptive/answer/",
+            {"assessment_id": assessment_id, "question_id": question_id, "answer": answer}, format="json",
+        )
+
+    def test_calibrate_item_bank(self):
+        # 400 artisans of known ability answer 8 of 10 questions of known difficulty
+        rng = np.random.default_rng(7)
+        difficulties = np.linspace(-1.5, 1.5, 10)
+        assessments = []
+        for theta in rng.normal(size=400):
+            asked = rng.choice(10, size=8, replace=False)
+            correct = rng.random(8) < irt.probability(theta, 1.2, difficulties[asked])
+            assessments.append(Assessment(
+                artisan=self.artisan, trade_category="Tailor ", status="completed",
+                questions=[bank_question(number) for number in asked],
+                answers=["A" if right else "B" for right in correct],
+            ))
+        # Answered once: kept, not calibrated
+        assessments.append(Assessment(
+            artisan=self.artisan, trade_category="tailor", status="completed",
+            questions=[bank_question(99, answer="C")], answers=["C"],
+        ))
+        Assessment.objects.bulk_create(assessments)
+
+        out = io.StringIO()
+        call_command("calibrate_item_bank", min_responses=50, stdout=out)
+        self.assertIn("tailor: 10/11 questions calibrated from 3201 answers in 401 assessments", out.getvalue())
+
+        rows = BankQuestion.objects.filter(trade_category="tailor").order_by("id")
+        self.assertEqual(rows.count(), 11)
+        calibrated = {row.question: row for row in rows if row.calibrated_at}
+        fitted = [calibrated[f"Tailoring question {number}?"].difficulty for number in range(10)]
+        self.assertGreater(np.corrcoef(difficulties, fitted)[0, 1], 0.95)
+        self.assertEqual(BankQuestion.objects.get(question="Tailoring question 99?").discrimination, None)
+
+        # Recalibrating finds the same questions
+        call_command("calibrate_item_bank", min_responses=50, stdout=io.StringIO())
+        self.assertEqual(BankQuestion.objects.count(), 11)
+
+    def test_adaptive_assessment(self):
+        self.create_bank()
+        response = self.api.post(
+            "/api/assessment/adaptive/start/", {"trade_category": "Tailor", "artisan": self.artisan.id}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        assessment_id, question = body["assessment_id"], body["question"]
+        self.assertNotIn("answer", question)
+        # Starts at the typical artisan: the question of middling difficulty
+        self.assertIn(question["question"], {"Tailoring question 9?", "Tailoring question 10?"})
+
+        self.assertEqual(self.answer(assessment_id, question["id"] + 1, "A").status_code, 409)
+
+        asked = []
+        while "question" in body:
+            asked.append(body["question"]["question"])
+            response = self.answer(assessment_id, body["question"]["id"], "A")
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+        self.assertEqual(len(set(asked)), len(asked))
+        self.assertTrue(3 <= len(asked) <= 8)
+        # Right answers lead to harder questions
+        numbers = [int(text.split()[-1].rstrip("?")) for text in asked]
+        self.assertGreater(numbers[-1], numbers[0] + 3)
+
+        result = body["result"]
+        self.assertEqual((result["status"], result["mode"]), ("completed", "adaptive"))
+        self.assertGreater(result["ability"], 1)
+        self.assertEqual(result["score"], irt.ability_score(result["ability"]))
+        self.assertEqual(ArtisanReputation.objects.get(artisan=self.artisan).assessments_completed, 1)
+        self.assertEqual(self.answer(assessment_id, 1, "A").status_code, 409)
+
+        # Not an assessment of the fixed kind
+        response = self.api.post(
+            "/api/assessment/submit/", {"assessment_id": assessment_id, "answers": ["A"]}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_start_needs_calibrated_bank(self):
+        self.create_bank(count=2)
+        response = self.api.post(
+            "/api/assessment/adaptive/start/", {"trade_category": "Tailor", "artisan": self.artisan.id}, format="json"
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Assessment.objects.exists())
+
+
+class RescoreAssessmentsTests(TestCase):
+    def setUp(self):
+        self.artisan = Artisan.objects.create(
+            first_name="Ngozi", last_name="Eze", phone_number="08033334444", email_address="ngozi@example.com",
+            password="pw", location="Enugu", language="Igbo",
+        )
+        ArtisanReputation.objects.create(artisan=self.artisan, assessments_completed=2, best_score=100)
+        self.questions = [bank_question(1, answer="A"), bank_question(2, answer="C")]  # 1 should be B
+
+        def create(answers, **fields):
+            fields = {"status": "completed", "trade_category": "Tailor", "questions": self.questions, **fields}
+            return Assessment.objects.create(artisan=self.artisan, answers=answers, **fields)
+
+        self.right = create(["B", "C"], score=50)
+        self.wrong = create(["A", "C"], score=100)
+        self.pending = create(None, status="pending")
+        self.welder = create(["B", "C"], score=50, trade_category="Welder")
+        asked = [{**question, "bank_id": number, "discrimination": 1.5, "difficulty": 0.0}
+                 for number, question in enumerate(self.questions)]
+        self.adaptive = create(["B", "C"], mode="adaptive", questions=asked, score=irt.ability_score(0.0))
+        self.corrections = [{"question": "tailoring  question 1?", "answer": "B", "trade_category": "tailor"}]
+
+    def test_command(self):
+        before = {a.id: (a.score, a.updated_at) for a in Assessment.objects.all()}
+        out = io.StringIO()
+        call_command("rescore_assessments", question="Tailoring question 1?", answer="B", trade="Tailor",
+                     dry_run=True, stdout=out)
+        self.assertIn("Would change 3 scores; 4 of 4 assessments scanned had a corrected question.", out.getvalue())
+        self.assertEqual({a.id: (a.score, a.updated_at) for a in Assessment.objects.all()}, before)
+
+        path = self.write(self.corrections)
+        report_path = os.path.join(tempfile.mkdtemp(), "diffs.jsonl")
+        call_command("rescore_assessments", corrections=path, report=report_path, chunk_size=2, stdout=io.StringIO())
+
+        scores = dict(Assessment.objects.values_list("id", "score"))
+        self.assertEqual(
+            [scores[a.id] for a in (self.right, self.wrong, self.pending, self.welder)], [100, 50, None, 50]
+        )
+        self.assertGreater(scores[self.adaptive.id], 50)
+        self.pending.refresh_from_db()
+        self.assertEqual([q["answer"] for q in self.pending.questions], ["B", "C"])
+        self.welder.refresh_from_db()
+        self.assertEqual(self.welder.questions, self.questions)
+        self.assertEqual(Assessment.objects.get(id=self.wrong.id).updated_at, before[self.wrong.id][1])
+        self.assertEqual(ArtisanReputation.objects.get(artisan=self.artisan).best_score, 100)
+
+        with open(report_path) as f:
+            diffs = [json.loads(line) for line in f]
+        self.assertEqual(
+            {diff["id"]: (diff["old_score"], diff["new_score"]) for diff in diffs if diff["mode"] == "fixed"},
+            {self.right.id: (50, 100), self.wrong.id: (100, 50)},
+        )
+
+        # Applied corrections no longer match
+        out = io.StringIO()
+        call_command("rescore_assessments", corrections=path, stdout=out)
+        self.assertIn("Changed 0 scores; 0 of 4", out.getvalue())
+
+    def test_corrects_bank_question(self):
+        BankQuestion.objects.create(
+            trade_category="tailor", fingerprint="old", **bank_question(1, answer="A"),
+            discrimination=1.0, difficulty=0.0, calibrated_at=timezone.now(),
+        )
+        call_command("rescore_assessments", corrections=self.write(self.corrections), stdout=io.StringIO())
+        question = BankQuestion.objects.get()
+        self.assertEqual((question.answer, question.calibrated_at), ("B", None))
+        self.assertEqual(question.fingerprint, adaptive.fingerprint("tailor", bank_question(1, answer="B")))
+
+    def test_endpoint(self):
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user(username="admin", is_staff=True))
+        response = self.api.post("/api/assessment/rescore/", {"corrections": self.corrections}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["dry_run"], response.json()["changed"]), (True, 3))
+        self.assertEqual(Assessment.objects.get(id=self.right.id).score, 50)
+
+        response = self.api.post(
+            "/api/assessment/rescore/", {"corrections": [{"question": "x", "answer": "E"}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def write(self, corrections):
+        path = os.path.join(tempfile.mkdtemp(), "corrections.json")
+        with open(path, "w") as f:
+            json.dump(corrections, f)
+        return path
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import start_assessment, submit_assessment
+from .views import (
+    start_assessment, submit_assessment, start_adaptive_assessment, answer_adaptive_assessment, export_assessments,
+    rescore_assessments,
+)
 
 urlpatterns = [
     path('start/', start_assessment, name='start_assessment'),
     path('submit/', submit_assessment, name='submit_assessment'),
+    path('adaptive/start/', start_adaptive_assessment, name='start_adaptive_assessment'),
+    path('adaptive/answer/', answer_adaptive_assessment, name='answer_adaptive_assessment'),
+    path('export/', export_assessments, name='export_assessments'),
+    path('rescore/', rescore_assessments, name='rescore_assessments'),
 ]
\ No newline at end of file
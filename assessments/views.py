@@ -1,16 +1,33 @@
 # assessments/views.py
 
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from django.conf import settings
+from django.db import transaction
 import json
 
-from .models import Assessment
+from craftconnect import fastjson
+from craftconnect.exports import EXPORT_PARAMETERS, parse_filters, streaming_export
+from craftconnect.ratelimit import rate_limit
+from .exports import ASSESSMENT_COLUMNS, assessment_export
+from .idempotency import idempotent
+# irt, adaptive and rescoring need NumPy: imported by the views that use
+# them, so web workers do not load it at boot (see bench_startup)
+from .models import OPTIONS, Assessment
 from .serializers import AssessmentSerializer
 from users.models import Artisan
 from assessments.groq_client import groq_generate
+from jobs.matching import refresh_candidate
+from users.reputation import record_assessment_completed, record_assessment_rescored
+
+IDEMPOTENCY_KEY_PARAMETER = openapi.Parameter(
+    "Idempotency-Key", openapi.IN_HEADER, type=openapi.TYPE_STRING, required=False,
+    description="Unique key per attempt: retries with the same key get the first response back.",
+)
 
 # --------------------------------------------------------
 # START ASSESSMENT
@@ -18,6 +35,7 @@ from assessments.groq_client import groq_generate
 @swagger_auto_schema(
     method='post',
     operation_summary="Start AI Assessment",
+    manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
         required=['trade_category', 'artisan'],
@@ -34,6 +52,8 @@ from assessments.groq_client import groq_generate
     )
 )
 @api_view(['POST'])
+@idempotent
+@rate_limit(ip="20/m", user="5/m")
 def start_assessment(request):
     try:
         trade_category = request.data.get("trade_category")
@@ -84,7 +104,7 @@ STRICT RULES:
 
         # Parse AI JSON
         try:
-            data = json.loads(output)
+            data = fastjson.loads(output)
         except json.JSONDecodeError:
             return Response(
                 {"error": "Invalid JSON returned by AI", "raw_output": output},
@@ -146,6 +166,7 @@ STRICT RULES:
 @swagger_auto_schema(
     method='post',
     operation_summary="Submit completed AI assessment",
+    manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
         required=["assessment_id", "answers"],
@@ -163,6 +184,8 @@ STRICT RULES:
     )
 )
 @api_view(["POST"])
+@idempotent
+@rate_limit(ip="30/m", user="10/m")
 def submit_assessment(request):
     try:
         assessment_id = request.data.get("assessment_id")
@@ -176,7 +199,7 @@ def submit_assessment(request):
             )
 
         # Get assessment
-        assessment = Assessment.objects.filter(id=assessment_id).first()
+        assessment = Assessment.objects.filter(id=assessment_id, mode="fixed").first()
         if not assessment:
             return Response({"error": "Assessment not found"}, status=404)
 
@@ -259,7 +282,7 @@ Here are the user's answers:
 
         # Parse returned JSON
         try:
-            result = json.loads(ai_output)
+            result = fastjson.loads(ai_output)
         except:
             return Response(
                 {"error": "Invalid AI JSON response", "raw_output": ai_output},
@@ -267,11 +290,18 @@ Here are the user's answers:
             )
 
         # Save results
+        already_completed = assessment.status == "completed"
+        previous_score = assessment.score
         assessment.answers = answers
         assessment.score = result.get("score", score)
         assessment.ai_feedback = result.get("feedback", {})
         assessment.status = "completed"
         assessment.save()
+        if already_completed:
+            record_assessment_rescored(assessment.artisan_id, previous_score, assessment.score)
+        else:
+            record_assessment_completed(assessment.artisan_id, assessment.score)
+        refresh_candidate(assessment.artisan)
 
         return Response({
             "message": "Assessment submitted.",
@@ -279,4 +309,233 @@ Here are the user's answers:
         })
 
     except Exception as e:
-        return Response({"error": str(e)}, status=500)
\ No newline at end of file
+        return Response({"error": str(e)}, status=500)
+
+
+# --------------------------------------------------------
+# START ADAPTIVE ASSESSMENT
+# --------------------------------------------------------
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Start adaptive assessment",
+    operation_description=(
+        "Starts an assessment that asks calibrated bank questions one at a time, each chosen "
+        "for the artisan's estimated ability, until the estimate is precise enough. Returns "
+        "the first question; answer it with /adaptive/answer/."
+    ),
+    manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['trade_category', 'artisan'],
+        properties={
+            'trade_category': openapi.Schema(type=openapi.TYPE_STRING, description="Trade category e.g. Tailor, Welder"),
+            'artisan': openapi.Schema(type=openapi.TYPE_INTEGER, description="Artisan ID"),
+        }
+    ),
+    responses={
+        200: "First question",
+        404: "Artisan not found",
+        409: "Not enough calibrated questions for this trade",
+        429: "Too many requests",
+    }
+)
+@api_view(['POST'])
+@idempotent
+@rate_limit(ip="20/m", user="5/m")
+def start_adaptive_assessment(request):
+    trade_category = request.data.get("trade_category")
+    artisan = request.data.get("artisan")
+    if not trade_category or not artisan:
+        return Response({"error": "trade_category and artisan are required"}, status=status.HTTP_400_BAD_REQUEST)
+    if not Artisan.objects.filter(pk=artisan).exists():
+        return Response({"error": "Artisan not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    from . import irt
+    from .adaptive import load_bank, next_question, public_question
+
+    theta, se = irt.estimate_ability([], [], [])
+    question = None
+    if len(load_bank(trade_category)[0]) >= settings.ADAPTIVE_MIN_ITEMS:
+        question = next_question(trade_category, [], theta)
+    if question is None:
+        return Response(
+            {"error": "Not enough calibrated questions for an adaptive assessment in this trade yet."},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    assessment = Assessment.objects.create(
+        trade_category=trade_category,
+        artisan_id=artisan,
+        questions=[question],
+        answers=[],
+        mode="adaptive",
+        ability=theta,
+        ability_se=se,
+        status="pending"
+    )
+    return Response({
+        "message": "Adaptive assessment started.",
+        "assessment_id": assessment.id,
+        "question": public_question(question),
+        "answered": 0,
+        "max_questions": settings.ADAPTIVE_MAX_ITEMS,
+    })
+
+
+# --------------------------------------------------------
+# ANSWER ADAPTIVE ASSESSMENT
+# --------------------------------------------------------
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Answer adaptive assessment question",
+    operation_description=(
+        "Answers the current question. Returns the next question, or the result once the "
+        "assessment is complete (score: percentage of the trade's artisans below the "
+        "estimated ability)."
+    ),
+    manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['assessment_id', 'question_id', 'answer'],
+        properties={
+            'assessment_id': openapi.Schema(type=openapi.TYPE_INTEGER, description="The ID of the assessment"),
+            'question_id': openapi.Schema(type=openapi.TYPE_INTEGER, description="ID of the question answered"),
+            'answer': openapi.Schema(type=openapi.TYPE_STRING, enum=list(OPTIONS), description="Selected option"),
+        }
+    ),
+    responses={
+        200: "Next question, or the result",
+        404: "Assessment not found",
+        409: "Assessment completed, or question_id is not the current question",
+        429: "Too many requests",
+    }
+)
+@api_view(['POST'])
+@idempotent
+@rate_limit(ip="120/m")
+def answer_adaptive_assessment(request):
+    from .adaptive import complete, next_question, public_question, update_ability
+
+    assessment_id = request.data.get("assessment_id")
+    question_id = request.data.get("question_id")
+    answer = request.data.get("answer")
+    if not assessment_id or not question_id or answer not in OPTIONS:
+        return Response(
+            {"error": "assessment_id, question_id and answer (A, B, C or D) are required"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    with transaction.atomic():
+        assessment = Assessment.objects.select_for_update().filter(id=assessment_id, mode="adaptive").first()
+        if not assessment:
+            return Response({"error": "Assessment not found"}, status=status.HTTP_404_NOT_FOUND)
+        if assessment.status != "pending":
+            return Response({"error": "Assessment already completed"}, status=status.HTTP_409_CONFLICT)
+
+        # The question_id guards against a retried answer being taken for the next question
+        current = assessment.questions[len(assessment.answers)]
+        if str(current["bank_id"]) != str(question_id):
+            return Response(
+                {"error": "question_id is not the current question", "question": public_question(current)},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        assessment.answers = [*assessment.answers, answer]
+        done = update_ability(assessment)
+        if not done:
+            question = next_question(assessment.trade_category, assessment.questions, assessment.ability)
+            if question is None:
+                done = True
+            else:
+                assessment.questions = [*assessment.questions, question]
+        if done:
+            complete(assessment)
+        assessment.save()
+
+    if not done:
+        return Response({
+            "question": public_question(question),
+            "answered": len(assessment.answers),
+            "max_questions": settings.ADAPTIVE_MAX_ITEMS,
+        })
+
+    record_assessment_completed(assessment.artisan_id, assessment.score)
+    refresh_candidate(assessment.artisan)
+    return Response({
+        "message": "Assessment completed.",
+        "result": AssessmentSerializer(assessment).data
+    })
+
+
+# --------------------------------------------------------
+# EXPORT ASSESSMENTS (admin)
+# --------------------------------------------------------
+@swagger_auto_schema(
+    method='get',
+    operation_summary="Export assessments",
+    operation_description=(
+        "Streams assessments with their questions, answers and AI feedback as CSV or "
+        "JSON Lines, oldest first. Filter by creation date and trade category."
+    ),
+    manual_parameters=EXPORT_PARAMETERS,
+    responses={200: "CSV or JSON Lines file", 400: "Invalid parameters"}
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_assessments(request):
+    try:
+        fmt, since, until, trade = parse_filters(**{
+            name: request.query_params.get(name) for name in ("since", "until", "trade", "fmt")
+        })
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    return streaming_export(assessment_export(since, until, trade), ASSESSMENT_COLUMNS, fmt, "assessments")
+
+
+# --------------------------------------------------------
+# RESCORE ASSESSMENTS (admin)
+# --------------------------------------------------------
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Correct answer keys and rescore assessments",
+    operation_description=(
+        "Corrects the answer of the given questions in every stored assessment and rescores "
+        "the completed ones. dry_run (the default) only reports what would change. Large "
+        "corrections are better run with `manage.py rescore_assessments`."
+    ),
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['corrections'],
+        properties={
+            'corrections': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    required=['question', 'answer'],
+                    properties={
+                        'question': openapi.Schema(type=openapi.TYPE_STRING, description="Question text"),
+                        'answer': openapi.Schema(type=openapi.TYPE_STRING, enum=list(OPTIONS), description="Right answer"),
+                        'trade_category': openapi.Schema(type=openapi.TYPE_STRING, description="Only in this trade"),
+                        'previous_answer': openapi.Schema(type=openapi.TYPE_STRING, enum=list(OPTIONS),
+                                                          description="Only where the question has this answer"),
+                    }
+                )
+            ),
+            'dry_run': openapi.Schema(type=openapi.TYPE_BOOLEAN, default=True),
+        }
+    ),
+    responses={200: "Rescoring report", 400: "Invalid corrections"}
+)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def rescore_assessments(request):
+    dry_run = request.data.get("dry_run", True)
+    if not isinstance(dry_run, bool):
+        return Response({"error": "dry_run must be true or false"}, status=400)
+    from .rescoring import rescore
+
+    try:
+        report = rescore(request.data.get("corrections"), dry_run=dry_run)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    return Response(report)
@@ -0,0 +1,127 @@
+# Capture of sampled production traffic, for the replay_traffic command.
+#
+# With TRAFFIC_CAPTURE_FILE set, TrafficCaptureMiddleware appends one JSON
+# line per sampled request (TRAFFIC_CAPTURE_SAMPLE_RATE) to that file:
+# when it arrived, method, path and matched route, the JSON body, whether
+# it was authenticated, and the response status, size and server time.
+#
+# Only the shape of bodies and query strings is kept, nothing that
+# identifies a user: no headers or tokens, credentials (SENSITIVE_FIELDS)
+# become "<redacted>", and every other string value becomes a run of "x" of
+# the same length, so replayed bodies keep their size. Numbers, booleans and
+# the strings of SHAPE_FIELDS (operation names, statuses, answers, ...) are
+# kept for replay. Bodies that are not JSON, or larger than
+# TRAFFIC_CAPTURE_MAX_BODY bytes, are recorded by size only.
+
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+REDACTED = "<redacted>"
+SENSITIVE_FIELDS = {
+    "password", "token", "access", "refresh", "secret", "authorization",
+    "email", "email_address", "phone", "phone_number",
+}
+# Enum-like fields whose string values replay needs and that say nothing about a user
+SHAPE_FIELDS = {
+    "op", "status", "event", "events", "mode", "user_type", "trade_category",
+    "answer", "answers", "previous_answer", "format",
+}
+
+
+def mask(text):
+    return "x" * len(text)
+
+
+def sanitize(value, keep=False):
+    """Shape of a JSON value: credentials redacted, strings masked unless under a SHAPE_FIELDS key."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key.lower() in SENSITIVE_FIELDS else sanitize(item, key.lower() in SHAPE_FIELDS)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [sanitize(item, keep) for item in value]
+    if isinstance(value, str) and not keep:
+        return mask(value)
+    return value
+
+
+def sanitize_query(query):
+    pairs = []
+    for key, item in parse_qsl(query, keep_blank_values=True):
+        if key.lower() in SENSITIVE_FIELDS:
+            item = REDACTED
+        elif key.lower() not in SHAPE_FIELDS and not item.lstrip("-").isdigit():
+            item = mask(item)
+        pairs.append((key, item))
+    return urlencode(pairs)
+
+
+class CaptureFile:
+    """Appends lines to a file shared by every worker (O_APPEND, one write per line)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.fd = None
+
+    def write(self, record):
+        line = (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode()
+        with self.lock:
+            if self.fd is None:
+                self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            os.write(self.fd, line)
+
+
+class TrafficCaptureMiddleware:
+    def __init__(self, get_response):
+        path = getattr(settings, "TRAFFIC_CAPTURE_FILE", None)
+        if not path:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.file = CaptureFile(path)
+        self.sample_rate = getattr(settings, "TRAFFIC_CAPTURE_SAMPLE_RATE", 0.01)
+        self.max_body = getattr(settings, "TRAFFIC_CAPTURE_MAX_BODY", 64 * 1024)
+        self.exclude = tuple(getattr(settings, "TRAFFIC_CAPTURE_EXCLUDE", ("/admin/", "/static/", "/metrics")))
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate or request.path.startswith(self.exclude):
+            return self.get_response(request)
+
+        record = {
+            "ts": round(time.time(), 6),
+            "method": request.method,
+            "path": request.path,
+            "query": sanitize_query(request.META.get("QUERY_STRING", "")),
+            "authenticated": "HTTP_AUTHORIZATION" in request.META,
+            "content_type": request.content_type or None,
+            "body_bytes": int(request.META.get("CONTENT_LENGTH") or 0),
+            "body": None,
+        }
+        # Read before the view: Django keeps the body for it to parse again
+        if record["content_type"] == "application/json" and 0 < record["body_bytes"] <= self.max_body:
+            try:
+                record["body"] = sanitize(json.loads(request.body))
+            except ValueError:
+                pass
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        match = getattr(request, "resolver_match", None)
+        record["route"] = match.route if match else None
+        record["status"] = response.status_code
+        record["response_bytes"] = None if response.streaming else len(response.content)
+        try:
+            self.file.write(record)
+        except OSError:
+            pass  # Capture must never fail a request
+        return response
@@ -0,0 +1,35 @@
+# Throwaway databases for benchmarks that write, so a benchmark never
+# touches the configured (possibly production) database.
+
+import os
+import tempfile
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+
+def create_benchmark_db():
+    """
+    Migrate a throwaway copy of the configured database and switch to it;
+    returns the configured name for destroy_benchmark_db(). SQLite gets a
+    file rather than Django's shared in-memory test database so worker
+    threads use real connections, in WAL mode with IMMEDIATE transactions
+    so concurrent writers wait for the lock instead of failing with
+    "database is locked".
+    """
+    if connection.settings_dict["ENGINE"] == "django.db.backends.dummy":
+        raise CommandError("No database configured: set DATABASE_URL, e.g. DATABASE_URL=sqlite:///db.sqlite3")
+    if connection.vendor == "sqlite":
+        path = os.path.join(tempfile.mkdtemp(prefix="craftconnect-bench-"), "bench.sqlite3")
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = path
+        connection.settings_dict.setdefault("OPTIONS", {}).update({
+            "transaction_mode": "IMMEDIATE",
+            "init_command": "PRAGMA journal_mode=WAL;",
+        })
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    return old_name
+
+
+def destroy_benchmark_db(old_name):
+    connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,129 @@
+# Local stand-in for the Groq chat completions API.
+#
+# Speaks just enough of the OpenAI-compatible protocol for groq_generate():
+# question prompts get 5 well-formed multiple-choice questions, evaluation
+# prompts get a score + feedback object. Latency, jitter and error rate are
+# configurable so benchmarks can model a slow or flaky upstream without
+# touching the network.
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+SCORE_RE = re.compile(r'"score":\s*(\d+)')
+
+
+def fake_questions():
+    return {
+        "questions": [
+            {
+                "question": f"Benchmark question {n}?",
+                "options": {"A": "First", "B": "Second", "C": "Third", "D": "Fourth"},
+                "answer": "ABCD"[n % 4],
+            }
+            for n in range(5)
+        ]
+    }
+
+
+def fake_evaluation(prompt):
+    match = SCORE_RE.search(prompt)
+    return {
+        "score": int(match.group(1)) if match else 0,
+        "feedback": {
+            "summary": "Benchmark evaluation.",
+            "strengths": "n/a",
+            "weaknesses": "n/a",
+            "wrong_questions": [],
+            "recommendation": "n/a",
+        },
+    }
+
+
+def fake_completion(prompt):
+    """Chat completion body for a prompt sent by the assessment views."""
+    if "Generate EXACTLY 5" in prompt:
+        content = fake_questions()
+    else:
+        content = fake_evaluation(prompt)
+    text = json.dumps(content)
+    return {
+        "id": "fake-groq",
+        "object": "chat.completion",
+        "model": "fake",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(text.split()),
+            "total_tokens": len(prompt.split()) + len(text.split()),
+        },
+    }
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+
+        with server.lock:
+            server.calls += 1
+
+        if self.path != CHAT_COMPLETIONS_PATH:
+            return self.reply(404, {"error": {"message": "Unknown path"}})
+        if random.random() < server.error_rate:
+            return self.reply(503, {"error": {"message": "Fake upstream failure"}})
+
+        try:
+            prompt = json.loads(body)["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return self.reply(400, {"error": {"message": "Malformed request"}})
+
+        self.reply(200, fake_completion(prompt))
+
+    def reply(self, code, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0):
+        super().__init__((host, port), FakeGroqHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{CHAT_COMPLETIONS_PATH}"
+
+    def start(self):
+        """Serve from a daemon thread. Returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,274 @@
+# Traffic driver for the run_benchmark command.
+#
+# Virtual users (one thread each) pick operations from a weighted mix and
+# hit the public API either in-process (django.test.Client, no network) or
+# over HTTP against a running server. Every request is timed per endpoint;
+# summarize() turns the samples into the JSON report that --compare reads.
+
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from django.db import close_old_connections, connection
+
+DEFAULT_MIX = "register=1,login=3,start=1,submit=1,list_jobs=4"
+
+ENDPOINTS = {
+    "register": ("POST", "/api/users/artisan/register/"),
+    "login": ("POST", "/api/users/login/"),
+    "start": ("POST", "/api/assessment/start/"),
+    "submit": ("POST", "/api/assessment/submit/"),
+    "list_jobs": ("GET", "/api/jobs/all/"),
+}
+
+PASSWORD = "bench-password"
+
+
+def parse_mix(text):
+    """'login=3,list_jobs=4' -> {'login': 3.0, 'list_jobs': 4.0}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not mix or not any(mix.values()):
+        raise ValueError("The mix needs at least one endpoint with a positive weight")
+    return mix
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+# --------------------------------------------------------
+# TRANSPORTS
+# --------------------------------------------------------
+class InProcessTransport:
+    """Full Django request cycle (middleware, URL routing, views) without sockets."""
+
+    def __init__(self):
+        from django.test import Client
+        self.client = Client()
+
+    def request(self, method, path, payload=None, headers=None):
+        if method == "GET":
+            response = self.client.get(path, headers=headers)
+        elif method == "POST":
+            response = self.client.post(path, payload or {}, content_type="application/json", headers=headers)
+        else:
+            response = self.client.generic(
+                method, path, json.dumps(payload or {}), content_type="application/json", headers=headers
+            )
+        if response.streaming:
+            # Read it all, as a client would
+            b"".join(response.streaming_content)
+            return response.status_code, None
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return response.status_code, data
+
+    def close(self):
+        close_old_connections()
+        connection.close()
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+
+    def request(self, method, path, payload=None, headers=None):
+        response = self.session.request(method, self.base_url + path, json=payload, headers=headers, timeout=60)
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return response.status_code, data
+
+    def close(self):
+        self.session.close()
+
+
+# --------------------------------------------------------
+# SCENARIO
+# --------------------------------------------------------
+class LoadRun:
+    """
+    Shared state of one run: the artisans registered so far, assessments
+    waiting to be submitted, and the timing samples.
+    """
+
+    def __init__(self, transport_factory, trade_category, mix, seed=None):
+        self.transport_factory = transport_factory
+        self.trade_category = trade_category  # {"id": ..., "name": ...}
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.artisans = []
+        self.pending = []
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.issued = 0
+
+    # Each operation returns (status, endpoint actually called): login/start/
+    # submit fall back to the step they depend on when there is nothing to use yet.
+    def register(self, transport, rng):
+        suffix = uuid.uuid4().hex[:12]
+        status, data = transport.request("POST", ENDPOINTS["register"][1], {
+            "first_name": "Bench",
+            "last_name": suffix,
+            "phone_number": f"+bench{suffix}",
+            "email_address": f"bench-{suffix}@example.com",
+            "password": PASSWORD,
+            "trade_category": self.trade_category["id"],
+            "location": rng.choice(["Lagos Island", "Ikeja Lagos", "Abuja", "Ibadan"]),
+            "language": rng.choice(["English", "Yoruba", "Hausa"]),
+        })
+        if status == 201:
+            with self.lock:
+                self.artisans.append((data["artisan_id"], f"bench-{suffix}@example.com"))
+        return status, "register"
+
+    def login(self, transport, rng):
+        with self.lock:
+            artisan = rng.choice(self.artisans) if self.artisans else None
+        if artisan is None:
+            return self.register(transport, rng)
+        return transport.request("POST", ENDPOINTS["login"][1], {
+            "email_address": artisan[1], "password": PASSWORD,
+        })[0], "login"
+
+    def start(self, transport, rng):
+        with self.lock:
+            artisan = rng.choice(self.artisans) if self.artisans else None
+        if artisan is None:
+            return self.register(transport, rng)
+        status, data = transport.request("POST", ENDPOINTS["start"][1], {
+            "trade_category": self.trade_category["name"], "artisan": artisan[0],
+        })
+        if status == 200:
+            with self.lock:
+                self.pending.append(data["assessment"]["id"])
+        return status, "start"
+
+    def submit(self, transport, rng):
+        with self.lock:
+            assessment_id = self.pending.pop() if self.pending else None
+        if assessment_id is None:
+            return self.start(transport, rng)
+        return transport.request("POST", ENDPOINTS["submit"][1], {
+            "assessment_id": assessment_id,
+            "answers": [rng.choice("ABCD") for _ in range(5)],
+        })[0], "submit"
+
+    def list_jobs(self, transport, rng):
+        return transport.request("GET", ENDPOINTS["list_jobs"][1])[0], "list_jobs"
+
+    def timed(self, name, transport, rng):
+        started = time.perf_counter()
+        try:
+            status, endpoint = getattr(self, name)(transport, rng)
+        except Exception as exc:
+            status, endpoint = type(exc).__name__, name
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.samples[endpoint].append(elapsed)
+            self.statuses[endpoint][str(status)] += 1
+
+    def warm_up(self, artisans):
+        """Register a starting pool of artisans (not measured)."""
+        transport = self.transport_factory()
+        rng = random.Random(self.seed)
+        try:
+            for _ in range(artisans):
+                self.register(transport, rng)
+        finally:
+            transport.close()
+
+    def run(self, concurrency, requests=None, duration=None):
+        """Drive traffic until `requests` have been issued or `duration` seconds pass."""
+        deadline = time.perf_counter() + duration if duration else None
+        samples_before = sum(len(v) for v in self.samples.values())
+
+        def take_ticket():
+            with self.lock:
+                if requests is not None and self.issued >= requests:
+                    return False
+                self.issued += 1
+                return True
+
+        def worker(n):
+            rng = random.Random(None if self.seed is None else self.seed + n + 1)
+            transport = self.transport_factory()
+            try:
+                while (deadline is None or time.perf_counter() < deadline) and take_ticket():
+                    name = rng.choices(self.names, self.weights)[0]
+                    self.timed(name, transport, rng)
+            finally:
+                transport.close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - started
+        return wall, sum(len(v) for v in self.samples.values()) - samples_before
+
+
+def summarize(run, wall):
+    """Per-endpoint throughput, latency percentiles and status counts."""
+    endpoints = {}
+    total = 0
+    for name in sorted(run.samples):
+        latencies = sorted(run.samples[name])
+        statuses = run.statuses[name]
+        errors = sum(n for code, n in statuses.items() if not code.isdigit() or int(code) >= 500)
+        total += len(latencies)
+        endpoints[name] = {
+            "count": len(latencies),
+            "errors": errors,
+            "throughput_rps": round(len(latencies) / wall, 2),
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+                "p50": round(percentile(latencies, 0.50) * 1000, 3),
+                "p95": round(percentile(latencies, 0.95) * 1000, 3),
+                "p99": round(percentile(latencies, 0.99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3),
+            },
+            "statuses": dict(statuses),
+        }
+    return {
+        "wall_seconds": round(wall, 3),
+        "requests": total,
+        "throughput_rps": round(total / wall, 2) if wall else 0,
+        "endpoints": endpoints,
+    }
+
+
+def compare(report, baseline, max_regression):
+    """
+    Endpoints whose p95 grew, or throughput fell, by more than
+    `max_regression` (a fraction) relative to the baseline report.
+    """
+    regressions = []
+    for name, current in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        p95, base_p95 = current["latency_ms"]["p95"], before["latency_ms"]["p95"]
+        if base_p95 and p95 > base_p95 * (1 + max_regression):
+            regressions.append(f"{name}: p95 {base_p95}ms -> {p95}ms")
+        rps, base_rps = current["throughput_rps"], before["throughput_rps"]
+        if base_rps and rps < base_rps * (1 - max_regression):
+            regressions.append(f"{name}: throughput {base_rps}/s -> {rps}/s")
+    return regressions
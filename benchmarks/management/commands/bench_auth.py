@@ -0,0 +1,56 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import AccessToken
+
+from benchmarks.payloads import time_op
+from craftconnect.authentication import CachedJWTAuthentication, verified_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request JWT authentication overhead: simplejwt's "
+        "JWTAuthentication against CachedJWTAuthentication (first and repeat "
+        "requests with a token), plus the second decode get_logged_in_user used "
+        "to do. Token handling only: the user lookup is stubbed out."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per measurement.")
+
+    def handle(self, *args, **options):
+        seconds = options["seconds"]
+        user = User(id=1, username="bench", email="bench@example.com")
+        token = AccessToken.for_user(user)
+        token["email_address"] = user.email
+        raw = str(token)
+        request = Request(RequestFactory().get("/api/users/me/", HTTP_AUTHORIZATION=f"Bearer {raw}"))
+
+        def authenticate(auth_class):
+            auth = auth_class()
+            auth.get_user = lambda validated_token: user
+            return lambda: auth.authenticate(request)
+
+        def cold():
+            verified_tokens.clear()
+            cached()
+
+        cached = authenticate(CachedJWTAuthentication)
+        plain_us = time_op(authenticate(JWTAuthentication), seconds)
+        with override_settings(JWT_CACHE=True):
+            cold_us = time_op(cold, seconds)
+            cached_us = time_op(cached, seconds)
+        decode_us = time_op(lambda: TokenBackend(algorithm="HS256").decode(raw, verify=False), seconds)
+
+        self.stdout.write(json.dumps({
+            "jwt_authentication_us": round(plain_us, 2),
+            "cached_first_request_us": round(cold_us, 2),
+            "cached_repeat_request_us": round(cached_us, 2),
+            "speedup": round(plain_us / cached_us, 1),
+            "removed_second_decode_us": round(decode_us, 2),
+        }, indent=2))
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from benchmarks.payloads import api_payloads, time_op
+from craftconnect import compression, fastjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure response compression on representative payloads (list_jobs, "
+        "assessments, the openapi.json schema): compressed size and CPU time per "
+        "gzip level and brotli quality, against the cost of a memoized body "
+        "(ETag hash and lookup)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=500, help="Jobs in the list_jobs payload.")
+        parser.add_argument("--seconds", type=float, default=0.5, help="Time budget per measurement.")
+
+    def handle(self, *args, **options):
+        seconds = options["seconds"]
+        bodies = {name: fastjson.dumps(data) for name, data in api_payloads(options["jobs"]).items()}
+        schema = Path(settings.BASE_DIR) / "staticfiles" / "openapi.json"
+        if schema.exists():
+            bodies["openapi.json"] = schema.read_bytes()
+
+        settings_for = {("gzip", level): {"COMPRESSION_GZIP_LEVEL": level} for level in (1, 6, 9)}
+        if compression.brotli is not None:
+            settings_for.update({("br", quality): {"COMPRESSION_BROTLI_QUALITY": quality} for quality in (1, 5, 11)})
+
+        report = {"brotli": compression.brotli is not None, "payloads": {}}
+        for name, body in bodies.items():
+            result = {"bytes": len(body)}
+            for (encoding, level), overrides in settings_for.items():
+                with override_settings(**overrides):
+                    compressed = compression.compress(body, encoding)
+                    us = time_op(lambda: compression.compress(body, encoding), seconds)
+                result[f"{encoding}-{level}"] = {
+                    "bytes": len(compressed),
+                    "ratio": round(len(body) / len(compressed), 2),
+                    "us": round(us, 1),
+                }
+
+            # What a memo hit costs instead: hash the body, look it up
+            memo = compression.CompressedBodies()
+            memo.put((compression.body_etag(body), "gzip"), compression.compress(body, "gzip"))
+            result["memo_hit_us"] = round(
+                time_op(lambda: memo.get((compression.body_etag(body), "gzip")), seconds), 1
+            )
+            report["payloads"][name] = result
+
+        self.stdout.write(json.dumps(report, indent=2))
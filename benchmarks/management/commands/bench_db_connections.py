@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from benchmarks.load import percentile
+
+# Environment for each connection mode; read by settings.py in the child process
+MODES = {
+    "new": {"DATABASE_POOL": "0", "DATABASE_CONN_MAX_AGE": "0"},
+    "persistent": {"DATABASE_POOL": "0", "DATABASE_CONN_MAX_AGE": "600"},
+    "pool": {"DATABASE_POOL": "1"},
+}
+
+QUERY = "SELECT id, name FROM users_tradecategory ORDER BY name LIMIT 20"
+
+
+class Command(BaseCommand):
+    help = (
+        "Connection setup cost under burst load against PostgreSQL: a burst of "
+        "threads each serving short requests (one query between request_started "
+        "and request_finished, like a view) with a new connection per request, "
+        "persistent connections, and the psycopg pool (DATABASE_POOL=1). Each "
+        "mode runs in its own process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=50, help="Concurrent request threads in the burst.")
+        parser.add_argument("--requests", type=int, default=20, help="Requests per thread.")
+        parser.add_argument("--modes", default=",".join(MODES))
+        parser.add_argument("--child", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["child"]:
+            self.stdout.write(json.dumps(self.burst(options["threads"], options["requests"])))
+            return
+
+        if connection.vendor != "postgresql":
+            raise CommandError("This benchmark needs DATABASE_URL to point at a PostgreSQL server.")
+
+        report = {"threads": options["threads"], "requests_per_thread": options["requests"], "modes": {}}
+        for mode in options["modes"].split(","):
+            if mode not in MODES:
+                raise CommandError(f"Unknown mode '{mode}' (choose from {', '.join(MODES)})")
+            result = subprocess.run(
+                [sys.executable, "manage.py", "bench_db_connections", "--child", mode,
+                 "--threads", str(options["threads"]), "--requests", str(options["requests"])],
+                cwd=settings.BASE_DIR, env={**os.environ, **MODES[mode]}, capture_output=True, text=True,
+            )
+            if result.returncode:
+                raise CommandError(f"{mode} run failed:\n{result.stderr}")
+            report["modes"][mode] = json.loads(result.stdout.strip().splitlines()[-1])
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def burst(self, threads, requests):
+        opened = []
+        connection_created.connect(lambda sender, connection, **kwargs: opened.append(1), weak=False)
+
+        barrier = threading.Barrier(threads)
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            barrier.wait()
+            mine = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute(QUERY)
+                        cursor.fetchall()
+                except Exception as e:
+                    with lock:
+                        errors.append(type(e).__name__)
+                finally:
+                    request_finished.send(sender=self.__class__)
+                mine.append(time.perf_counter() - started)
+            connection.close()
+            with lock:
+                latencies.extend(mine)
+
+        pool = getattr(connection, "pool", None)
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        wall = time.perf_counter() - started
+
+        latencies.sort()
+        report = {
+            "wall_seconds": round(wall, 3),
+            "requests_per_second": round(len(latencies) / wall, 1),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50) * 1000, 3),
+                "p95": round(percentile(latencies, 0.95) * 1000, 3),
+                "p99": round(percentile(latencies, 0.99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3),
+            },
+            "errors": len(errors),
+        }
+        if pool is not None:
+            # connection_created fires on every pool checkout; the pool counts real connects
+            stats = pool.get_stats()
+            report["server_connections_opened"] = stats.get("connections_num", 0)
+            report["connect_ms_total"] = stats.get("connections_ms", 0)
+            report["pool_wait_ms_total"] = stats.get("requests_wait_ms", 0)
+            report["pool_queued_requests"] = stats.get("requests_queued", 0)
+            report["pool_max_size"] = stats.get("pool_max", 0)
+        else:
+            report["server_connections_opened"] = len(opened)
+        return report
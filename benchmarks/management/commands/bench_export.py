@@ -0,0 +1,101 @@
+import json
+import os
+import resource
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from assessments.exports import ASSESSMENT_COLUMNS, assessment_export
+from assessments.models import Assessment
+from benchmarks.fake_groq import fake_questions
+from craftconnect.exports import ROWS_PER_WRITE, encode, export_rows
+from users.models import Artisan
+
+BENCH_TRADE = "bench-export-trade"
+
+
+def rss_mb():
+    """Current resident set size (peak size where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure memory of the streaming assessment export against loading the "
+        "queryset first, as the admin does: loads synthetic assessments (with "
+        "question/answer JSON), exports them both ways to /dev/null and samples RSS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200_000)
+        parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--samples", type=int, default=10, help="RSS samples taken during each export.")
+        parser.add_argument("--skip-naive", action="store_true", help="Only measure the streaming export.")
+        parser.add_argument("--keep", action="store_true")
+
+    def handle(self, *args, **options):
+        artisan, _ = Artisan.objects.get_or_create(
+            email_address="bench-export@example.com",
+            defaults=dict(first_name="Bench", last_name="Export", phone_number="08000000000",
+                          password="bench", location="Lagos", language="English"),
+        )
+        existing = Assessment.objects.filter(trade_category=BENCH_TRADE).count()
+        self.load(artisan, options["rows"] - existing, options["batch_size"])
+
+        querysets = assessment_export(trade=BENCH_TRADE)
+        every = max(options["rows"] // options["samples"], 1)
+        report = {"vendor": connection.vendor, "rows": options["rows"], "format": options["format"]}
+        report["streaming"] = self.measure(
+            lambda: encode(export_rows(querysets, ASSESSMENT_COLUMNS), ASSESSMENT_COLUMNS, options["format"]),
+            every,
+        )
+        if not options["skip_naive"]:
+            def naive():
+                rows = list(querysets[0].values_list(*[lookup for _, lookup in ASSESSMENT_COLUMNS]))
+                return encode(iter(rows), ASSESSMENT_COLUMNS, options["format"])
+            report["load_then_write"] = self.measure(naive, every)
+
+        if not options["keep"]:
+            Assessment.objects.filter(trade_category=BENCH_TRADE).delete()
+            artisan.delete()
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def load(self, artisan, count, batch_size):
+        questions = fake_questions()["questions"]
+        answers = [q["answer"] for q in questions]
+        feedback = json.dumps({"summary": "Solid fundamentals", "wrong_questions": [2]})
+        while count > 0:
+            size = min(batch_size, count)
+            with transaction.atomic():
+                Assessment.objects.bulk_create([
+                    Assessment(artisan=artisan, trade_category=BENCH_TRADE, questions=questions,
+                               answers=answers, ai_feedback=feedback, score=80.0, status="completed")
+                    for _ in range(size)
+                ])
+            count -= size
+
+    def measure(self, chunks, every):
+        """RSS before, its growth sampled every `every` rows, and the bytes written."""
+        before = rss_mb()
+        samples, written, next_sample = [], 0, every
+        started = time.perf_counter()
+        with open(os.devnull, "wb") as out:
+            for n, chunk in enumerate(chunks()):
+                out.write(chunk)
+                written += len(chunk)
+                if n * ROWS_PER_WRITE >= next_sample:
+                    samples.append(round(rss_mb() - before, 1))
+                    next_sample += every
+        return {
+            "seconds": round(time.perf_counter() - started, 2),
+            "mb_written": round(written / 2**20, 1),
+            "rss_before_mb": round(before, 1),
+            "rss_growth_mb_samples": samples,
+            "rss_growth_mb_peak": max(samples + [round(rss_mb() - before, 1)]),
+        }
@@ -0,0 +1,75 @@
+import io
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.fake_groq import fake_completion, fake_questions
+from benchmarks.payloads import api_payloads, feed_entries, time_op
+from craftconnect import fastjson
+from jobs.serializers import JobFeedSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare JSON throughput of DRF's stdlib JSONRenderer/JSONParser with the "
+        "orjson-backed FastJSONRenderer/FastJSONParser on list_jobs and assessment "
+        "payloads, and of fastjson.loads against json.loads on Groq responses. "
+        "Checks that both produce identical output."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=500, help="Jobs in the list_jobs payload.")
+        parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per measurement.")
+
+    def handle(self, *args, **options):
+        if fastjson.orjson is None:
+            raise CommandError("orjson is not installed: nothing to compare against.")
+        self.seconds = options["seconds"]
+
+        report = {"orjson": fastjson.orjson.__version__, "payloads": {}}
+        for name, data in api_payloads(options["jobs"]).items():
+            expected = JSONRenderer().render(data)
+            if fastjson.FastJSONRenderer().render(data) != expected:
+                raise CommandError(f"{name}: FastJSONRenderer output differs from JSONRenderer")
+            report["payloads"][name] = {
+                "bytes": len(expected),
+                "render": self.compare(
+                    lambda: JSONRenderer().render(data),
+                    lambda: fastjson.FastJSONRenderer().render(data),
+                ),
+                "parse": self.compare(
+                    lambda: JSONParser().parse(io.BytesIO(expected)),
+                    lambda: fastjson.FastJSONParser().parse(io.BytesIO(expected)),
+                ),
+            }
+
+        body = json.dumps(fake_completion("Generate EXACTLY 5 questions")).encode()
+        content = json.dumps(fake_questions())
+        report["payloads"]["groq_response"] = {
+            "bytes": len(body),
+            "parse": self.compare(lambda: json.loads(body), lambda: fastjson.loads(body)),
+        }
+        report["payloads"]["llm_output"] = {
+            "bytes": len(content),
+            "parse": self.compare(lambda: json.loads(content), lambda: fastjson.loads(content)),
+        }
+
+        # Serializer time for the same list_jobs payload, for scale: the
+        # renderer is only part of a response
+        entries = feed_entries(options["jobs"])
+        report["list_jobs_serializer_us"] = round(time_op(lambda: JobFeedSerializer(entries, many=True).data, self.seconds), 1)
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def compare(self, stdlib, fast):
+        stdlib_us = time_op(stdlib, self.seconds)
+        with override_settings(FAST_JSON=True):
+            fast_us = time_op(fast, self.seconds)
+        return {
+            "stdlib_us": round(stdlib_us, 2),
+            "orjson_us": round(fast_us, 2),
+            "speedup": round(stdlib_us / fast_us, 2),
+        }
@@ -0,0 +1,76 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from rest_framework.request import Request
+
+from benchmarks.payloads import time_op
+from craftconnect import ratelimit
+
+
+def hammer(path, calls, results):
+    with override_settings(RATE_LIMIT_FILE=path):
+        buckets = ratelimit.SharedBuckets()
+        pid = os.getpid()
+        started = time.perf_counter()
+        for n in range(calls):
+            buckets.take([(f"view|ip|{pid}-{n % 1000}", "ip", 10**9, 1.0)])
+        results.put(time.perf_counter() - started)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure rate limiter overhead: one bucket update, an ip+user check, the "
+        "whole @rate_limit wrapper around a no-op view, and throughput with "
+        "several processes contending for the shared table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per measurement.")
+        parser.add_argument("--processes", type=int, default=4, help="Processes in the contention run.")
+        parser.add_argument("--calls", type=int, default=20000, help="Checks per process in the contention run.")
+
+    def handle(self, *args, **options):
+        seconds = options["seconds"]
+        path = os.path.join(tempfile.mkdtemp(prefix="craftconnect-ratelimit-"), "buckets")
+        report = {}
+        with override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMIT_FILE=path):
+            buckets = ratelimit.SharedBuckets()
+            one = [("view|ip|127.0.0.1", "ip", 10**9, 1.0)]
+            two = one + [("view|user|1", "user", 10**9, 1.0)]
+            report["take_one_us"] = round(time_op(lambda: buckets.take(one), seconds), 2)
+            report["take_ip_and_user_us"] = round(time_op(lambda: buckets.take(two), seconds), 2)
+
+            request = Request(RequestFactory().post("/api/users/login/"))
+            plain = lambda request: None
+            limited = ratelimit.rate_limit(ip="1000000000/s", user="1000000000/s")(plain)
+            with mock.patch.object(ratelimit, "buckets", buckets):
+                report["decorator_us"] = round(
+                    time_op(lambda: limited(request), seconds) - time_op(lambda: plain(request), seconds), 2
+                )
+
+        processes, calls = options["processes"], options["calls"]
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [
+            context.Process(target=hammer, args=(path, calls, results))
+            for _ in range(processes)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        elapsed = [results.get() for _ in workers]
+        wall = time.perf_counter() - started
+        for worker in workers:
+            worker.join()
+        report["contention"] = {
+            "processes": processes,
+            "checks_per_second": round(processes * calls / wall),
+            "mean_us_per_check": round(sum(elapsed) / (processes * calls) * 1_000_000, 2),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
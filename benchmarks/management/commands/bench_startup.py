@@ -0,0 +1,102 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Packages from requirements.txt that must never be imported by a web worker
+HEAVY_MODULES = (
+    "torch", "transformers", "accelerate", "tokenizers", "safetensors",
+    "huggingface_hub", "sympy", "networkx", "numpy", "groq", "psutil",
+)
+
+# Runs in a fresh interpreter, like a gunicorn worker: import the WSGI app,
+# then serve the first API request and the docs schema through it.
+BOOT_SCRIPT = r"""
+import io, json, os, resource, sys, time
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 2)
+    except OSError:  # Not Linux: peak RSS instead
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def get(path, query=""):
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query,
+        "SERVER_NAME": "localhost", "SERVER_PORT": "80", "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr, "HTTP_HOST": "localhost",
+    }
+    status = []
+    started = time.perf_counter()
+    body = b"".join(application(environ, lambda s, h, e=None: status.append(s)))
+    return round((time.perf_counter() - started) * 1000, 2), status[0].split()[0], len(body)
+
+started = time.perf_counter()
+from craftconnect.wsgi import application
+report = {"import_ms": round((time.perf_counter() - started) * 1000, 2), "rss_after_import_mb": rss_mb()}
+
+report["first_request_ms"], _, _ = get("/api/users/trade-categories/")
+report["rss_after_first_request_mb"] = rss_mb()
+
+spec_url = %(spec_url)r
+if spec_url:
+    report["prebuilt_schema_ms"], report["prebuilt_schema_status"], _ = get(spec_url)
+report["rss_before_schema_mb"] = rss_mb()
+report["runtime_schema_ms"], report["runtime_schema_status"], _ = get("/swagger/", "format=openapi")
+report["rss_after_runtime_schema_mb"] = rss_mb()
+
+report["modules"] = len(sys.modules)
+report["heavy_modules"] = sorted(m for m in %(heavy)r if m in sys.modules)
+print(json.dumps(report))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker boot: import time and RSS of the WSGI app in fresh "
+        "interpreters, first request latency, and the cost of the docs schema "
+        "served prebuilt (static file) versus generated at runtime. Fails if any "
+        "heavy optional package (torch, transformers, ...) gets imported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to boot.")
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        script = BOOT_SCRIPT % {
+            "spec_url": settings.SWAGGER_SETTINGS.get("SPEC_URL"),
+            "heavy": HEAVY_MODULES,
+        }
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "craftconnect.settings")}
+
+        runs = []
+        for _ in range(options["runs"]):
+            result = subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if result.returncode:
+                raise CommandError(f"Boot failed:\n{result.stderr}")
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        report = {"runs": len(runs)}
+        for key, value in runs[0].items():
+            if isinstance(value, (int, float)) and not key.endswith("_status"):
+                report[key] = round(statistics.median(run[key] for run in runs), 2)
+            else:
+                report[key] = value
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+        if report["heavy_modules"]:
+            raise CommandError(f"Heavy modules imported at boot: {', '.join(report['heavy_modules'])}")
@@ -0,0 +1,81 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from benchmarks.load import HttpTransport, InProcessTransport, compare
+from benchmarks.replay import Replay, read_capture
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay traffic captured by TrafficCaptureMiddleware (TRAFFIC_CAPTURE_FILE) "
+        "against a running server, at the captured rate or scaled, and report latency "
+        "per endpoint against the server time recorded at capture. Redacted fields are "
+        "sent as '<redacted>', so logins and registrations fail as they would with bad "
+        "input; pass --token to authenticate the requests that were authenticated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("capture", help="JSONL file written by TrafficCaptureMiddleware.")
+        parser.add_argument("--target", help="Base URL of the server to replay against, e.g. http://127.0.0.1:8000")
+        parser.add_argument(
+            "--in-process", action="store_true",
+            help="Replay through Django in this process instead, against the configured database "
+                 "(the captured writes are applied to it).",
+        )
+        parser.add_argument("--rate", type=float, default=1.0,
+                            help="Speed-up of the captured timeline: 2 replays twice as fast, 0 back to back.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at most.")
+        parser.add_argument("--limit", type=int, help="Replay only the first N requests.")
+        parser.add_argument("--token", help="Access token sent with requests that were authenticated.")
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+        parser.add_argument("--compare", help="Earlier replay report to compare against.")
+        parser.add_argument(
+            "--max-regression", type=float, default=0.2,
+            help="Allowed p95 increase / throughput drop against --compare, as a fraction.",
+        )
+
+    def handle(self, *args, **options):
+        if bool(options["target"]) == options["in_process"]:
+            raise CommandError("Pass either --target or --in-process.")
+        if options["rate"] < 0:
+            raise CommandError("--rate cannot be negative.")
+
+        records, skipped = read_capture(options["capture"], options["limit"])
+        if not records:
+            raise CommandError(f"No replayable requests in {options['capture']}.")
+
+        if options["target"]:
+            factory = lambda: HttpTransport(options["target"])
+        else:
+            factory = InProcessTransport
+        replay = Replay(factory, records, options["rate"], options["concurrency"], options["token"])
+        # Replayed traffic comes from one address: rate limits would refuse most of it
+        with override_settings(RATE_LIMIT_ENABLED=False):
+            wall = replay.run()
+
+        report = replay.report(wall)
+        report["config"] = {
+            "capture": options["capture"],
+            "mode": "http" if options["target"] else "in-process",
+            "target": options["target"],
+            "rate": options["rate"],
+            "concurrency": options["concurrency"],
+            "skipped": skipped,
+            "captured_seconds": round(records[-1]["ts"] - records[0]["ts"], 3),
+        }
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+            regressions = compare(report, baseline, options["max_regression"])
+            if regressions:
+                raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+            self.stderr.write("No regressions against baseline.")
@@ -0,0 +1,183 @@
+import json
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from benchmarks.db import create_benchmark_db, destroy_benchmark_db
+from benchmarks.fake_groq import FakeGroqServer
+from craftconnect.cache import tiered_cache
+from benchmarks.load import (
+    DEFAULT_MIX, HttpTransport, InProcessTransport, LoadRun, compare, parse_mix, summarize,
+)
+
+BENCH_TRADE = "Benchmark Trade"
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the API with a weighted mix of register / login / start / submit / "
+        "list-jobs traffic and report throughput and p50/p95/p99 latency per endpoint "
+        "as JSON. By default the project runs in-process against a throwaway copy of "
+        "the configured database (SQLite or PostgreSQL) with Groq replaced by a local "
+        "fake server; --target benchmarks a running server instead (start it with "
+        "GROQ_BASE_URL pointing at `manage.py run_fake_groq`)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=8, help="Virtual users (threads).")
+        parser.add_argument("--requests", type=int, default=500, help="Total measured requests.")
+        parser.add_argument("--duration", type=float, help="Run for this many seconds instead of --requests.")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Endpoint weights (default: {DEFAULT_MIX}).")
+        parser.add_argument("--warmup-artisans", type=int, default=20, help="Artisans registered before measuring.")
+        parser.add_argument("--jobs", type=int, default=200, help="Open jobs seeded for list_jobs (in-process only).")
+        parser.add_argument("--groq-latency", type=float, default=0.05, help="Fake Groq response time in seconds.")
+        parser.add_argument("--groq-jitter", type=float, default=0.0)
+        parser.add_argument("--groq-error-rate", type=float, default=0.0)
+        parser.add_argument("--target", help="Base URL of a running server, e.g. http://127.0.0.1:8000")
+        parser.add_argument(
+            "--use-configured-db", action="store_true",
+            help="Write straight into the configured database instead of a throwaway test database.",
+        )
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+        parser.add_argument("--compare", help="Baseline report to compare against.")
+        parser.add_argument(
+            "--max-regression", type=float, default=0.2,
+            help="Allowed p95 increase / throughput drop against --compare, as a fraction.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options["target"]:
+            report = self.run_remote(mix, options)
+        else:
+            report = self.run_in_process(mix, options)
+
+        report["config"] = {
+            "mode": "http" if options["target"] else "in-process",
+            "concurrency": options["concurrency"],
+            "requests": None if options["duration"] else options["requests"],
+            "duration": options["duration"],
+            "mix": mix,
+            "groq_latency": options["groq_latency"],
+            "groq_jitter": options["groq_jitter"],
+            "groq_error_rate": options["groq_error_rate"],
+            "debug": settings.DEBUG,
+        }
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+            regressions = compare(report, baseline, options["max_regression"])
+            if regressions:
+                raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+            self.stderr.write("No regressions against baseline.")
+
+    # --------------------------------------------------------
+    # IN-PROCESS
+    # --------------------------------------------------------
+    def run_in_process(self, mix, options):
+        groq = FakeGroqServer(
+            latency=options["groq_latency"],
+            jitter=options["groq_jitter"],
+            error_rate=options["groq_error_rate"],
+        ).start()
+
+        old_name = None
+        private_cache = override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": tempfile.mkdtemp(prefix="craftconnect-bench-cache-"),
+        }})
+        if not options["use_configured_db"]:
+            old_name = create_benchmark_db()
+            # Entries cached against an earlier throwaway database must not be served
+            private_cache.enable()
+            tiered_cache.clear_local()
+
+        try:
+            # Every simulated client shares one address: rate limits would
+            # refuse most of the load (start the server with
+            # RATE_LIMIT_ENABLED=0 for --target runs too)
+            with mock.patch("assessments.groq_client.BASE_URL", groq.url), \
+                    override_settings(RATE_LIMIT_ENABLED=False):
+                trade = self.seed(options["jobs"])
+                run = LoadRun(InProcessTransport, trade, mix, seed=options["seed"])
+                report = self.drive(run, options)
+            report["vendor"] = connection.vendor
+            report["groq_calls"] = groq.calls
+        finally:
+            groq.stop()
+            if old_name is not None:
+                destroy_benchmark_db(old_name)
+                private_cache.disable()
+                tiered_cache.clear_local()
+        return report
+
+    def seed(self, jobs):
+        from jobs.feed import rebuild_job_feed
+        from jobs.models import JobPosting
+        from users.models import TradeCategory
+
+        category, _ = TradeCategory.objects.get_or_create(name=BENCH_TRADE)
+        client, _ = User.objects.get_or_create(username="bench-client")
+        JobPosting.objects.bulk_create([
+            JobPosting(
+                client=client,
+                trade_category=category,
+                title=f"Benchmark job {n}",
+                description="Seeded by run_benchmark",
+                location="Lagos",
+            )
+            for n in range(jobs)
+        ])
+        rebuild_job_feed()
+        return {"id": category.id, "name": category.name}
+
+    # --------------------------------------------------------
+    # HTTP
+    # --------------------------------------------------------
+    def run_remote(self, mix, options):
+        target = options["target"]
+        transport = HttpTransport(target)
+        try:
+            status, categories = transport.request("GET", "/api/users/trade-categories/")
+            if status != 200:
+                raise CommandError(f"{target} answered {status} for the trade category list")
+            trade = next((c for c in categories if c["name"] == BENCH_TRADE), None)
+            if trade is None:
+                status, data = transport.request("POST", "/api/users/trade-categories/add/", {"name": BENCH_TRADE})
+                if status != 201:
+                    raise CommandError(f"Could not create the benchmark trade category: {data}")
+                trade = data["data"]
+        finally:
+            transport.close()
+
+        run = LoadRun(lambda: HttpTransport(target), trade, mix, seed=options["seed"])
+        report = self.drive(run, options)
+        report["target"] = target
+        return report
+
+    def drive(self, run, options):
+        run.warm_up(options["warmup_artisans"])
+        self.stderr.write(f"Warm-up done ({len(run.artisans)} artisans), measuring...")
+        wall, _ = run.run(
+            options["concurrency"],
+            requests=None if options["duration"] else options["requests"],
+            duration=options["duration"],
+        )
+        return summarize(run, wall)
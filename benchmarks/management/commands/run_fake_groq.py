@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks.fake_groq import FakeGroqServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a local fake Groq chat completions API. Point a server at it with "
+        "GROQ_BASE_URL=<printed url> to load test without the real upstream."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+        parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay, 0..jitter seconds.")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with 503.")
+
+    def handle(self, *args, **options):
+        server = FakeGroqServer(
+            options["host"], options["port"],
+            latency=options["latency"], jitter=options["jitter"], error_rate=options["error_rate"],
+        )
+        self.stdout.write(f"Fake Groq listening on {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,61 @@
+# Representative API payloads and a timing helper shared by the
+# serialization benchmarks (bench_json, bench_compression). Built from
+# unsaved model instances, so no database is needed.
+
+import datetime
+import json
+import time
+from decimal import Decimal
+
+from django.utils import timezone
+
+from assessments.models import Assessment
+from assessments.serializers import AssessmentSerializer
+from benchmarks.fake_groq import fake_questions
+from jobs.models import JobFeedEntry
+from jobs.serializers import JobFeedSerializer
+
+
+def feed_entries(count):
+    now = timezone.now()
+    return [
+        JobFeedEntry(
+            job_id=n, client_id=n % 50, client_name=f"Client {n % 50}",
+            trade_category_id=n % 12, trade_category_name=f"Trade {n % 12}",
+            title=f"Job {n}: fix the kitchen sink", description="Leaking pipe under the sink, needs a plumber. " * 3,
+            budget=Decimal("15000.00") + n, location="Lagos",
+            created_at=now - datetime.timedelta(minutes=n),
+        )
+        for n in range(count)
+    ]
+
+
+def api_payloads(jobs):
+    """Response data of list_jobs (with `jobs` jobs), start_assessment and submit_assessment."""
+    now = timezone.now()
+    questions = fake_questions()["questions"]
+    assessment = Assessment(
+        id=1, artisan_id=1, trade_category="Plumber", questions=questions,
+        answers={str(n): "A" for n in range(5)}, score=80.0, status="completed",
+        ai_feedback=json.dumps({"summary": "Good", "wrong_questions": [2]}),
+        created_at=now, updated_at=now,
+    )
+    return {
+        "list_jobs": JobFeedSerializer(feed_entries(jobs), many=True).data,
+        "assessment_start": {"message": "Assessment generated successfully", "assessment_id": 1, "questions": questions},
+        "assessment_submit": {"message": "Assessment submitted.", "result": AssessmentSerializer(assessment).data},
+    }
+
+
+def time_op(op, seconds):
+    """Mean microseconds per call of op() over about `seconds`."""
+    op()
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for _ in range(10):
+            op()
+        calls += 10
+        elapsed = time.perf_counter() - started
+        if elapsed >= seconds:
+            return elapsed / calls * 1_000_000
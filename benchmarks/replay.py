@@ -0,0 +1,138 @@
+# Replay of traffic captured by benchmarks.capture, for replay_traffic.
+#
+# Requests are issued in capture order at their original spacing divided
+# by `rate` (0: back to back) by a fixed pool of `concurrency` workers.
+# When every worker is busy, requests wait in a queue: the time they spend
+# there is reported as schedule lag, and a large lag means the replay did
+# not keep up with the captured rate. Latencies are grouped by method and
+# URL route and set against the server time recorded at capture.
+
+import json
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+
+from .load import percentile
+
+
+def read_capture(path, limit=None):
+    """(records in arrival order, number of records that cannot be replayed)."""
+    records, skipped = [], 0
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            # Bodies kept by size only (uploads, forms) cannot be rebuilt;
+            # streamed responses (event streams) would never finish
+            if (record["body_bytes"] and record["body"] is None) or record["response_bytes"] is None:
+                skipped += 1
+                continue
+            records.append(record)
+    records.sort(key=lambda record: record["ts"])
+    return (records[:limit] if limit else records), skipped
+
+
+def endpoint(record):
+    return f"{record['method']} /{record['route']}" if record["route"] else f"{record['method']} {record['path']}"
+
+
+def latency_stats(seconds):
+    ordered = sorted(seconds)
+    return {
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99": round(percentile(ordered, 0.99) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+class Replay:
+    def __init__(self, transport_factory, records, rate=1.0, concurrency=8, token=None):
+        self.transport_factory = transport_factory
+        self.records = records
+        self.rate = rate
+        self.concurrency = concurrency
+        self.token = token
+        self.lock = threading.Lock()
+        self.replayed = defaultdict(list)
+        self.captured = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.mismatches = Counter()
+        self.lag = []
+
+    def issue(self, transport, record):
+        path = record["path"] + ("?" + record["query"] if record["query"] else "")
+        headers = {"Authorization": f"Bearer {self.token}"} if record["authenticated"] and self.token else None
+        started = time.perf_counter()
+        try:
+            status = transport.request(record["method"], path, record["body"], headers=headers)[0]
+        except Exception as exc:
+            status = type(exc).__name__
+        return status, time.perf_counter() - started
+
+    def worker(self, jobs):
+        transport = self.transport_factory()
+        try:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+                record, due = job
+                lag = time.perf_counter() - due
+                status, elapsed = self.issue(transport, record)
+                name = endpoint(record)
+                with self.lock:
+                    self.lag.append(max(lag, 0))
+                    self.replayed[name].append(elapsed)
+                    self.captured[name].append(record["duration_ms"] / 1000)
+                    self.statuses[name][str(status)] += 1
+                    if str(status) != str(record["status"]):
+                        self.mismatches[name] += 1
+        finally:
+            transport.close()
+
+    def run(self):
+        jobs = queue.Queue()
+        threads = [threading.Thread(target=self.worker, args=(jobs,)) for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+
+        first = self.records[0]["ts"] if self.records else 0
+        started = time.perf_counter()
+        for record in self.records:
+            due = started + ((record["ts"] - first) / self.rate if self.rate else 0)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            jobs.put((record, due))
+        for _ in threads:
+            jobs.put(None)
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def report(self, wall):
+        """Shaped like load.summarize() (so load.compare() works on it), plus capture deltas."""
+        endpoints = {}
+        for name in sorted(self.replayed):
+            replayed, captured = latency_stats(self.replayed[name]), latency_stats(self.captured[name])
+            endpoints[name] = {
+                "count": len(self.replayed[name]),
+                "throughput_rps": round(len(self.replayed[name]) / wall, 2) if wall else 0,
+                "latency_ms": replayed,
+                "captured_latency_ms": captured,
+                "delta_ms": {key: round(replayed[key] - captured[key], 3) for key in ("p50", "p95", "p99")},
+                "statuses": dict(self.statuses[name]),
+                "status_mismatches": self.mismatches[name],
+            }
+        total = sum(len(samples) for samples in self.replayed.values())
+        return {
+            "wall_seconds": round(wall, 3),
+            "requests": total,
+            "throughput_rps": round(total / wall, 2) if wall else 0,
+            "schedule_lag_ms": latency_stats(self.lag) if self.lag else None,
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import TradeCategory
+from .capture import REDACTED, sanitize, sanitize_query
+from .load import InProcessTransport
+from .replay import Replay, read_capture
+
+
+class TrafficCaptureTests(TestCase):
+    def setUp(self):
+        TradeCategory.objects.create(name="Tailor")
+        self.path = os.path.join(tempfile.mkdtemp(), "traffic.jsonl")
+        self.enterContext(override_settings(TRAFFIC_CAPTURE_FILE=self.path, TRAFFIC_CAPTURE_SAMPLE_RATE=1.0))
+        self.api = APIClient()
+
+    def test_sanitize(self):
+        self.assertEqual(
+            sanitize({
+                "email_address": "a@b.c", "title": "Fix tap",
+                "operations": [{"op": "cancel", "job_id": 3, "Password": "x", "urgent": True}],
+                "answers": ["A", "C"],
+            }),
+            {
+                "email_address": REDACTED, "title": "xxxxxxx",
+                "operations": [{"op": "cancel", "job_id": 3, "Password": REDACTED, "urgent": True}],
+                "answers": ["A", "C"],
+            },
+        )
+        self.assertEqual(
+            sanitize_query("token=abc&limit=5&location=Yaba&status=open"),
+            "token=%3Credacted%3E&limit=5&location=xxxx&status=open",
+        )
+
+    def test_registration_keeps_no_personal_values(self):
+        body = {
+            "first_name": "Adaeze", "last_name": "Okonkwo", "business_name": "Adaeze Stitches",
+            "bio": "Bespoke tailoring since 2009", "location": "12 Allen Avenue, Ikeja",
+            "language": "Igbo", "phone_number": "08012345678", "email_address": "adaeze@example.com",
+            "password": "hunter22", "trade_category": TradeCategory.objects.get().id,
+        }
+        self.api.post("/api/users/artisan/register/", body, format="json")
+
+        captured = open(self.path).read()
+        for value in body.values():
+            if isinstance(value, str):
+                self.assertNotIn(value, captured)
+        for word in ("Adaeze", "Okonkwo", "Allen", "Ikeja", "Bespoke"):
+            self.assertNotIn(word, captured)
+        record = json.loads(captured)
+        self.assertEqual(set(record["body"]), set(body))
+        self.assertEqual(record["body"]["first_name"], "xxxxxx")
+        self.assertEqual(record["body"]["trade_category"], body["trade_category"])
+
+    def test_capture_and_replay(self):
+        self.api.post("/api/users/login/", {"email_address": "ada@example.com", "password": "secret"}, format="json")
+        self.api.get("/api/users/trade-categories/")
+        self.api.get("/admin/login/")
+
+        with open(self.path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([line["path"] for line in lines], ["/api/users/login/", "/api/users/trade-categories/"])
+        login = lines[0]
+        self.assertEqual(login["body"], {"email_address": REDACTED, "password": REDACTED})
+        self.assertEqual((login["route"], login["status"]), ("api/users/login/", 404))
+        self.assertNotIn("secret", open(self.path).read())
+
+        records, skipped = read_capture(self.path)
+        self.assertEqual((len(records), skipped), (2, 0))
+        with override_settings(TRAFFIC_CAPTURE_FILE=None):
+            replay = Replay(InProcessTransport, records, rate=0, concurrency=2)
+            report = replay.report(replay.run())
+        self.assertEqual(report["requests"], 2)
+        categories = report["endpoints"]["GET /api/users/trade-categories/"]
+        self.assertEqual((categories["statuses"], categories["status_mismatches"]), ({"200": 1}, 0))
+        self.assertIn("p95", categories["delta_ms"])
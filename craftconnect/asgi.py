@@ -13,4 +13,28 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'craftconnect.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up
+from django.urls import get_resolver  # noqa: E402
+from jobs.stream import job_events_websocket  # noqa: E402
+
+# Import every view module now rather than on the first request, so the
+# work happens once in the gunicorn master (--preload) and is shared by the
+# forked workers
+get_resolver().url_patterns
+
+WEBSOCKET_ROUTES = {
+    '/ws/jobs/': job_events_websocket,
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        handler = WEBSOCKET_ROUTES.get(scope['path'])
+        if handler is None:
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+        return await handler(scope, receive, send)
+
+    return await django_application(scope, receive, send)
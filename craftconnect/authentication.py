@@ -0,0 +1,56 @@
+# JWT authentication that verifies each access token once per process.
+#
+# simplejwt's JWTAuthentication checks the HMAC signature and decodes the
+# claims of the token on every request. CachedJWTAuthentication keeps the
+# validated token in an LRU keyed by its signature until the token's "exp",
+# so repeat requests with the same token skip both. A hit also compares the
+# whole raw token, so a reused signature with a different payload is
+# verified (and rejected) like any other token. The user is still loaded
+# (and checked to be active) on every request.
+#
+# Views read the claims from request.auth instead of decoding the
+# Authorization header again. The cached token object is shared between
+# requests: treat it as read-only.
+
+import time
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import metrics
+from .cache import LocalLRU
+
+jwt_cache_requests = metrics.registry.counter(
+    "craftconnect_jwt_cache_requests_total",
+    "Access token validations, by result (hit: verified before, miss: verified now).",
+    ("result",),
+)
+jwt_cache_entries = metrics.registry.gauge(
+    "craftconnect_jwt_cache_entries",
+    "Verified tokens held in this process.",
+)
+
+verified_tokens = LocalLRU(getattr(settings, "JWT_CACHE_MAX_ENTRIES", 10000))
+
+metrics.registry.add_collector(lambda: jwt_cache_entries.set(len(verified_tokens)))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        if not getattr(settings, "JWT_CACHE", True):
+            return super().get_validated_token(raw_token)
+
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        signature = raw_token.rpartition(b".")[2]
+        entry = verified_tokens.get(signature, time.time())
+        if entry is not None and entry[0] == raw_token:
+            jwt_cache_requests.inc(result="hit")
+            return entry[1]
+
+        token = super().get_validated_token(raw_token)
+        jwt_cache_requests.inc(result="miss")
+        expires = token.get("exp")
+        if expires:
+            verified_tokens.set(signature, (raw_token, token), expires)
+        return token
@@ -0,0 +1,288 @@
+# Two-tier cache for hot GET endpoints.
+#
+# Tier 1 is a small LRU in each process; tier 2 is Django's "default"
+# cache, shared by every worker (a file cache on the host by default, or
+# the database cache with CACHE_BACKEND=db so several hosts share it).
+#
+# Tags: an entry is stored under a key that includes the current version
+# of each of its tags ("artisan:42", "job:7", "jobs:feed", ...). Bumping
+# a tag (invalidate_tags, called from model signals and from bulk write
+# paths that bypass them) makes every entry carrying it unreachable at
+# once in both tiers; the orphans age out on their own.
+#
+# Stampedes: entries are kept for twice their TTL. Once the TTL has passed,
+# or slightly before (with a probability that grows as expiry nears and
+# with how long the value took to compute, "XFetch"), one request takes a
+# short lock and recomputes while the others keep serving the old value.
+# On a cold miss, requests that lose the lock wait briefly for the winner.
+
+import hashlib
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from rest_framework.response import Response
+
+from . import metrics
+
+TAG_PREFIX = "cc:tag:"
+LOCK_PREFIX = "cc:lock:"
+ENTRY_PREFIX = "cc:entry:"
+
+cache_requests = metrics.registry.counter(
+    "craftconnect_cache_requests_total",
+    "Two-tier cache lookups, by namespace and result: local_hit, shared_hit, "
+    "stale (expired value served while another request refreshes it) or miss (value computed).",
+    ("namespace", "result"),
+)
+cache_refreshes = metrics.registry.counter(
+    "craftconnect_cache_refreshes_total",
+    "Cached values recomputed, by namespace and reason (miss, expired, early).",
+    ("namespace", "reason"),
+)
+cache_local_entries = metrics.registry.gauge(
+    "craftconnect_cache_local_entries",
+    "Entries held in this process's LRU tier.",
+)
+
+
+class LocalLRU:
+    """Thread-safe LRU of key -> (value, keep_until)."""
+
+    def __init__(self, max_entries):
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key, now):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            value, keep_until = item
+            if keep_until <= now:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, keep_until):
+        with self.lock:
+            self.entries[key] = (value, keep_until)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class TieredCache:
+    def __init__(self):
+        self.local = LocalLRU(getattr(settings, "CACHE_LOCAL_MAX_ENTRIES", 1000))
+
+    @property
+    def shared(self):
+        return caches["default"]
+
+    # --------------------------------------------------------
+    # TAGS
+    # --------------------------------------------------------
+    def tag_versions(self, tags):
+        """Current version of each tag; tags never seen (or evicted) get a fresh one."""
+        if not tags:
+            return []
+        ttl = getattr(settings, "CACHE_LOCAL_TAG_TTL", 0)
+        now = time.time()
+        versions = {}
+        if ttl:
+            for tag in tags:
+                version = self.local.get(TAG_PREFIX + tag, now)
+                if version is not None:
+                    versions[tag] = version
+
+        missing = [tag for tag in tags if tag not in versions]
+        if missing:
+            found = self.shared.get_many([TAG_PREFIX + tag for tag in missing])
+            for tag in missing:
+                version = found.get(TAG_PREFIX + tag)
+                if version is None:
+                    # A fresh version (never "0"): an evicted tag must not
+                    # make entries from before its last bump reachable again
+                    version = new_version()
+                    if not self.shared.add(TAG_PREFIX + tag, version, None):
+                        version = self.shared.get(TAG_PREFIX + tag, version)
+                versions[tag] = version
+                if ttl:
+                    self.local.set(TAG_PREFIX + tag, version, now + ttl)
+        return [versions[tag] for tag in tags]
+
+    def bump(self, tags):
+        self.shared.set_many({TAG_PREFIX + tag: new_version() for tag in tags}, None)
+        for tag in tags:
+            self.local.delete(TAG_PREFIX + tag)
+
+    def invalidate_tags(self, *tags):
+        """
+        Make every entry carrying one of the tags unreachable. Inside a
+        transaction the bump is repeated after commit, so a request that
+        read the old rows meanwhile cannot leave them cached.
+        """
+        tags = [tag for tag in tags if tag]
+        if not tags:
+            return
+        self.bump(tags)
+        if connection.in_atomic_block:
+            transaction.on_commit(lambda: self.bump(tags))
+
+    # --------------------------------------------------------
+    # LOOKUP
+    # --------------------------------------------------------
+    def make_key(self, namespace, key, tags):
+        versions = self.tag_versions(list(tags))
+        raw = "|".join([namespace, key, *tags, *versions])
+        return ENTRY_PREFIX + hashlib.sha256(raw.encode()).hexdigest()
+
+    def get_or_set(self, namespace, key, compute, ttl, tags=()):
+        """
+        Cached value of compute() for (namespace, key). compute may raise
+        Uncacheable(value) to return a value without caching it.
+        """
+        full_key = self.make_key(namespace, key, tags)
+        now = time.time()
+
+        result = "local_hit"
+        entry = self.local.get(full_key, now)
+        if entry is None or entry[1] <= now:
+            # Missing or expired here: another process may have refreshed it
+            shared = self.shared.get(full_key)
+            if shared is not None and (entry is None or shared[1] > entry[1]):
+                entry = shared
+                self.local.set(full_key, entry, entry[1] + ttl)
+                result = "shared_hit"
+
+        if entry is not None:
+            value, expires, delta = entry
+            if now >= expires:
+                reason = "expired"
+            elif now - delta * self.beta() * math.log(1.0 - random.random()) >= expires:
+                reason = "early"
+            else:
+                reason = None
+            if reason is None or not self.acquire(full_key, delta):
+                cache_requests.inc(namespace=namespace, result="stale" if reason == "expired" else result)
+                return value
+        else:
+            if not self.acquire(full_key, 0):
+                entry = self.wait_for(full_key)
+                if entry is not None:
+                    self.local.set(full_key, entry, entry[1] + ttl)
+                    cache_requests.inc(namespace=namespace, result="shared_hit")
+                    return entry[0]
+            reason = "miss"
+
+        cache_requests.inc(namespace=namespace, result="miss")
+        try:
+            started = time.perf_counter()
+            value = compute()
+            entry = (value, time.time() + ttl, time.perf_counter() - started)
+            self.shared.set(full_key, entry, ttl * 2)
+            self.local.set(full_key, entry, entry[1] + ttl)
+            cache_refreshes.inc(namespace=namespace, reason=reason)
+            return value
+        finally:
+            self.shared.delete(LOCK_PREFIX + full_key)
+
+    def beta(self):
+        return getattr(settings, "CACHE_EARLY_REFRESH_BETA", 1.0)
+
+    def acquire(self, full_key, delta):
+        # Held at most a few compute times; a crashed holder cannot block refreshes for long
+        timeout = max(5, int(delta * 4) + 1)
+        return self.shared.add(LOCK_PREFIX + full_key, 1, timeout)
+
+    def wait_for(self, full_key):
+        deadline = time.monotonic() + getattr(settings, "CACHE_STAMPEDE_WAIT", 2.0)
+        while time.monotonic() < deadline:
+            time.sleep(0.02)
+            entry = self.shared.get(full_key)
+            if entry is not None:
+                return entry
+            if self.shared.get(LOCK_PREFIX + full_key) is None:
+                return None
+        return None
+
+    def clear_local(self):
+        self.local.clear()
+
+
+class Uncacheable(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+def new_version():
+    return os.urandom(6).hex()
+
+
+tiered_cache = TieredCache()
+invalidate_tags = tiered_cache.invalidate_tags
+
+metrics.registry.add_collector(lambda: cache_local_entries.set(len(tiered_cache.local)))
+
+
+# --------------------------------------------------------
+# VIEW DECORATOR
+# --------------------------------------------------------
+def cached_view(ttl, tags=None, per_user=False):
+    """
+    Cache the data of 200 responses of a DRF function view, keyed on the
+    path and query string. Goes under @api_view / @permission_classes, so
+    authentication and permissions still run on every request.
+
+    tags: callable(request, *args, **kwargs) -> tags of the response.
+    per_user: include the authenticated user in the key.
+    """
+    def decorator(view):
+        namespace = view.__name__
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, "VIEW_CACHE", True):
+                return view(request, *args, **kwargs)
+
+            key = request.path + "?" + "&".join(sorted(request.GET.urlencode().split("&")))
+            if per_user:
+                key += f"#user={getattr(request.user, 'pk', None)}"
+
+            def compute():
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    raise Uncacheable(response)
+                return response.data
+
+            try:
+                data = tiered_cache.get_or_set(
+                    namespace, key, compute, ttl, tags(request, *args, **kwargs) if tags else ()
+                )
+            except Uncacheable as e:
+                return e.value
+            return Response(data)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,229 @@
+# Response compression negotiated from Accept-Encoding (brotli when the
+# Brotli package is installed, gzip otherwise).
+#
+# Responses are compressed when they are at least COMPRESSION_MIN_SIZE
+# bytes, have a text-like content type and are not already encoded. That
+# covers API JSON and static files WhiteNoise has no precompressed copy
+# of, such as the build-time openapi.json schema.
+#
+# GET responses carry an ETag: the one WhiteNoise sets on static files, or
+# a hash of the body for views. A compressed body is memoized under
+# (ETag, encoding) in a per-process LRU bounded by COMPRESSION_CACHE_BYTES.
+# Repeated identical responses (cached trade categories or job feed, the
+# schema) skip recompression, and matching If-None-Match requests get a
+# 304 with no body.
+
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/javascript", "application/xml", "application/openapi",
+    "text/", "image/svg+xml",
+)
+
+compression_responses = metrics.registry.counter(
+    "craftconnect_compression_responses_total",
+    "Compressed responses, by encoding and source (fresh: compressed now, memo: reused).",
+    ("encoding", "source"),
+)
+compression_bytes_in = metrics.registry.counter(
+    "craftconnect_compression_bytes_in_total",
+    "Uncompressed bytes of compressed responses.",
+    ("encoding",),
+)
+compression_bytes_out = metrics.registry.counter(
+    "craftconnect_compression_bytes_out_total",
+    "Bytes sent for compressed responses.",
+    ("encoding",),
+)
+compression_seconds = metrics.registry.counter(
+    "craftconnect_compression_seconds_total",
+    "CPU time spent compressing (memo hits excluded).",
+    ("encoding",),
+)
+not_modified = metrics.registry.counter(
+    "craftconnect_not_modified_total",
+    "304 responses to If-None-Match requests.",
+)
+
+
+def negotiate(accept_encoding):
+    """Preferred encoding the client accepts: 'br', 'gzip' or None."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+
+    def allowed(name):
+        return accepted.get(name, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5))
+    # mtime=0: the same body always compresses to the same bytes
+    return gzip.compress(data, compresslevel=getattr(settings, "COMPRESSION_GZIP_LEVEL", 6), mtime=0)
+
+
+def body_etag(content):
+    return '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+
+
+def strip_weak(etag):
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+class CompressedBodies:
+    """LRU of (etag, encoding) -> compressed bytes, bounded by total size."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        limit = getattr(settings, "COMPRESSION_CACHE_BYTES", 32 * 2**20)
+        if len(body) > limit // 4:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = body
+            self.size += len(body)
+            while self.size > limit:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+compressed_bodies = CompressedBodies()
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not getattr(settings, "COMPRESSION_ENABLED", True):
+            return response
+        if response.status_code != 200 or response.has_header("Content-Encoding"):
+            return response
+        if request.path in getattr(settings, "COMPRESSION_EXEMPT_PATHS", ()):
+            return response
+        if not response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        if response.streaming:
+            # Only static files of known size (WhiteNoise), read whole
+            length = int(response.get("Content-Length") or 0)
+            max_size = getattr(settings, "COMPRESSION_MAX_SIZE", 4 * 2**20)
+            if getattr(response, "file_to_stream", None) is None or not min_size <= length <= max_size:
+                return response
+        elif len(response.content) < min_size:
+            return response
+
+        cacheable = request.method in ("GET", "HEAD") and not any(
+            directive in response.get("Cache-Control", "") for directive in ("no-store", "private")
+        )
+        if cacheable and not response.streaming and not response.has_header("ETag"):
+            response["ETag"] = body_etag(response.content)
+        etag = response.get("ETag") if cacheable else None
+
+        if etag and self.not_modified(request, etag):
+            not_modified.inc()
+            result = HttpResponseNotModified()
+            for header in ("ETag", "Cache-Control", "Vary", "Last-Modified"):
+                if response.has_header(header):
+                    result[header] = response[header]
+            patch_vary_headers(result, ("Accept-Encoding",))
+            return result
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        key = (strip_weak(etag), encoding) if etag else None
+        body = compressed_bodies.get(key) if key else None
+        if body is not None:
+            compression_responses.inc(encoding=encoding, source="memo")
+            original_size = int(response["Content-Length"]) if response.streaming else len(response.content)
+        else:
+            content = response.file_to_stream.read() if response.streaming else response.content
+            original_size = len(content)
+            started = time.process_time()
+            body = compress(content, encoding)
+            compression_seconds.inc(time.process_time() - started, encoding=encoding)
+            if len(body) >= original_size:
+                if response.streaming:
+                    response.streaming_content = [content]
+                return response
+            if key:
+                compressed_bodies.put(key, body)
+            compression_responses.inc(encoding=encoding, source="fresh")
+
+        compression_bytes_in.inc(original_size, encoding=encoding)
+        compression_bytes_out.inc(len(body), encoding=encoding)
+
+        if response.streaming:
+            response.streaming_content = [body]
+        else:
+            response.content = body
+        response["Content-Length"] = str(len(body))
+        response["Content-Encoding"] = encoding
+        if etag and not etag.startswith("W/"):
+            # Same resource, different bytes: only weakly equal to the original
+            response["ETag"] = "W/" + etag
+        return response
+
+    def not_modified(self, request, etag):
+        if request.method not in ("GET", "HEAD"):
+            return False
+        header = request.META.get("HTTP_IF_NONE_MATCH")
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+        return strip_weak(etag) in {strip_weak(tag) for tag in header.split(",")}
@@ -0,0 +1,96 @@
+# Metrics for the optional PostgreSQL connection pool (DATABASE_POOL=1).
+#
+# Django keeps one psycopg_pool.ConnectionPool per database alias and per
+# process. Its cumulative stats are copied into the metrics registry right
+# before each snapshot, so they appear in /metrics next to the request
+# metrics.
+
+from django.db import connections
+
+from . import metrics
+
+pool_size = metrics.registry.gauge(
+    "craftconnect_db_pool_connections",
+    "Connections currently held by the pool (in use + idle).",
+    ("alias",),
+)
+pool_available = metrics.registry.gauge(
+    "craftconnect_db_pool_available_connections",
+    "Idle connections ready to be handed out.",
+    ("alias",),
+)
+pool_max = metrics.registry.gauge(
+    "craftconnect_db_pool_max_connections",
+    "Configured maximum pool size.",
+    ("alias",),
+)
+pool_waiting = metrics.registry.gauge(
+    "craftconnect_db_pool_waiting_requests",
+    "Requests currently queued for a connection.",
+    ("alias",),
+)
+pool_requests = metrics.registry.counter(
+    "craftconnect_db_pool_requests_total",
+    "Connections requested from the pool.",
+    ("alias",),
+)
+pool_queued = metrics.registry.counter(
+    "craftconnect_db_pool_queued_requests_total",
+    "Requests that had to wait because no connection was idle.",
+    ("alias",),
+)
+pool_wait_seconds = metrics.registry.counter(
+    "craftconnect_db_pool_wait_seconds_total",
+    "Time spent waiting for a pooled connection.",
+    ("alias",),
+)
+pool_timeouts = metrics.registry.counter(
+    "craftconnect_db_pool_timeouts_total",
+    "Requests that gave up waiting (DATABASE_POOL_TIMEOUT).",
+    ("alias",),
+)
+pool_connects = metrics.registry.counter(
+    "craftconnect_db_pool_connects_total",
+    "New server connections opened by the pool.",
+    ("alias",),
+)
+pool_connect_seconds = metrics.registry.counter(
+    "craftconnect_db_pool_connect_seconds_total",
+    "Time spent opening new server connections.",
+    ("alias",),
+)
+pool_lost = metrics.registry.counter(
+    "craftconnect_db_pool_lost_connections_total",
+    "Connections found broken by the health check.",
+    ("alias",),
+)
+
+
+def active_pools():
+    """{alias: pool} for the pools this process has created (never creates one)."""
+    pools = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "_connection_pools", {}).get(alias)
+        if pool is not None:
+            pools[alias] = pool
+    return pools
+
+
+def pool_stats():
+    return {alias: pool.get_stats() for alias, pool in active_pools().items()}
+
+
+@metrics.registry.add_collector
+def collect_pool_metrics():
+    for alias, stats in pool_stats().items():
+        pool_size.set(stats.get("pool_size", 0), alias=alias)
+        pool_available.set(stats.get("pool_available", 0), alias=alias)
+        pool_max.set(stats.get("pool_max", 0), alias=alias)
+        pool_waiting.set(stats.get("requests_waiting", 0), alias=alias)
+        pool_requests.set(stats.get("requests_num", 0), alias=alias)
+        pool_queued.set(stats.get("requests_queued", 0), alias=alias)
+        pool_wait_seconds.set(stats.get("requests_wait_ms", 0) / 1000, alias=alias)
+        pool_timeouts.set(stats.get("requests_errors", 0), alias=alias)
+        pool_connects.set(stats.get("connections_num", 0), alias=alias)
+        pool_connect_seconds.set(stats.get("connections_ms", 0) / 1000, alias=alias)
+        pool_lost.set(stats.get("connections_lost", 0), alias=alias)
@@ -0,0 +1,154 @@
+# Streaming CSV / JSON Lines exports of large tables.
+#
+# Rows are read with values_list(...).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+# no model instances, and no result cache. PostgreSQL serves them from a
+# server-side cursor, SQLite with fetchmany. The encoded rows are written
+# (to a file) or sent (as a StreamingHttpResponse) in batches as they are
+# read, so memory stays flat however many rows an export has.
+#
+# An export is a list of querysets read one after the other (e.g. live and
+# archived jobs) and the columns to read from them: (name, lookup) pairs.
+
+import csv
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from drf_yasg import openapi
+
+from . import fastjson
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+ROWS_PER_WRITE = 500
+
+EXPORT_PARAMETERS = [
+    openapi.Parameter("fmt", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(CONTENT_TYPES),
+                      description="csv (default) or jsonl"),
+    openapi.Parameter("since", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description="Created at or after this date/datetime (ISO 8601)"),
+    openapi.Parameter("until", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description="Created before this datetime, or up to the end of this date"),
+    openapi.Parameter("trade", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Trade category name"),
+]
+
+
+def parse_filters(since=None, until=None, trade=None, fmt=None):
+    """Validated (fmt, since, until, trade) from query/command options. Raises ValueError."""
+    fmt = fmt or "csv"
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f"Unknown format {fmt!r}: use csv or jsonl.")
+    return fmt, parse_moment(since, "since"), parse_moment(until, "until", end_of_day=True), trade or None
+
+
+def parse_moment(value, name, end_of_day=False):
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"{name}: expected an ISO 8601 date or datetime, got {value!r}.")
+        if end_of_day:
+            day += datetime.timedelta(days=1)
+        moment = datetime.datetime.combine(day, datetime.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(querysets, columns, chunk_size=None):
+    lookups = [lookup for _, lookup in columns]
+    chunk_size = chunk_size or getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+    for queryset in querysets:
+        yield from queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def plain(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def encode(rows, columns, fmt):
+    """Bytes chunks of the header (CSV) and rows, ROWS_PER_WRITE rows at a time."""
+    names = [name for name, _ in columns]
+    if fmt == "csv":
+        writer = csv.writer(Echo())
+        yield writer.writerow(names).encode()
+
+        def line(row):
+            # JSON columns (questions, answers) as JSON text
+            return writer.writerow([
+                fastjson.dumps(value).decode() if isinstance(value, (dict, list)) else plain(value)
+                for value in row
+            ]).encode()
+    else:
+        def line(row):
+            return fastjson.dumps({name: plain(value) for name, value in zip(names, row)}) + b"\n"
+
+    batch = []
+    for row in rows:
+        batch.append(line(row))
+        if len(batch) >= ROWS_PER_WRITE:
+            yield b"".join(batch)
+            batch = []
+    if batch:
+        yield b"".join(batch)
+
+
+def streaming_export(querysets, columns, fmt, filename):
+    # Rows are read after the view returns: pick the database (a replica
+    # when routing allows it) now, while the request's routing applies
+    alias = router.db_for_read(querysets[0].model)
+    querysets = [queryset.using(alias) for queryset in querysets]
+    response = StreamingHttpResponse(encode(export_rows(querysets, columns), columns, fmt),
+                                     content_type=CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return response
+
+
+class ExportCommand(BaseCommand):
+    """Base of the export_* commands: subclasses set `columns` and define querysets()."""
+
+    columns = ()
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(CONTENT_TYPES), default="csv")
+        parser.add_argument("--since", help="Created at or after this date/datetime (ISO 8601).")
+        parser.add_argument("--until", help="Created before this datetime, or up to the end of this date.")
+        parser.add_argument("--trade", help="Trade category name.")
+        parser.add_argument("--output", "-o", help="File to write (default: stdout).")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Rows fetched per round trip.")
+
+    def querysets(self, since, until, trade):
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        try:
+            fmt, since, until, trade = parse_filters(options["since"], options["until"], options["trade"], options["format"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = encode(export_rows(self.querysets(since, until, trade), self.columns, options["chunk_size"]), self.columns, fmt)
+        if options["output"]:
+            with open(options["output"], "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending="")
@@ -0,0 +1,89 @@
+# JSON encoding and decoding with orjson when it is installed, the standard
+# library otherwise.
+#
+# FastJSONRenderer / FastJSONParser are drop-in replacements for DRF's
+# JSONRenderer / JSONParser (see REST_FRAMEWORK in settings.py) and produce
+# the same output: types orjson would format differently (datetimes, which
+# DRF trims to milliseconds and writes in UTC as "Z"; Decimals, which DRF
+# writes as floats; lazy translation strings, ...) are handed to DRF's own
+# encoder, and whatever orjson cannot handle (integers over 64 bits,
+# non-string dict keys) falls back to the standard library. Serializers already turn budgets into
+# strings ("1500.00") and datetimes into ISO strings, so API payloads are
+# unchanged.
+
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.json import strict_constant
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_encoder = JSONEncoder()
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def available():
+    return orjson is not None and getattr(settings, "FAST_JSON", True)
+
+
+def dumps(data):
+    """Compact UTF-8 JSON bytes, encoded like DRF's JSONRenderer."""
+    if available():
+        try:
+            return orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data):
+    """Parse JSON from str or bytes. Raises json.JSONDecodeError (a ValueError)."""
+    if available():
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # Re-parsed below: the same error message, or integers over 64 bits
+    return json.loads(data)
+
+
+# --------------------------------------------------------
+# DRF
+# --------------------------------------------------------
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # Indented output (browsable API, ?indent=) is rare: leave it to DRF
+        if not available() or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = dumps(data)
+        # Same escaping as DRF: U+2028/U+2029 are invalid inside JavaScript strings
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if not available() or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+        try:
+            return json.loads(body.decode(encoding), parse_constant=strict_constant if self.strict else None)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,348 @@
+# In-process metrics with Prometheus text exposition.
+#
+# Counters and histograms live in a per-process registry. When METRICS_DIR
+# is set (one directory shared by all gunicorn workers), each process
+# writes a snapshot of its registry to METRICS_DIR/<pid>.json at most every
+# METRICS_FLUSH_INTERVAL seconds, and /metrics sums the snapshots of every
+# process, so any worker can answer a scrape for the whole server.
+# Counts of exited workers remain part of the totals, as Prometheus expects
+# from counters: on each scrape their snapshots are folded into one
+# METRICS_DIR/retired.json and deleted, so the directory does not grow with
+# every worker ever started and a new process that reuses a PID never
+# overwrites counts that are not its own.
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+RETIRED_FILE = "retired.json"
+LOCK_FILE = ".lock"
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            values = self.registry.values[self.name]
+            values[key] = values.get(key, 0) + amount
+
+    def set(self, value, **labels):
+        """For totals kept by another component (e.g. the psycopg pool), copied by a collector."""
+        with self.registry.lock:
+            self.registry.values[self.name][self.key(labels)] = value
+
+
+class Gauge(Metric):
+    """
+    Current value, set by a collector just before each snapshot. Summed over
+    live processes only: an exited worker's last value no longer applies.
+    """
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.registry.lock:
+            self.registry.values[self.name][self.key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames, buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        # Per-bucket (non-cumulative) counts + overflow slot; cumulated on exposition
+        slot = bisect_left(self.buckets, value)
+        with self.registry.lock:
+            values = self.registry.values[self.name]
+            state = values.get(key)
+            if state is None:
+                state = values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            state["counts"][slot] += 1
+            state["sum"] += value
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.values = {}
+        self.collectors = []
+        self.last_flush = 0.0
+        self.flushed_pid = None
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        self.values[metric.name] = {}
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(self, name, documentation, labelnames))
+
+    def add_collector(self, collector):
+        """Callable run before every snapshot to refresh gauges / absolute counters."""
+        self.collectors.append(collector)
+        return collector
+
+    def snapshot(self):
+        for collector in self.collectors:
+            collector()
+        with self.lock:
+            return {
+                name: [[list(key), value if not isinstance(value, dict) else {
+                    "counts": list(value["counts"]), "sum": value["sum"],
+                }] for key, value in values.items()]
+                for name, values in self.values.items()
+            }
+
+    # --------------------------------------------------------
+    # MULTI-PROCESS
+    # --------------------------------------------------------
+    def flush(self):
+        """Write this process's snapshot to METRICS_DIR (atomic replace)."""
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        if self.flushed_pid != os.getpid() and os.path.exists(path):
+            # Left by an exited process that had the same PID
+            self.retire(directory, [path])
+        self.flushed_pid = os.getpid()
+        write_json(directory, path, self.snapshot())
+        self.last_flush = time.monotonic()
+
+    def flush_if_due(self):
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0)
+        if time.monotonic() - self.last_flush >= interval:
+            self.flush()
+
+    def retire(self, directory, paths):
+        """Fold the snapshots at paths into RETIRED_FILE and delete them; gauges are dropped."""
+        import fcntl  # POSIX only, like the multi-worker servers that set METRICS_DIR
+
+        with open(os.path.join(directory, LOCK_FILE), "a") as lock:
+            # One worker at a time, or two scrapes would fold the same file twice
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            retired_path = os.path.join(directory, RETIRED_FILE)
+            merged = {}
+            folded = []
+            for path in [retired_path] + paths:
+                try:
+                    with open(path) as f:
+                        snapshot = json.load(f)
+                except FileNotFoundError:
+                    continue  # Already folded by another worker
+                except ValueError:
+                    snapshot = {}  # Unreadable: drop it rather than fail every scrape
+                self.merge(merged, snapshot, live=False)
+                folded.append(path)
+            if folded == [retired_path] or not folded:
+                return
+            write_json(directory, retired_path, {
+                name: [[list(key), value] for key, value in values.items()] for name, values in merged.items()
+            })
+            for path in folded:
+                if path != retired_path:
+                    os.unlink(path)
+
+    def collect(self):
+        """(live, snapshot) pairs to expose: every process's file, or just this process."""
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return [(True, self.snapshot())]
+
+        self.flush()
+        snapshots, dead = [], []
+        for entry in os.scandir(directory):
+            if not entry.name.endswith(".json") or entry.name.startswith(".") or entry.name == RETIRED_FILE:
+                continue
+            try:
+                pid = int(entry.name[:-5])
+            except ValueError:
+                continue
+            if not process_alive(pid):
+                dead.append(entry.path)
+                continue
+            try:
+                with open(entry.path) as f:
+                    snapshots.append((True, json.load(f)))
+            except (OSError, ValueError):
+                continue  # Being replaced, picked up on the next scrape
+        if dead:
+            self.retire(directory, dead)
+        try:
+            with open(os.path.join(directory, RETIRED_FILE)) as f:
+                snapshots.append((False, json.load(f)))
+        except (OSError, ValueError):
+            pass
+        return snapshots
+
+    def merge(self, merged, snapshot, live):
+        """Add the samples of a snapshot to merged ({name: {key: value}}); gauges only from live processes."""
+        for name, samples in snapshot.items():
+            metric = self.metrics.get(name)
+            if metric is None or (metric.kind == "gauge" and not live):
+                continue
+            values = merged.setdefault(name, {})
+            for key, value in samples:
+                key = tuple(key)
+                if isinstance(value, dict):
+                    state = values.setdefault(key, {"counts": [0] * len(value["counts"]), "sum": 0.0})
+                    if len(state["counts"]) != len(value["counts"]):
+                        continue  # Buckets changed between deploys
+                    state["counts"] = [a + b for a, b in zip(state["counts"], value["counts"])]
+                    state["sum"] += value["sum"]
+                else:
+                    values[key] = values.get(key, 0) + value
+
+    # --------------------------------------------------------
+    # EXPOSITION
+    # --------------------------------------------------------
+    def render(self):
+        """All metrics, summed over processes, in Prometheus text format 0.0.4."""
+        merged = {name: {} for name in self.metrics}
+        for live, snapshot in self.collect():
+            self.merge(merged, snapshot, live)
+
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(merged[name].items()):
+                labels = dict(zip(metric.labelnames, key))
+                if metric.kind != "histogram":
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), value["counts"]):
+                    cumulative += count
+                    bucket = {**labels, "le": "+Inf" if bound == float("inf") else format_value(bound)}
+                    lines.append(f"{name}_bucket{format_labels(bucket)} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(value['sum'])}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def write_json(directory, path, data):
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def process_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+# --------------------------------------------------------
+# METRICS
+# --------------------------------------------------------
+http_requests = registry.counter(
+    "craftconnect_http_requests_total",
+    "HTTP requests served, by route, method and status.",
+    ("route", "method", "status"),
+)
+http_duration = registry.histogram(
+    "craftconnect_http_request_duration_seconds",
+    "Time from the request entering the middleware to the response leaving it.",
+    ("route", "method"),
+)
+http_render_duration = registry.histogram(
+    "craftconnect_http_render_duration_seconds",
+    "Time spent rendering (serializing) DRF / template responses.",
+    ("route",),
+)
+http_response_size = registry.histogram(
+    "craftconnect_http_response_size_bytes",
+    "Response body size (non-streaming responses).",
+    ("route",),
+    buckets=SIZE_BUCKETS,
+)
+db_queries = registry.histogram(
+    "craftconnect_db_queries_per_request",
+    "Database queries executed while serving one request.",
+    ("route",),
+    buckets=COUNT_BUCKETS,
+)
+db_query_seconds = registry.counter(
+    "craftconnect_db_query_seconds_total",
+    "Time spent executing database queries.",
+    ("route",),
+)
+llm_duration = registry.histogram(
+    "craftconnect_llm_request_duration_seconds",
+    "Outbound LLM (Groq) call latency.",
+    ("model", "outcome"),
+)
+llm_tokens = registry.counter(
+    "craftconnect_llm_tokens_total",
+    "Tokens reported by the LLM provider.",
+    ("model", "kind"),
+)
+llm_errors = registry.counter(
+    "craftconnect_llm_errors_total",
+    "Failed outbound LLM calls.",
+    ("model", "reason"),
+)
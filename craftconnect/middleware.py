@@ -0,0 +1,79 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from . import metrics
+
+# Paths not recorded (the scrape endpoint itself)
+UNTRACKED_PATHS = {"/metrics", "/metrics/"}
+
+
+def route_label(request):
+    """URL pattern of the matched view (bounded cardinality), not the raw path."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return "/" + match.route if match.route else (match.view_name or "unknown")
+
+
+class QueryTimer:
+    """execute_wrapper that counts queries and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """
+    Per-request latency, status, response size, render time and DB
+    query count/time, recorded into craftconnect.metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path in UNTRACKED_PATHS:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        timer = QueryTimer()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        route = route_label(request)
+        metrics.http_requests.inc(route=route, method=request.method, status=response.status_code)
+        metrics.http_duration.observe(elapsed, route=route, method=request.method)
+        metrics.db_queries.observe(timer.count, route=route)
+        if timer.seconds:
+            metrics.db_query_seconds.inc(timer.seconds, route=route)
+        if not response.streaming:
+            metrics.http_response_size.observe(len(response.content), route=route)
+        if getattr(request, "_metrics_render_seconds", None) is not None:
+            metrics.http_render_duration.observe(request._metrics_render_seconds, route=route)
+
+        metrics.registry.flush_if_due()
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF Responses are rendered after this hook; time it via a post-render callback
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render_seconds = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
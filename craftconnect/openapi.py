@@ -0,0 +1,48 @@
+# OpenAPI schema for the Swagger / ReDoc docs.
+#
+# The schema is generated once at build time into STATIC_ROOT (served by
+# WhiteNoise) with:
+#
+#     python manage.py generate_swagger staticfiles/openapi.json --overwrite
+#
+# and the docs UIs load it from there (SWAGGER_SETTINGS / REDOC_SETTINGS
+# SPEC_URL), so workers never walk every @swagger_auto_schema at runtime.
+# Without the file the UIs fall back to /swagger/?format=openapi. The
+# drf_yasg views are only built when a docs URL is first requested.
+
+from functools import lru_cache
+
+from drf_yasg import openapi
+
+api_info = openapi.Info(
+    title="CraftConnect API",
+    default_version='v1',
+    description="API documentation for CraftConnect Backend",
+    contact=openapi.Contact(email="teamcraftconnect@gmail.com"),
+)
+
+
+@lru_cache(maxsize=None)
+def schema_view():
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+    from .authentication import CachedJWTAuthentication
+
+    return get_schema_view(
+        api_info,
+        public=True,
+        permission_classes=(permissions.AllowAny,),
+        authentication_classes=[CachedJWTAuthentication],
+    )
+
+
+@lru_cache(maxsize=None)
+def _docs_view(renderer):
+    return schema_view().with_ui(renderer, cache_timeout=0)
+
+
+def docs_view(renderer):
+    """URL view for the 'swagger' or 'redoc' UI, built on first use."""
+    def view(request, *args, **kwargs):
+        return _docs_view(renderer)(request, *args, **kwargs)
+    return view
@@ -0,0 +1,212 @@
+# Query inspection for development and tests.
+#
+# QueryRecorder captures every SQL statement run while it is active, with
+# its duration and the project code line that issued it. analyze() groups
+# statements by their normalized form (literals replaced by ?) so that the
+# same query run once per row shows up as one N+1 group.
+#
+# QueryInspectorMiddleware (opt-in: QUERY_INSPECTOR=1) logs N+1 groups and
+# slow queries with their EXPLAIN plan. max_queries() / QueryBudgetMixin pin
+# per-endpoint query budgets in tests.
+
+import logging
+import re
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("craftconnect.queries")
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Statement shape: literals and placeholders as ?, IN lists collapsed."""
+    sql = STRING_RE.sub("?", sql)
+    sql = NUMBER_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = IN_LIST_RE.sub("IN (...)", sql)
+    return WHITESPACE_RE.sub(" ", sql).strip()
+
+
+def origin_frame():
+    """'path:line in function' of the innermost project frame issuing the query."""
+    base = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        filename = frame.filename
+        if (
+            filename.startswith(base)
+            and "site-packages" not in filename
+            and not filename.endswith("querycheck.py")
+        ):
+            return f"{filename[len(base) + 1:]}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+
+@dataclass
+class QueryRecord:
+    alias: str
+    sql: str
+    params: object
+    seconds: float
+    origin: str
+
+
+@dataclass
+class QueryGroup:
+    statement: str
+    count: int = 0
+    seconds: float = 0.0
+    origins: set = field(default_factory=set)
+
+
+class QueryRecorder:
+    """Records the queries of every configured database while active."""
+
+    def __init__(self, with_origin=True):
+        self.with_origin = with_origin
+        self.records = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self.wrapper(connection.alias)))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+
+    def wrapper(self, alias):
+        def record(execute, sql, params, many, context):
+            origin = origin_frame() if self.with_origin else ""
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.records.append(QueryRecord(alias, sql, params, time.perf_counter() - started, origin))
+        return record
+
+    @property
+    def total_seconds(self):
+        return sum(r.seconds for r in self.records)
+
+
+def analyze(records, threshold, selects_only=True):
+    """Groups of identical statements run at least `threshold` times, largest first."""
+    groups = {}
+    for record in records:
+        if selects_only and not record.sql.lstrip().upper().startswith("SELECT"):
+            continue
+        statement = normalize_sql(record.sql)
+        group = groups.setdefault(statement, QueryGroup(statement))
+        group.count += 1
+        group.seconds += record.seconds
+        group.origins.add(record.origin)
+    repeated = [g for g in groups.values() if g.count >= threshold]
+    return sorted(repeated, key=lambda g: g.count, reverse=True)
+
+
+def explain(record):
+    """Query plan of a recorded SELECT, or None."""
+    if not record.sql.lstrip().upper().startswith("SELECT"):
+        return None
+    connection = connections[record.alias]
+    prefix = "EXPLAIN QUERY PLAN" if connection.vendor == "sqlite" else "EXPLAIN"
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {record.sql}", record.params)
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f"(EXPLAIN failed: {e})"
+
+
+def format_report(records, groups):
+    lines = [f"{len(records)} queries, {sum(r.seconds for r in records) * 1000:.1f} ms"]
+    for group in groups:
+        lines.append(f"  {group.count}x ({group.seconds * 1000:.1f} ms) {group.statement[:300]}")
+        for origin in sorted(group.origins):
+            lines.append(f"      from {origin}")
+    return "\n".join(lines)
+
+
+# --------------------------------------------------------
+# MIDDLEWARE
+# --------------------------------------------------------
+class QueryInspectorMiddleware:
+    """
+    Development only. Logs repeated query patterns (likely N+1s) with the
+    code that issued them, and queries slower than QUERY_INSPECTOR_SLOW_MS
+    with their EXPLAIN plan. Adds X-Query-Count / X-Query-Time-Ms headers.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_INSPECTOR", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.threshold = getattr(settings, "QUERY_INSPECTOR_NPLUSONE_THRESHOLD", 5)
+        self.slow_seconds = getattr(settings, "QUERY_INSPECTOR_SLOW_MS", 100) / 1000
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        records = recorder.records
+        response["X-Query-Count"] = str(len(records))
+        response["X-Query-Time-Ms"] = f"{recorder.total_seconds * 1000:.1f}"
+
+        groups = analyze(records, self.threshold)
+        if groups:
+            logger.warning(
+                "Possible N+1 on %s %s: %s",
+                request.method, request.path, format_report(records, groups)
+            )
+
+        for record in records:
+            if record.seconds >= self.slow_seconds:
+                logger.warning(
+                    "Slow query (%.1f ms) on %s %s from %s\n%s\nPlan:\n%s",
+                    record.seconds * 1000, request.method, request.path,
+                    record.origin, record.sql, explain(record)
+                )
+        return response
+
+
+# --------------------------------------------------------
+# TEST HELPERS
+# --------------------------------------------------------
+@contextmanager
+def max_queries(limit, threshold=None):
+    """
+    Fail if the block runs more than `limit` queries. The failure message
+    lists every statement run and where it came from. With `threshold`,
+    also fail on any statement repeated that many times.
+    """
+    with QueryRecorder() as recorder:
+        yield recorder
+
+    records = recorder.records
+    if len(records) > limit:
+        groups = analyze(records, 1, selects_only=False)
+        raise AssertionError(
+            f"Expected at most {limit} queries, got {len(records)}.\n" + format_report(records, groups)
+        )
+    if threshold is not None:
+        groups = analyze(records, threshold)
+        if groups:
+            raise AssertionError("Repeated query pattern (N+1):\n" + format_report(records, groups))
+
+
+class QueryBudgetMixin:
+    """TestCase mixin: `with self.assertMaxQueries(3): ...`"""
+
+    def assertMaxQueries(self, limit, threshold=None):
+        return max_queries(limit, threshold)
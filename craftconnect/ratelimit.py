@@ -0,0 +1,166 @@
+# Rate limiting for endpoints that are cheap to call but expensive to serve
+# (LLM calls, password hashing).
+#
+# Limits are token buckets: "10/m" allows bursts of 10 and refills one
+# token every 6 seconds. A view decorated with @rate_limit(ip="10/m",
+# user="5/m") has one bucket per client IP and one per authenticated user,
+# for that view; RATE_LIMITS in settings overrides the limits of a view by
+# name. A request over any limit gets a 429 with Retry-After.
+#
+# Buckets live in a fixed-size table in a memory-mapped file
+# (RATE_LIMIT_FILE), so every worker process on the host shares them
+# without a cache server. A write lock on the file (lockf) serializes
+# processes, a thread lock the threads of one process. Each key hashes to a
+# few candidate slots; when all are taken, the least recently used one is
+# reused, which at worst hands a long-idle key a fresh bucket.
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+
+from . import metrics
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Windows: one process only
+    fcntl = None
+
+SLOT = struct.Struct("<16sdd")  # key digest, tokens, last update
+EMPTY = bytes(16)
+PROBES = 8
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+rate_limited = metrics.registry.counter(
+    "craftconnect_rate_limited_total",
+    "Requests refused with 429, by view and by the limit they exceeded (ip or user).",
+    ("view", "scope"),
+)
+
+
+def parse_rate(rate):
+    """'10/m' -> (capacity 10, refill 10/60 tokens per second). Periods: s, m, h, d."""
+    count, _, period = rate.partition("/")
+    count = int(count)
+    return count, count / PERIODS[period.strip()[0]]
+
+
+class SharedBuckets:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.fd = None
+        self.map = None
+        self.slots = 0
+
+    def open(self):
+        # Reopened after fork: lockf locks belong to a process, not a descriptor
+        if self.pid == os.getpid():
+            return
+        path = getattr(settings, "RATE_LIMIT_FILE", os.path.join(tempfile.gettempdir(), "craftconnect-ratelimit"))
+        self.slots = getattr(settings, "RATE_LIMIT_SLOTS", 65536)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = self.slots * SLOT.size
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self.fd, self.map, self.pid = fd, mmap.mmap(fd, size), os.getpid()
+
+    def take(self, checks, now=None):
+        """
+        Take one token from each bucket in checks, a list of
+        (key, scope, capacity, refill per second), or from none of them if
+        any is empty. Returns (0, None) or (seconds to wait, scope).
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            self.open()
+            if fcntl is not None:
+                fcntl.lockf(self.fd, fcntl.LOCK_EX)
+            try:
+                updates = []
+                for key, scope, capacity, refill in checks:
+                    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+                    index, tokens, updated = self.find(digest)
+                    tokens = capacity if tokens is None else min(capacity, tokens + (now - updated) * refill)
+                    if tokens < 1:
+                        return (1 - tokens) / refill, scope
+                    updates.append((index, digest, tokens - 1))
+                for index, digest, tokens in updates:
+                    SLOT.pack_into(self.map, index * SLOT.size, digest, tokens, now)
+                return 0, None
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(self.fd, fcntl.LOCK_UN)
+
+    def find(self, digest):
+        """(slot index, tokens, updated) of the key, or (free or reusable slot, None, None)."""
+        base = int.from_bytes(digest[:8], "little")
+        oldest = None
+        for probe in range(PROBES):
+            index = (base + probe) % self.slots
+            found, tokens, updated = SLOT.unpack_from(self.map, index * SLOT.size)
+            if found == digest:
+                return index, tokens, updated
+            if found == EMPTY:
+                # Slots are never emptied, so the key is not further along
+                return index, None, None
+            if oldest is None or updated < oldest[1]:
+                oldest = (index, updated)
+        return oldest[0], None, None
+
+    def reset(self):
+        with self.lock:
+            self.open()
+            self.map[:] = bytes(len(self.map))
+
+
+buckets = SharedBuckets()
+
+
+def client_ip(request):
+    header = getattr(settings, "RATE_LIMIT_IP_HEADER", None)
+    if header and request.META.get(header):
+        # Rightmost entry: the address the trusted proxy saw
+        return request.META[header].split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def rate_limit(ip=None, user=None):
+    """
+    Limit calls of a DRF function view per client IP and per authenticated
+    user ("10/m", "100/h", ...; None for no limit). Goes under @api_view /
+    @permission_classes, so request.user is known.
+    """
+    def decorator(view):
+        name = view.__name__
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if getattr(settings, "RATE_LIMIT_ENABLED", True):
+                limits = {"ip": ip, "user": user, **getattr(settings, "RATE_LIMITS", {}).get(name, {})}
+                idents = {"ip": client_ip(request)}
+                if request.user and request.user.is_authenticated:
+                    idents["user"] = str(request.user.pk)
+
+                checks = [
+                    (f"{name}|{scope}|{idents[scope]}", scope, *parse_rate(limits[scope]))
+                    for scope in ("ip", "user")
+                    if limits.get(scope) and scope in idents
+                ]
+                if checks:
+                    wait, scope = buckets.take(checks)
+                    if wait:
+                        rate_limited.inc(view=name, scope=scope)
+                        raise Throttled(wait=math.ceil(wait))
+            return view(request, *args, **kwargs)
+
+        return wrapper
+    return decorator
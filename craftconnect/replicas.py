@@ -0,0 +1,198 @@
+# Read-replica routing.
+#
+# Replicas come from DATABASE_REPLICA_URLS (aliases replica_1, replica_2, ...).
+# Reads go to a replica only while ReplicaRoutingMiddleware has marked the
+# current request as replica-safe: a GET/HEAD/OPTIONS request from a client
+# that has not written anything in the last DATABASE_REPLICA_STICKY_SECONDS.
+# Everything else (writes, reads in a view that writes, management
+# commands, background tasks) stays on the primary.
+#
+# Read-your-writes: after an unsafe request the client is pinned to the
+# primary, by cookie (browsers, admin) and by a per-process map keyed on
+# the Authorization header or client IP (API clients that drop cookies).
+#
+# Lag awareness: each replica's replay lag is checked at most every
+# DATABASE_REPLICA_LAG_CHECK_INTERVAL seconds; replicas behind by more than
+# DATABASE_REPLICA_MAX_LAG seconds, or failing the check, get no reads.
+
+import hashlib
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = "cc_primary_until"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Most clients pinned at once per process; the oldest pins go first
+MAX_PINNED_CLIENTS = 10_000
+
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+# --------------------------------------------------------
+# LAG
+# --------------------------------------------------------
+def measure_lag(alias):
+    """Replication lag of a replica in seconds; raises if it cannot be reached."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+class LagMonitor:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = {}  # alias -> (checked_at, lag or None when unreachable)
+
+    def lag(self, alias):
+        interval = getattr(settings, "DATABASE_REPLICA_LAG_CHECK_INTERVAL", 5)
+        now = time.monotonic()
+        checked_at, lag = self.state.get(alias, (None, None))
+        if checked_at is not None and now - checked_at < interval:
+            return lag
+
+        with self.lock:
+            # Claim the check so concurrent requests keep using the last value
+            self.state[alias] = (now, lag)
+        try:
+            lag = measure_lag(alias)
+        except Exception:
+            lag = None
+        self.state[alias] = (time.monotonic(), lag)
+        return lag
+
+    def healthy(self):
+        max_lag = getattr(settings, "DATABASE_REPLICA_MAX_LAG", 5)
+        return [
+            alias for alias in replica_aliases()
+            if (lag := self.lag(alias)) is not None and lag <= max_lag
+        ]
+
+    def reset(self):
+        self.state.clear()
+
+
+lag_monitor = LagMonitor()
+
+
+# --------------------------------------------------------
+# READ-YOUR-WRITES
+# --------------------------------------------------------
+class PinnedClients:
+    """Per-process {client key: primary-until timestamp}."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.until = {}
+
+    def pin(self, key, until):
+        with self.lock:
+            self.until.pop(key, None)
+            self.until[key] = until
+            while len(self.until) > MAX_PINNED_CLIENTS:
+                self.until.pop(next(iter(self.until)))
+
+    def pinned(self, key, now):
+        until = self.until.get(key)
+        return until is not None and until > now
+
+    def reset(self):
+        self.until.clear()
+
+
+pinned_clients = PinnedClients()
+
+
+def client_key(request):
+    auth = request.META.get("HTTP_AUTHORIZATION")
+    if auth:
+        return "auth:" + hashlib.sha256(auth.encode()).hexdigest()[:32]
+    return "ip:" + request.META.get("REMOTE_ADDR", "")
+
+
+def pinned_to_primary(request, now):
+    try:
+        if float(request.COOKIES.get(STICKY_COOKIE, 0)) > now:
+            return True
+    except ValueError:
+        pass
+    return pinned_clients.pinned(client_key(request), now)
+
+
+class ReplicaRoutingMiddleware:
+    """Marks replica-safe requests and pins writers to the primary."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+
+        now = time.time()
+        safe = request.method in SAFE_METHODS and not pinned_to_primary(request, now)
+        token = _replica_reads.set(safe)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+
+        if request.method not in SAFE_METHODS:
+            window = getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 10)
+            until = now + window
+            pinned_clients.pin(client_key(request), until)
+            response.set_cookie(STICKY_COOKIE, f"{until:.3f}", max_age=int(window) + 1, httponly=True, samesite="Lax")
+        return response
+
+
+# --------------------------------------------------------
+# ROUTER
+# --------------------------------------------------------
+def in_transaction(alias=DEFAULT_DB_ALIAS):
+    """True inside an atomic block on the primary (ignoring TestCase's wrapping atomics)."""
+    connection = connections[alias]
+    return any(not getattr(block, "_from_testcase", False) for block in connection.atomic_blocks)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # The database cache backend (CACHE_BACKEND=db) must see invalidations at once
+        if model._meta.app_label == "django_cache":
+            return DEFAULT_DB_ALIAS
+        if not _replica_reads.get() or in_transaction():
+            return DEFAULT_DB_ALIAS
+        healthy = lag_monitor.healthy()
+        if not healthy:
+            return DEFAULT_DB_ALIAS
+        return random.choice(healthy)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db == DEFAULT_DB_ALIAS or db not in replica_aliases()
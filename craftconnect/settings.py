@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import dj_database_url
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
     'users',
     'assessments',
     'jobs',
+    'benchmarks',
 
     # third-party
     'rest_framework',
@@ -53,6 +55,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'benchmarks.capture.TrafficCaptureMiddleware',
+    'craftconnect.middleware.MetricsMiddleware',
+    'craftconnect.querycheck.QueryInspectorMiddleware',
+    'craftconnect.replicas.ReplicaRoutingMiddleware',
+    'craftconnect.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',  
@@ -93,14 +100,63 @@ WSGI_APPLICATION = 'craftconnect.wsgi.application'
 #         'NAME': BASE_DIR / 'db.sqlite3',
 #     }
 # }
+# DATABASE_URL points at Supabase in production and is required: without it
+# no database is configured and the first query fails. Local development and
+# the benchmark commands opt into SQLite explicitly, e.g.
+# DATABASE_URL=sqlite:///db.sqlite3 (test_settings does so for test runs)
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+
+# DATABASE_POOL=1 (PostgreSQL with psycopg 3 only: pip install -r
+# requirements-pool.txt) replaces per-thread persistent connections with
+# one psycopg_pool per worker process: at most
+# DATABASE_POOL_MAX_SIZE connections to Supabase per worker, health-checked
+# on checkout, idle ones closed after DATABASE_POOL_MAX_IDLE seconds.
+DATABASE_POOL = os.environ.get("DATABASE_POOL") == "1" and DATABASE_URL.startswith("postgres")
+
 DATABASES = {
     'default': dj_database_url.config(
-        default=os.environ.get("DATABASE_URL"),
-        conn_max_age=600,
-        ssl_require=True  # Supabase requires SSL
+        # Pooling and persistent connections are mutually exclusive
+        conn_max_age=0 if DATABASE_POOL else int(os.environ.get("DATABASE_CONN_MAX_AGE", "600")),
+        conn_health_checks=DATABASE_POOL,
+        ssl_require=DATABASE_URL.startswith("postgres")  # Supabase requires SSL
     )
 }
 
+if DATABASE_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get("DATABASE_POOL_MIN_SIZE", "2")),
+        'max_size': int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10")),
+        # Seconds a request waits for a free connection before failing
+        'timeout': float(os.environ.get("DATABASE_POOL_TIMEOUT", "10")),
+        'max_idle': float(os.environ.get("DATABASE_POOL_MAX_IDLE", "300")),
+        'max_lifetime': float(os.environ.get("DATABASE_POOL_MAX_LIFETIME", "1800")),
+    }
+
+# Read replicas: comma-separated URLs, added as replica_1, replica_2, ...
+# Safe-method requests read from a replica (see craftconnect/replicas.py)
+DATABASE_REPLICAS = []
+for number, url in enumerate(filter(None, os.environ.get("DATABASE_REPLICA_URLS", "").split(",")), start=1):
+    url = url.strip()
+    alias = f"replica_{number}"
+    DATABASES[alias] = dj_database_url.parse(
+        url,
+        conn_max_age=DATABASES['default']['CONN_MAX_AGE'],
+        conn_health_checks=DATABASE_POOL,
+        ssl_require=url.startswith("postgres"),
+        # Tests run against the primary's test database
+        test_options={'MIRROR': 'default'},
+    )
+    if DATABASE_POOL and url.startswith("postgres"):
+        DATABASES[alias]['OPTIONS']['pool'] = dict(DATABASES['default']['OPTIONS']['pool'])
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['craftconnect.replicas.ReplicaRouter']
+# Seconds a client keeps reading from the primary after a write
+DATABASE_REPLICA_STICKY_SECONDS = float(os.environ.get("DATABASE_REPLICA_STICKY_SECONDS", "10"))
+# Replicas further behind than this (seconds) get no reads
+DATABASE_REPLICA_MAX_LAG = float(os.environ.get("DATABASE_REPLICA_MAX_LAG", "5"))
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get("DATABASE_REPLICA_LAG_CHECK_INTERVAL", "5"))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -164,10 +220,27 @@ SIMPLE_JWT = {
 CORS_ALLOW_ALL_ORIGINS = True 
 
 REST_FRAMEWORK = {
+    # JWTAuthentication that verifies each token once (craftconnect/authentication.py)
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'craftconnect.authentication.CachedJWTAuthentication',
+    ),
+    # orjson-backed JSON (craftconnect/fastjson.py), same output as DRF's
+    'DEFAULT_RENDERER_CLASSES': (
+        'craftconnect.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'craftconnect.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
 }
+# FAST_JSON=0 uses the standard library json module even when orjson is installed
+FAST_JSON = os.environ.get("FAST_JSON", "1") == "1"
+# JWT_CACHE=0 verifies the access token on every request; otherwise up to
+# JWT_CACHE_MAX_ENTRIES verified tokens are kept per process until they expire
+JWT_CACHE = os.environ.get("JWT_CACHE", "1") == "1"
+JWT_CACHE_MAX_ENTRIES = int(os.environ.get("JWT_CACHE_MAX_ENTRIES", "10000"))
 
 
 MEDIA_URL = '/media/'
@@ -175,7 +248,123 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 #AUTH_USER_MODEL = 'users.User'
 
-GROQ_API_KEY = "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"
+GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "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")
+# Overridden by the benchmark harness to point at the local fake Groq server
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL", "https://api.groq.com/openai/v1/chat/completions")
+
+# Prometheus metrics (/metrics). Set METRICS_DIR to a directory shared by
+# all gunicorn workers so a scrape sees every worker, not just one.
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "1.0"))
+# /metrics requires "Authorization: Bearer <METRICS_TOKEN>" and is refused
+# without a token, unless METRICS_PUBLIC=1 (e.g. scraped on a private network)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+METRICS_PUBLIC = os.environ.get("METRICS_PUBLIC") == "1"
+
+# Development query inspector: logs likely N+1s and slow queries (with
+# EXPLAIN) per request. Off unless QUERY_INSPECTOR=1.
+QUERY_INSPECTOR = os.environ.get("QUERY_INSPECTOR") == "1"
+QUERY_INSPECTOR_SLOW_MS = float(os.environ.get("QUERY_INSPECTOR_SLOW_MS", "100"))
+QUERY_INSPECTOR_NPLUSONE_THRESHOLD = int(os.environ.get("QUERY_INSPECTOR_NPLUSONE_THRESHOLD", "5"))
+
+# Two-tier cache for hot GET endpoints (see craftconnect/cache.py): a
+# per-process LRU in front of this shared cache. The default file cache is
+# shared by the workers of one host; CACHE_BACKEND=db keeps it in the
+# database instead so several hosts share it (run `manage.py
+# createcachetable` once). Test runs get a private in-memory cache
+# (craftconnect/test_settings.py).
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "file")
+CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(tempfile.gettempdir(), "craftconnect-cache"))
+if CACHE_BACKEND == "db":
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'craftconnect_cache',
+        'OPTIONS': {'MAX_ENTRIES': 50_000},
+    }}
+else:
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 20_000},
+    }}
+# VIEW_CACHE=0 turns off caching of view responses
+VIEW_CACHE = os.environ.get("VIEW_CACHE", "1") == "1"
+CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", "1000"))
+# Seconds a process may trust its copy of a tag version. 0 checks the
+# shared cache on every lookup, so an invalidation is seen by all workers
+# at once; higher values save that lookup but delay invalidations.
+CACHE_LOCAL_TAG_TTL = float(os.environ.get("CACHE_LOCAL_TAG_TTL", "0"))
+# Higher values refresh entries earlier (XFetch beta)
+CACHE_EARLY_REFRESH_BETA = float(os.environ.get("CACHE_EARLY_REFRESH_BETA", "1.0"))
+# Seconds a request waits for another request computing the same missing entry
+CACHE_STAMPEDE_WAIT = float(os.environ.get("CACHE_STAMPEDE_WAIT", "2.0"))
+
+# Response compression (see craftconnect/compression.py)
+COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "1") == "1"
+# Smaller bodies are sent as they are: compressing them saves too little
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+# Largest static file compressed on the fly (read into memory)
+COMPRESSION_MAX_SIZE = int(os.environ.get("COMPRESSION_MAX_SIZE", str(4 * 2**20)))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "5"))
+# Per-process memo of compressed bodies, keyed by ETag
+COMPRESSION_CACHE_BYTES = int(os.environ.get("COMPRESSION_CACHE_BYTES", str(32 * 2**20)))
+# Responses carrying credentials are never compressed (BREACH)
+COMPRESSION_EXEMPT_PATHS = ['/api/users/login/']
+
+# Rate limits of login, registration and assessments (see
+# craftconnect/ratelimit.py), shared by the workers of one host through
+# RATE_LIMIT_FILE. Off in test runs (craftconnect/test_settings.py).
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_FILE = os.environ.get("RATE_LIMIT_FILE", os.path.join(tempfile.gettempdir(), "craftconnect-ratelimit"))
+# Buckets in the table (32 bytes each)
+RATE_LIMIT_SLOTS = int(os.environ.get("RATE_LIMIT_SLOTS", "65536"))
+# Behind one reverse proxy, e.g. HTTP_X_FORWARDED_FOR: the client IP is read
+# from this header instead of REMOTE_ADDR
+RATE_LIMIT_IP_HEADER = os.environ.get("RATE_LIMIT_IP_HEADER") or None
+# Per-view overrides of the limits in the @rate_limit decorators, e.g.
+# {'user_login': {'ip': '50/m'}}; None removes a limit
+RATE_LIMITS = {}
+
+# Idempotency-Key replay for assessment POSTs (see assessments/idempotency.py):
+# seconds a stored response is replayed, seconds a retry waits for the
+# first request still in progress before getting a 409, and seconds after
+# which an unfinished first request is presumed dead and a retry takes over
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", str(24 * 3600)))
+IDEMPOTENCY_WAIT = float(os.environ.get("IDEMPOTENCY_WAIT", "30"))
+IDEMPOTENCY_LEASE = float(os.environ.get("IDEMPOTENCY_LEASE", str(4 * IDEMPOTENCY_WAIT)))
+
+# Seconds a gap in job event ids may still be filled by a transaction that
+# commits late (jobs/events.py); readers wait that long before skipping it
+JOB_EVENT_SETTLE_SECONDS = float(os.environ.get("JOB_EVENT_SETTLE_SECONDS", "5"))
+
+# Adaptive assessments (see assessments/adaptive.py): an assessment stops once
+# the standard error of the ability estimate is at most ADAPTIVE_TARGET_SE
+# (and ADAPTIVE_MIN_ITEMS were asked), or after ADAPTIVE_MAX_ITEMS. Each
+# question is picked at random among the ADAPTIVE_TOP_K most informative
+ADAPTIVE_TARGET_SE = float(os.environ.get("ADAPTIVE_TARGET_SE", "0.4"))
+ADAPTIVE_MIN_ITEMS = int(os.environ.get("ADAPTIVE_MIN_ITEMS", "3"))
+ADAPTIVE_MAX_ITEMS = int(os.environ.get("ADAPTIVE_MAX_ITEMS", "12"))
+ADAPTIVE_TOP_K = int(os.environ.get("ADAPTIVE_TOP_K", "3"))
+# Answers a bank question needs before calibrate_item_bank fits it, and
+# seconds the calibrated bank of a trade is cached (calibration clears it)
+IRT_MIN_RESPONSES = int(os.environ.get("IRT_MIN_RESPONSES", "30"))
+ITEM_BANK_CACHE_TTL = int(os.environ.get("ITEM_BANK_CACHE_TTL", "300"))
+
+# Assessments read, rescored and written back per transaction by
+# rescore_assessments (see assessments/rescoring.py)
+RESCORE_CHUNK_SIZE = int(os.environ.get("RESCORE_CHUNK_SIZE", "2000"))
+
+# Rows fetched per round trip by the streaming exports (craftconnect/exports.py)
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "2000"))
+
+# Traffic capture for `manage.py replay_traffic` (see benchmarks/capture.py):
+# off unless TRAFFIC_CAPTURE_FILE is set. Fraction of requests recorded, and
+# largest JSON body kept (larger ones are recorded by size only)
+TRAFFIC_CAPTURE_FILE = os.environ.get("TRAFFIC_CAPTURE_FILE") or None
+TRAFFIC_CAPTURE_SAMPLE_RATE = float(os.environ.get("TRAFFIC_CAPTURE_SAMPLE_RATE", "0.01"))
+TRAFFIC_CAPTURE_MAX_BODY = int(os.environ.get("TRAFFIC_CAPTURE_MAX_BODY", str(64 * 1024)))
+TRAFFIC_CAPTURE_EXCLUDE = ['/admin/', '/static/', '/metrics']
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -191,4 +380,13 @@ SWAGGER_SETTINGS = {
         }
     },
     'DEFAULT_API_URL': '',
+    'DEFAULT_INFO': 'craftconnect.openapi.api_info',
 }
+REDOC_SETTINGS = {}
+
+# Build-time schema (see craftconnect/openapi.py); the docs fall back to
+# generating it per request when the file has not been built
+OPENAPI_SCHEMA_FILE = os.path.join(STATIC_ROOT, 'openapi.json')
+if os.path.exists(OPENAPI_SCHEMA_FILE):
+    SWAGGER_SETTINGS['SPEC_URL'] = STATIC_URL + 'openapi.json'
+    REDOC_SETTINGS['SPEC_URL'] = STATIC_URL + 'openapi.json'
@@ -0,0 +1,22 @@
+"""
+Settings for test runs: the project settings with test-only overrides.
+
+`manage.py test` selects this module unless DJANGO_SETTINGS_MODULE is set;
+other runners (pytest-django, ...) need DJANGO_SETTINGS_MODULE=
+craftconnect.test_settings.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# Test runs need no DATABASE_URL: without one they use a local SQLite file,
+# which Django replaces with an in-memory test database
+if not DATABASE_URL:  # noqa: F405
+    DATABASES['default'] = dj_database_url.parse(f"sqlite:///{BASE_DIR / 'db.sqlite3'}")  # noqa: F405
+
+# A private in-memory cache: the shared file cache outlives the test
+# database and would serve entries cached against an earlier run
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Tests share one client address and log in far more often than a person
+# would; RateLimitTests turn the limits back on
+RATE_LIMIT_ENABLED = False
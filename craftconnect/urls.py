@@ -16,13 +16,13 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from django.http import JsonResponse, HttpResponse
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.utils.crypto import constant_time_compare
+from craftconnect.metrics import registry
+from craftconnect import dbpool  # noqa: F401  (registers the connection pool metrics)
+from craftconnect.openapi import docs_view
 
 
 # Root health check endpoint
@@ -30,21 +30,19 @@ def home(request):
     return JsonResponse({"status": "ok", "message": "CraftConnect API is running"})
 
 
-# Swagger / ReDoc schema
-schema_view = get_schema_view(
-    openapi.Info(
-        title="CraftConnect API",
-        default_version='v1',
-        description="API documentation for CraftConnect Backend",
-        contact=openapi.Contact(email="teamcraftconnect@gmail.com"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-    authentication_classes=[JWTAuthentication],
-)
+# Prometheus scrape endpoint
+def metrics_view(request):
+    if settings.METRICS_TOKEN:
+        if not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"):
+            return HttpResponse(status=401)
+    elif not getattr(settings, "METRICS_PUBLIC", False):
+        return HttpResponse(status=403)
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 urlpatterns = [
     path('', home, name="home"),
+    path('metrics', metrics_view, name="metrics"),
 
     path('admin/', admin.site.urls),
     path('api/users/', include('users.urls')),
@@ -52,8 +50,8 @@ urlpatterns = [
     path("api/jobs/", include("jobs.urls")),
 
     # Swagger docs
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='redoc-ui'),
+    path('swagger/', docs_view('swagger'), name='swagger-ui'),
+    path('redoc/', docs_view('redoc'), name='redoc-ui'),
 ]
 
 if settings.DEBUG:
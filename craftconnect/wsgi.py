@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'craftconnect.settings')
 
 application = get_wsgi_application()
+
+# Import every view module now rather than on the first request, so the
+# work happens once in the gunicorn master (--preload) and is shared by the
+# forked workers
+from django.urls import get_resolver  # noqa: E402
+
+get_resolver().url_patterns
@@ -1,3 +1,19 @@
 from django.contrib import admin
+from django.utils import timezone
+from .models import JobPosting
+from .feed import sync_job_feed
 
-# Register your models here.
+
+@admin.register(JobPosting)
+class JobPostingAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'client', 'trade_category', 'status', 'assigned_artisan', 'created_at')
+    search_fields = ('title', 'location', 'trade_category__name')
+    list_filter = ('status', 'trade_category')
+    ordering = ('-created_at',)
+
+    def save_model(self, request, obj, form, change):
+        if obj.status in ("completed", "cancelled") and obj.closed_at is None:
+            obj.closed_at = timezone.now()
+        super().save_model(request, obj, form, change)
+        # Keep the denormalized feed in step with admin edits
+        sync_job_feed(obj)
@@ -0,0 +1,102 @@
+# Hot/cold split of job postings.
+#
+# Completed and cancelled jobs closed more than N days ago are moved from
+# JobPosting to ArchivedJobPosting in small batches, keeping the hot table
+# (and its indexes) limited to live jobs plus recent history. History
+# reads go through get_job() / job_history(), which fall through to the
+# archive.
+
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import JobPosting, ArchivedJobPosting
+
+FINISHED_STATUSES = ["completed", "cancelled"]
+
+ARCHIVED_FIELDS = [
+    "id", "client_id", "trade_category_id", "title", "description", "budget",
+    "location", "status", "assigned_artisan_id", "created_at", "closed_at",
+]
+
+
+def archivable_jobs(days):
+    cutoff = timezone.now() - timedelta(days=days)
+    return JobPosting.objects.filter(status__in=FINISHED_STATUSES, closed_at__lt=cutoff)
+
+
+def archive_batch(days, batch_size):
+    """Move one batch of finished jobs to the archive. Returns the number moved."""
+    with transaction.atomic():
+        rows = list(
+            archivable_jobs(days)
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        ArchivedJobPosting.objects.bulk_create(
+            [ArchivedJobPosting(**row) for row in rows],
+            ignore_conflicts=True
+        )
+        JobPosting.objects.filter(id__in=[row["id"] for row in rows]).delete()
+
+    return len(rows)
+
+
+def archive_finished_jobs(days, batch_size=500, pause=0.1, max_batches=None, progress=None):
+    """
+    Archive jobs finished more than `days` ago, one short transaction per
+    batch with `pause` seconds between batches so the primary is never
+    held busy for long. Returns the number of jobs moved.
+    """
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(days, batch_size)
+        if not count:
+            break
+        moved += count
+        batches += 1
+        if progress:
+            progress(moved)
+        if count < batch_size:
+            break
+        time.sleep(pause)
+    return moved
+
+
+# --------------------------------------------------------
+# READS WITH FALL-THROUGH
+# --------------------------------------------------------
+def get_job(job_id):
+    """JobPosting or ArchivedJobPosting with this id, or None."""
+    job = JobPosting.objects.filter(id=job_id).first()
+    if job is None:
+        job = ArchivedJobPosting.objects.filter(id=job_id).first()
+    return job
+
+
+def job_history(user, limit=50, before=None, before_id=None):
+    """
+    Jobs the user created or was assigned, newest first, from both the
+    hot table and the archive. (before, before_id) is the (created_at, id)
+    keyset cursor of the last job of the previous page, so jobs created at
+    the same instant are never skipped; before alone pages by created_at.
+    """
+    who = Q(client=user) | Q(assigned_artisan=user)
+    if before is not None:
+        if before_id is not None:
+            who &= Q(created_at__lt=before) | Q(created_at=before, id__lt=before_id)
+        else:
+            who &= Q(created_at__lt=before)
+
+    hot = list(JobPosting.objects.filter(who).order_by("-created_at", "-id")[:limit])
+    cold = list(ArchivedJobPosting.objects.filter(who).order_by("-created_at", "-id")[:limit])
+
+    return sorted(hot + cold, key=lambda job: (job.created_at, job.id), reverse=True)[:limit]
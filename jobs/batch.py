@@ -0,0 +1,175 @@
+# Batch create / cancel / complete of job postings.
+#
+# A whole batch runs in one transaction with a fixed number of queries
+# (bulk_create for new jobs, one UPDATE per transition type), whatever
+# the number of operations. Each operation still gets its own result.
+
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from craftconnect.cache import invalidate_tags
+from users.models import Artisan, TradeCategory
+from users.reputation import record_jobs_completed
+from .events import build_job_event
+from .feed import build_feed_entry
+from .matching import rank_jobs, refresh_candidates
+from .models import JobPosting, JobFeedEntry, JobEvent
+from .serializers import JobPostingSerializer, JobFeedSerializer
+
+MAX_OPERATIONS = 500
+
+OPERATIONS = ("create", "cancel", "complete")
+
+# Status a job may be in for each transition
+ALLOWED_FROM = {
+    "cancel": {"open", "assigned"},
+    "complete": {"open", "assigned"},
+}
+
+NEW_STATUS = {
+    "cancel": "cancelled",
+    "complete": "completed",
+}
+
+
+class BatchJobCreateSerializer(serializers.ModelSerializer):
+    # Plain id: categories are checked for the whole batch in one query
+    trade_category = serializers.IntegerField()
+
+    class Meta:
+        model = JobPosting
+        fields = ["title", "description", "budget", "location", "trade_category"]
+
+
+def error(index, op, status, message):
+    return {"index": index, "op": op, "status": status, "error": message}
+
+
+def process_batch(user, operations):
+    """Run a list of operations for a client. Returns one result per operation, in order."""
+    results = [None] * len(operations)
+    creates = []
+    transitions = []
+
+    for index, item in enumerate(operations):
+        op = item.get("op") if isinstance(item, dict) else None
+        if op not in OPERATIONS:
+            results[index] = error(index, op, 400, f"op must be one of {', '.join(OPERATIONS)}")
+            continue
+
+        if op == "create":
+            serializer = BatchJobCreateSerializer(data=item)
+            if serializer.is_valid():
+                creates.append((index, serializer.validated_data))
+            else:
+                results[index] = error(index, op, 400, serializer.errors)
+            continue
+
+        job_id = item.get("job_id")
+        if isinstance(job_id, bool) or not isinstance(job_id, int):
+            results[index] = error(index, op, 400, "job_id (integer) is required")
+            continue
+        transitions.append((index, op, job_id))
+
+    with transaction.atomic():
+        created = create_jobs(user, creates, results)
+        changed = transition_jobs(user, transitions, results)
+
+        JobEvent.objects.bulk_create(created + changed)
+
+    return results
+
+
+def create_jobs(user, creates, results):
+    """Insert the valid create operations. Returns their job.created events (unsaved)."""
+    if not creates:
+        return []
+
+    categories = TradeCategory.objects.in_bulk({data["trade_category"] for _, data in creates})
+
+    jobs, indexes = [], []
+    for index, data in creates:
+        category = categories.get(data["trade_category"])
+        if category is None:
+            results[index] = error(index, "create", 400, {"trade_category": ["Invalid trade category."]})
+            continue
+        jobs.append(JobPosting(client=user, **{**data, "trade_category": category}))
+        indexes.append(index)
+
+    if not jobs:
+        return []
+
+    jobs = JobPosting.objects.bulk_create(jobs)
+    entries = JobFeedEntry.objects.bulk_create([build_feed_entry(job) for job in jobs])
+    invalidate_tags("jobs:feed")
+    rank_jobs(jobs, user)
+
+    events = []
+    for index, job, entry in zip(indexes, jobs, entries):
+        results[index] = {"index": index, "op": "create", "status": 201, "job": JobPostingSerializer(job).data}
+        events.append(build_job_event(job, "job.created", JobFeedSerializer(entry).data))
+    return events
+
+
+def transition_jobs(user, transitions, results):
+    """Apply cancel / complete operations. Returns their events (unsaved)."""
+    if not transitions:
+        return []
+
+    jobs = (
+        JobPosting.objects.select_for_update(of=("self",))
+        .select_related("assigned_artisan")
+        .in_bulk({job_id for _, _, job_id in transitions})
+    )
+
+    now = timezone.now()
+    to_update = {"cancel": set(), "complete": set()}
+    accepted = []
+
+    for index, op, job_id in transitions:
+        job = jobs.get(job_id)
+        if job is None:
+            results[index] = error(index, op, 404, "Job not found")
+        elif job.client_id != user.id:
+            results[index] = error(index, op, 403, f"Only the client can {op} the job")
+        elif op == "complete" and job.status == "completed":
+            # Same as complete_job: completing twice is a no-op
+            results[index] = {"index": index, "op": op, "status": 200, "job": JobPostingSerializer(job).data}
+        elif job.status not in ALLOWED_FROM[op]:
+            results[index] = error(index, op, 409, f"Job cannot be {NEW_STATUS[op]} from status '{job.status}'")
+        else:
+            to_update[op].add(job_id)
+            job.status = NEW_STATUS[op]
+            job.closed_at = now
+            accepted.append((index, op, job))
+
+    for op, ids in to_update.items():
+        if ids:
+            JobPosting.objects.filter(id__in=ids).update(status=NEW_STATUS[op], closed_at=now)
+
+    closed = to_update["cancel"] | to_update["complete"]
+    if not closed:
+        return []
+    JobFeedEntry.objects.filter(job_id__in=closed).delete()
+    invalidate_tags("jobs:feed", *(f"job:{job_id}" for job_id in closed))
+
+    # Closing assigned jobs frees artisans and counts towards their reputation
+    emails = {job.assigned_artisan.email for _, _, job in accepted if job.assigned_artisan_id}
+    artisans = {a.email_address: a.id for a in Artisan.objects.filter(email_address__in=emails)} if emails else {}
+    completed = Counter(
+        artisans[job.assigned_artisan.email]
+        for _, op, job in accepted
+        if op == "complete" and job.assigned_artisan_id and job.assigned_artisan.email in artisans
+    )
+    record_jobs_completed(completed)
+    refresh_candidates(artisans.values())
+
+    events = []
+    for index, op, job in accepted:
+        data = JobPostingSerializer(job).data
+        results[index] = {"index": index, "op": op, "status": 200, "job": data}
+        events.append(build_job_event(job, f"job.{NEW_STATUS[op]}", data))
+    return events
@@ -0,0 +1,125 @@
+# In-process fan-out of job events to live subscribers (SSE / WebSocket).
+#
+# Each worker process has one JobBroker. A single relay task per process
+# tails the JobEvent outbox and publishes new rows to the subscribers
+# connected to that process, so events written by any worker reach every
+# subscriber while the database sees one small query per poll interval
+# instead of one per connected client.
+
+import asyncio
+import contextvars
+import logging
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .events import fetch_events_after, settled_event_id
+from .matching import normalize
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = getattr(settings, "JOB_STREAM_POLL_INTERVAL", 1.0)
+QUEUE_SIZE = getattr(settings, "JOB_STREAM_QUEUE_SIZE", 100)
+RELAY_BATCH_SIZE = 100
+
+# Key for subscribers that did not filter by trade category
+ALL_TRADES = None
+# What artisans subscribe to unless they ask for more: new jobs
+DEFAULT_EVENT_TYPES = frozenset({"job.created"})
+
+
+class Subscription:
+    __slots__ = ("queue", "trade_category_id", "location_words", "event_types", "dropped")
+
+    def __init__(self, trade_category_id=None, location=None, maxsize=QUEUE_SIZE, event_types=DEFAULT_EVENT_TYPES):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.trade_category_id = trade_category_id
+        self.location_words = frozenset(normalize(location).split())
+        self.event_types = frozenset(event_types)
+        self.dropped = 0
+
+    def matches(self, message):
+        if message["event"] not in self.event_types:
+            return False
+        if self.trade_category_id is not None and message["trade_category_id"] != self.trade_category_id:
+            return False
+        if not self.location_words:
+            return True
+        return self.location_words <= set(normalize(message["location"]).split())
+
+    def offer(self, message):
+        # A slow consumer loses events rather than holding up the fan-out
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+class JobBroker:
+    def __init__(self, poll_interval=POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.last_id = None
+        self._subscribers = defaultdict(set)
+        self._relay_task = None
+
+    @property
+    def subscriber_count(self):
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, trade_category_id=None, location=None, maxsize=QUEUE_SIZE, event_types=DEFAULT_EVENT_TYPES):
+        sub = Subscription(trade_category_id, location, maxsize, event_types)
+        self._subscribers[trade_category_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        subs = self._subscribers.get(sub.trade_category_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.trade_category_id]
+
+    def publish(self, message):
+        """Deliver one event to every matching subscriber of this process."""
+        delivered = 0
+        for key in (message["trade_category_id"], ALL_TRADES):
+            for sub in self._subscribers.get(key, ()):
+                if sub.matches(message):
+                    sub.offer(message)
+                    delivered += 1
+        if self.last_id is None or message["id"] > self.last_id:
+            self.last_id = message["id"]
+        return delivered
+
+    # ----------------------------------------------------
+    # OUTBOX RELAY
+    # ----------------------------------------------------
+    async def ensure_relay(self):
+        """Start the outbox relay for this process if it is not running."""
+        if self._relay_task is None or self._relay_task.done():
+            # Run outside the request's context: the relay outlives the
+            # request that started it, and its thread-sensitive executor
+            self._relay_task = contextvars.Context().run(asyncio.create_task, self._relay())
+
+    async def _relay(self):
+        # Start from the settled head of the outbox, not the newest id: an
+        # event still committing below it would never be relayed. Older
+        # history is replayed to clients that ask for it with Last-Event-ID
+        self.last_id = await sync_to_async(settled_event_id)()
+        while self.subscriber_count:
+            try:
+                # A full batch means there is more waiting: read it straight away
+                if await self.relay_once() == RELAY_BATCH_SIZE:
+                    continue
+            except Exception:
+                logger.exception("Job event relay failed")
+            await asyncio.sleep(self.poll_interval)
+
+    async def relay_once(self):
+        messages = await sync_to_async(fetch_events_after)(self.last_id or 0, RELAY_BATCH_SIZE)
+        for message in messages:
+            self.publish(message)
+        return len(messages)
+
+
+broker = JobBroker()
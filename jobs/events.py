@@ -0,0 +1,95 @@
+# Job event outbox.
+#
+# record_job_event() must be called inside the transaction that changes
+# the job, so an event exists if and only if the change was committed.
+#
+# Readers page through events by id, but ids are handed out at insert and
+# transactions commit in any order: event N may become visible after N+1.
+# So a read stops at a gap in the ids until the gap has been open for
+# JOB_EVENT_SETTLE_SECONDS (measured from the event after it); only then is
+# the missing id taken for a rolled back transaction and skipped. Every
+# reader (long-poll API, relay, tail_job_events) goes through
+# fetch_events_after, so none moves its cursor past an event that is still
+# committing.
+
+import datetime
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import JobEvent
+
+# How often a waiting long-poll request re-checks the outbox
+LONG_POLL_INTERVAL = 0.5
+
+
+def build_job_event(job, event_type, payload):
+    """Unsaved JobEvent, for bulk_create."""
+    return JobEvent(
+        job_id=job.id,
+        event_type=event_type,
+        trade_category_id=job.trade_category_id,
+        location=job.location,
+        payload=payload,
+    )
+
+
+def record_job_event(job, event_type, payload):
+    event = build_job_event(job, event_type, payload)
+    event.save()
+    return event
+
+
+def event_message(event):
+    """Plain dict sent to subscribers for a JobEvent row."""
+    return {
+        "id": event.id,
+        "event": event.event_type,
+        "job_id": event.job_id,
+        "trade_category_id": event.trade_category_id,
+        "location": event.location,
+        "data": event.payload,
+    }
+
+
+def fetch_events_after(after_id, limit=100):
+    """Events with an id greater than after_id, oldest first, up to the first gap that may still fill."""
+    settle = datetime.timedelta(seconds=getattr(settings, "JOB_EVENT_SETTLE_SECONDS", 5))
+    now = timezone.now()
+    messages = []
+    previous = after_id
+    for event in JobEvent.objects.filter(id__gt=after_id).order_by("id")[:limit]:
+        if event.id != previous + 1 and now - event.created_at < settle:
+            break
+        messages.append(event_message(event))
+        previous = event.id
+    return messages
+
+
+def wait_for_events(after_id, limit=100, timeout=0):
+    """
+    Like fetch_events_after, but if nothing is there yet keep checking
+    until something arrives or `timeout` seconds have passed.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        events = fetch_events_after(after_id, limit)
+        if events or time.monotonic() >= deadline:
+            return events
+        time.sleep(LONG_POLL_INTERVAL)
+
+
+def settled_event_id():
+    """
+    Where a new reader of live events starts: the newest event older than
+    the settle delay. Events after it, including ones still committing,
+    are read through fetch_events_after like any others.
+    """
+    settle = datetime.timedelta(seconds=getattr(settings, "JOB_EVENT_SETTLE_SECONDS", 5))
+    return (
+        JobEvent.objects.filter(created_at__lt=timezone.now() - settle)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    ) or 0
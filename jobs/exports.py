@@ -0,0 +1,36 @@
+# Columns and rows of the job export (see craftconnect/exports.py): live
+# postings, then archived ones.
+
+from django.db.models import BooleanField, Value
+
+from .models import ArchivedJobPosting, JobPosting
+
+JOB_COLUMNS = [
+    ("id", "id"),
+    ("client_id", "client_id"),
+    ("trade_category_id", "trade_category_id"),
+    ("trade_category", "trade_category__name"),
+    ("title", "title"),
+    ("description", "description"),
+    ("budget", "budget"),
+    ("location", "location"),
+    ("status", "status"),
+    ("assigned_artisan_id", "assigned_artisan_id"),
+    ("created_at", "created_at"),
+    ("closed_at", "closed_at"),
+    ("archived", "archived"),
+]
+
+
+def job_export(since=None, until=None, trade=None):
+    querysets = []
+    for model, archived in ((JobPosting, False), (ArchivedJobPosting, True)):
+        jobs = model.objects.annotate(archived=Value(archived, output_field=BooleanField())).order_by("id")
+        if since:
+            jobs = jobs.filter(created_at__gte=since)
+        if until:
+            jobs = jobs.filter(created_at__lt=until)
+        if trade:
+            jobs = jobs.filter(trade_category__name__iexact=trade)
+        querysets.append(jobs)
+    return querysets
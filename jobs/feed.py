@@ -0,0 +1,120 @@
+# Maintenance of the denormalized job feed (JobFeedEntry).
+#
+# Every code path that changes a JobPosting calls sync_job_feed() so the
+# feed table only ever contains open jobs with their display fields.
+
+from craftconnect.cache import invalidate_tags
+
+from .models import JobPosting, JobFeedEntry
+
+# Fields compared by the consistency checker
+FEED_FIELDS = [
+    "client_id",
+    "client_name",
+    "trade_category_id",
+    "trade_category_name",
+    "title",
+    "description",
+    "budget",
+    "location",
+    "created_at",
+]
+
+
+def client_display_name(user):
+    return user.get_full_name() or user.get_username()
+
+
+def build_feed_entry(job):
+    """Build an unsaved JobFeedEntry from a JobPosting."""
+    return JobFeedEntry(
+        job_id=job.id,
+        client_id=job.client_id,
+        client_name=client_display_name(job.client),
+        trade_category_id=job.trade_category_id,
+        trade_category_name=job.trade_category.name,
+        title=job.title,
+        description=job.description,
+        budget=job.budget,
+        location=job.location,
+        created_at=job.created_at,
+    )
+
+
+def sync_job_feed(job):
+    """Insert, refresh or drop the feed row for a job depending on its status."""
+    if job.status != "open":
+        JobFeedEntry.objects.filter(job_id=job.id).delete()
+        invalidate_tags("jobs:feed")
+        return None
+
+    entry = build_feed_entry(job)
+    entry.save()
+    return entry
+
+
+def open_jobs_queryset():
+    return (
+        JobPosting.objects.filter(status="open")
+        .select_related("client", "trade_category")
+        .order_by("id")
+    )
+
+
+def rebuild_job_feed(batch_size=1000):
+    """Recreate the whole feed from JobPosting. Returns the number of rows written."""
+    JobFeedEntry.objects.all().delete()
+
+    written = 0
+    batch = []
+    for job in open_jobs_queryset().iterator(chunk_size=batch_size):
+        batch.append(build_feed_entry(job))
+        if len(batch) >= batch_size:
+            JobFeedEntry.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+
+    if batch:
+        JobFeedEntry.objects.bulk_create(batch)
+        written += len(batch)
+
+    invalidate_tags("jobs:feed")
+    return written
+
+
+def check_job_feed(batch_size=1000):
+    """
+    Compare the feed with JobPosting.
+    Returns a dict with the ids of missing, stale and orphaned feed rows.
+    """
+    report = {"missing": [], "stale": [], "orphaned": []}
+    seen = set()
+
+    batch = []
+    for job in open_jobs_queryset().iterator(chunk_size=batch_size):
+        batch.append(job)
+        if len(batch) >= batch_size:
+            _check_batch(batch, report, seen)
+            batch = []
+    if batch:
+        _check_batch(batch, report, seen)
+
+    feed_ids = JobFeedEntry.objects.values_list("job_id", flat=True).iterator(chunk_size=batch_size)
+    report["orphaned"] = [job_id for job_id in feed_ids if job_id not in seen]
+
+    return report
+
+
+def _check_batch(jobs, report, seen):
+    entries = JobFeedEntry.objects.in_bulk([job.id for job in jobs])
+
+    for job in jobs:
+        seen.add(job.id)
+        entry = entries.get(job.id)
+        if entry is None:
+            report["missing"].append(job.id)
+            continue
+
+        expected = build_feed_entry(job)
+        if any(getattr(entry, f) != getattr(expected, f) for f in FEED_FIELDS):
+            report["stale"].append(job.id)
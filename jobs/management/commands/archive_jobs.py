@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from jobs.archive import archive_finished_jobs, archivable_jobs
+
+
+class Command(BaseCommand):
+    help = "Move completed/cancelled jobs closed more than N days ago to the archive table, in throttled batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--pause", type=float, default=0.1, help="Seconds to sleep between batches.")
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="Only count the jobs that would be archived.")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            count = archivable_jobs(options["days"]).count()
+            self.stdout.write(f"{count} jobs would be archived.")
+            return
+
+        moved = archive_finished_jobs(
+            options["days"],
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            max_batches=options["max_batches"],
+            progress=lambda n: self.stderr.write(f"\rarchived {n}", ending=""),
+        )
+        self.stderr.write("")
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} jobs."))
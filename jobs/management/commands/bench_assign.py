@@ -0,0 +1,136 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from benchmarks.db import create_benchmark_db, destroy_benchmark_db
+from jobs.models import JobEvent, JobPosting
+from jobs.views import assign_job
+from users.models import TradeCategory
+
+BENCH_PREFIX = "bench-assign-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency benchmark for assign_job: many artisans accept the same "
+        "job(s) at the same moment. Reports throughput and checks that every "
+        "job was assigned exactly once. Runs against a throwaway copy of the "
+        "configured database unless --use-configured-db is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--artisans", type=int, default=300, help="Concurrent accepting artisans (threads).")
+        parser.add_argument("--jobs", type=int, default=1, help="Open jobs the artisans race for.")
+        parser.add_argument(
+            "--use-configured-db", action="store_true",
+            help="Write straight into the configured database instead of a throwaway test database.",
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the benchmark rows afterwards (with --use-configured-db)."
+        )
+
+    def handle(self, *args, **options):
+        if options["use_configured_db"]:
+            self.run(options)
+            return
+        old_name = create_benchmark_db()
+        try:
+            self.run(options)
+        finally:
+            destroy_benchmark_db(old_name)
+
+    def run(self, options):
+        artisans, jobs = options["artisans"], options["jobs"]
+        # Unique per run, so rows kept by an earlier run never collide
+        prefix = f"{BENCH_PREFIX}{uuid.uuid4().hex[:8]}-"
+
+        category = TradeCategory.objects.create(name=f"{prefix}trade")
+        job_ids = []
+        try:
+            client = User.objects.create(username=f"{prefix}client")
+            User.objects.bulk_create([User(username=f"{prefix}artisan-{i}") for i in range(artisans)])
+            users = list(User.objects.filter(username__startswith=f"{prefix}artisan-"))
+            for i in range(jobs):
+                job_ids.append(JobPosting.objects.create(
+                    client=client, trade_category=category, title=f"Bench job {i}", description="bench"
+                ).id)
+            report = self.race(users, job_ids)
+        finally:
+            if not options["keep"]:
+                JobEvent.objects.filter(job_id__in=job_ids).delete()
+                JobPosting.objects.filter(id__in=job_ids).delete()
+                User.objects.filter(username__startswith=prefix).delete()
+                category.delete()
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def race(self, users, job_ids):
+        artisans, jobs = len(users), len(job_ids)
+
+        factory = APIRequestFactory()
+        barrier = threading.Barrier(artisans)
+        results = []
+        latencies = []
+        lock = threading.Lock()
+
+        def accept(user):
+            job_id = random.choice(job_ids)
+            request = factory.post(f"/api/jobs/{job_id}/assign/")
+            force_authenticate(request, user=user)
+            try:
+                barrier.wait()
+                started = time.perf_counter()
+                response = assign_job(request, job_id=job_id)
+                elapsed = time.perf_counter() - started
+                outcome = response.status_code
+            except Exception as exc:
+                elapsed, outcome = 0, type(exc).__name__
+            finally:
+                close_old_connections()
+                connection.close()
+            with lock:
+                results.append((job_id, user.id, outcome))
+                latencies.append(elapsed)
+
+        threads = [threading.Thread(target=accept, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - started
+
+        outcomes = Counter(str(outcome) for _, _, outcome in results)
+        winners = Counter(job_id for job_id, _, outcome in results if outcome == 200)
+        stored = dict(JobPosting.objects.filter(id__in=job_ids).values_list("id", "assigned_artisan_id"))
+        winner_ids = {job_id: user_id for job_id, user_id, outcome in results if outcome == 200}
+        latencies.sort()
+
+        report = {
+            "vendor": connection.vendor,
+            "artisans": artisans,
+            "jobs": jobs,
+            "wall_seconds": round(wall, 4),
+            "requests_per_second": round(len(results) / wall, 1),
+            "latency_ms": {
+                "p50": round(latencies[len(latencies) // 2] * 1000, 3),
+                "p99": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3),
+            },
+            "outcomes": dict(outcomes),
+            "double_assigned_jobs": [job_id for job_id, n in winners.items() if n > 1],
+            "unassigned_jobs": [job_id for job_id in {r[0] for r in results} if stored[job_id] is None],
+            "winner_mismatch": [job_id for job_id, user_id in winner_ids.items() if stored[job_id] != user_id],
+        }
+        report["correct"] = not (
+            report["double_assigned_jobs"] or report["unassigned_jobs"] or report["winner_mismatch"]
+        )
+        return report
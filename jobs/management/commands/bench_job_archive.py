@@ -0,0 +1,118 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.test import force_authenticate
+
+from jobs.archive import archive_finished_jobs, job_history
+from jobs.models import JobPosting, ArchivedJobPosting
+from jobs.views import list_jobs
+from users.models import TradeCategory
+
+BENCH_PREFIX = "bench-archive-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark hot-table queries before and after archiving: loads synthetic "
+        "postings where most are long finished, times the feed and JobPosting "
+        "reads, archives the finished ones and times them again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200_000)
+        parser.add_argument("--finished-ratio", type=float, default=0.9)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--keep", action="store_true")
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        category, _ = TradeCategory.objects.get_or_create(name=f"{BENCH_PREFIX}trade")
+        client, _ = User.objects.get_or_create(username=f"{BENCH_PREFIX}client")
+        artisan, _ = User.objects.get_or_create(username=f"{BENCH_PREFIX}artisan", email=f"{BENCH_PREFIX}artisan@example.com")
+
+        self.load(rng, client, artisan, category, options)
+
+        before = self.measure(client, artisan, options["repeat"])
+        started = time.perf_counter()
+        moved = archive_finished_jobs(days=30, batch_size=options["batch_size"], pause=0)
+        archive_seconds = time.perf_counter() - started
+        after = self.measure(client, artisan, options["repeat"])
+
+        report = {
+            "vendor": connection.vendor,
+            "rows": options["rows"],
+            "archived": moved,
+            "archive_seconds": round(archive_seconds, 2),
+            "before_ms": before,
+            "after_ms": after,
+        }
+
+        if not options["keep"]:
+            JobPosting.objects.filter(client=client).delete()
+            ArchivedJobPosting.objects.filter(client=client).delete()
+            User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+            category.delete()
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def load(self, rng, client, artisan, category, options):
+        now = timezone.now()
+        created = 0
+        while created < options["rows"]:
+            size = min(options["batch_size"], options["rows"] - created)
+            jobs = []
+            for _ in range(size):
+                finished = rng.random() < options["finished_ratio"]
+                jobs.append(JobPosting(
+                    client=client,
+                    trade_category=category,
+                    title="Bench job",
+                    description="bench",
+                    status=rng.choice(["completed", "cancelled"]) if finished else rng.choice(["open", "assigned"]),
+                    assigned_artisan=artisan if rng.random() < 0.5 else None,
+                    closed_at=now - timedelta(days=rng.randint(31, 700)) if finished else None,
+                ))
+            with transaction.atomic():
+                JobPosting.objects.bulk_create(jobs)
+            created += size
+
+    def measure(self, client, artisan, repeat):
+        factory = RequestFactory()
+
+        def feed():
+            request = factory.get("/api/jobs/all/")
+            force_authenticate(request, user=client)
+            list_jobs(request)
+
+        queries = {
+            "list_jobs_view": feed,
+            "open_jobs_by_status": lambda: list(
+                JobPosting.objects.filter(status="open").order_by("-created_at")[:50]
+            ),
+            "artisan_active_jobs": lambda: JobPosting.objects.filter(
+                assigned_artisan=artisan, status="assigned"
+            ).count(),
+            "client_history": lambda: job_history(client, limit=50),
+        }
+
+        results = {}
+        for name, run in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            results[name] = {
+                "p50": round(timings[len(timings) // 2] * 1000, 3),
+                "p95": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+            }
+        return results
@@ -0,0 +1,96 @@
+import json
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from jobs.models import JobPosting
+from jobs.search import search_jobs
+from users.models import TradeCategory
+
+BENCH_PREFIX = "bench-search-"
+
+VOCABULARY = (
+    "plumbing leak pipe sink kitchen bathroom tiles roof repair install wiring socket "
+    "electrical generator inverter solar panel fence gate welding door window paint wall "
+    "ceiling carpentry wardrobe cabinet furniture tailoring dress suit alteration hair "
+    "braiding makeup shoe cobbler mechanic engine brake car air conditioner fridge cleaning "
+    "compound garden borehole pump tank masonry block plaster screeding urgent weekend"
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark job search latency: loads synthetic postings (1M by default), "
+        "runs random queries and reports p50/p95/p99 latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--keep", action="store_true", help="Keep the synthetic postings afterwards.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        category, _ = TradeCategory.objects.get_or_create(name=f"{BENCH_PREFIX}trade")
+        client, _ = User.objects.get_or_create(username=f"{BENCH_PREFIX}client")
+
+        load_seconds = self.load(rng, client, category, options["rows"], options["batch_size"])
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE jobs_jobposting")
+
+        latencies = []
+        hits = 0
+        for _ in range(options["queries"]):
+            text = " ".join(rng.sample(VOCABULARY, rng.choice((1, 2, 3))))
+            started = time.perf_counter()
+            hits += len(search_jobs(text, limit=20))
+            latencies.append(time.perf_counter() - started)
+
+        latencies.sort()
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+
+        report = {
+            "vendor": connection.vendor,
+            "rows": options["rows"],
+            "load_seconds": round(load_seconds, 2),
+            "queries": options["queries"],
+            "avg_hits": round(hits / options["queries"], 2),
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": pct(1.0)},
+        }
+
+        if not options["keep"]:
+            JobPosting.objects.filter(client=client).delete()
+            client.delete()
+            category.delete()
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def load(self, rng, client, category, rows, batch_size):
+        started = time.perf_counter()
+        created = 0
+        while created < rows:
+            size = min(batch_size, rows - created)
+            with transaction.atomic():
+                JobPosting.objects.bulk_create([
+                    JobPosting(
+                        client=client,
+                        trade_category=category,
+                        title=" ".join(rng.choices(VOCABULARY, k=4)).capitalize(),
+                        description=" ".join(rng.choices(VOCABULARY, k=30)),
+                        status="open" if rng.random() < 0.3 else "completed",
+                    )
+                    for _ in range(size)
+                ])
+            created += size
+            self.stderr.write(f"\rloaded {created}/{rows}", ending="")
+        self.stderr.write("")
+        return time.perf_counter() - started
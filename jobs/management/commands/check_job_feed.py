@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.feed import check_job_feed, sync_job_feed
+from jobs.models import JobPosting, JobFeedEntry
+
+
+class Command(BaseCommand):
+    help = "Check the denormalized job feed against JobPosting and optionally repair it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--fix", action="store_true", help="Repair missing, stale and orphaned rows.")
+
+    def handle(self, *args, **options):
+        report = check_job_feed(batch_size=options["batch_size"])
+
+        for kind in ("missing", "stale", "orphaned"):
+            ids = report[kind]
+            self.stdout.write(f"{kind}: {len(ids)}" + (f" {ids[:20]}" if ids else ""))
+
+        problems = sum(len(ids) for ids in report.values())
+        if not problems:
+            self.stdout.write(self.style.SUCCESS("Job feed is consistent."))
+            return
+
+        if not options["fix"]:
+            raise CommandError(f"Job feed has {problems} inconsistent rows (run with --fix to repair).")
+
+        JobFeedEntry.objects.filter(job_id__in=report["orphaned"]).delete()
+        to_sync = report["missing"] + report["stale"]
+        for job in JobPosting.objects.filter(id__in=to_sync).select_related("client", "trade_category"):
+            sync_job_feed(job)
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired {problems} rows."))
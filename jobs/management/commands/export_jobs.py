@@ -0,0 +1,10 @@
+from craftconnect.exports import ExportCommand
+from jobs.exports import JOB_COLUMNS, job_export
+
+
+class Command(ExportCommand):
+    help = "Stream job postings, live and archived, as CSV or JSON Lines."
+    columns = JOB_COLUMNS
+
+    def querysets(self, since, until, trade):
+        return job_export(since, until, trade)
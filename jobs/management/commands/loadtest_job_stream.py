@@ -0,0 +1,86 @@
+import asyncio
+import json
+import time
+import tracemalloc
+
+import psutil
+from django.core.management.base import BaseCommand
+
+from jobs.broker import broker
+from jobs.stream import sse_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many idle in-process job stream subscribers and report memory per "
+        "connection and fan-out time. Measures the server-side state of a stream "
+        "(subscription, queue, generator and task), not socket buffers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, default=10000)
+        parser.add_argument("--trades", type=int, default=20, help="Spread subscribers over this many trade categories.")
+        parser.add_argument("--events", type=int, default=10, help="Events to publish for the fan-out measurement.")
+
+    def handle(self, *args, **options):
+        report = asyncio.run(self.run(options["subscribers"], options["trades"], options["events"]))
+        self.stdout.write(json.dumps(report, indent=2))
+
+    async def run(self, subscribers, trades, events):
+        process = psutil.Process()
+        received = [0]
+
+        async def consume(sub):
+            async for chunk in sse_events(sub):
+                if not chunk.startswith(":"):
+                    received[0] += 1
+
+        tracemalloc.start()
+        rss_before = process.memory_info().rss
+        traced_before = tracemalloc.get_traced_memory()[0]
+
+        tasks = []
+        for i in range(subscribers):
+            sub = broker.subscribe(trade_category_id=i % trades + 1)
+            tasks.append(asyncio.create_task(consume(sub)))
+        # Let every consumer reach its idle wait
+        await asyncio.sleep(0.5)
+
+        traced = tracemalloc.get_traced_memory()[0] - traced_before
+        rss = process.memory_info().rss - rss_before
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        delivered = 0
+        for n in range(1, events + 1):
+            delivered += broker.publish({
+                "id": n,
+                "event": "job.created",
+                "job_id": n,
+                "trade_category_id": n % trades + 1,
+                "location": "",
+                "data": {"title": f"Load test job {n}"},
+            })
+        publish_seconds = time.perf_counter() - started
+
+        while received[0] < delivered and time.perf_counter() - started < 30:
+            await asyncio.sleep(0.01)
+        drain_seconds = time.perf_counter() - started
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {
+            "subscribers": subscribers,
+            "trade_categories": trades,
+            "python_heap_bytes": traced,
+            "python_heap_bytes_per_subscriber": round(traced / subscribers, 1),
+            "rss_bytes": rss,
+            "rss_bytes_per_subscriber": round(rss / subscribers, 1),
+            "events_published": events,
+            "deliveries": delivered,
+            "received": received[0],
+            "publish_ms": round(publish_seconds * 1000, 3),
+            "delivered_to_consumers_ms": round(drain_seconds * 1000, 3),
+        }
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.matching import rebuild_candidates
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed per-trade artisan candidate lists used for job matching."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_candidates(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Candidate lists rebuilt with {written} artisans."))
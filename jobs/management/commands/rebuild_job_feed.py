@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.feed import rebuild_job_feed
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized job feed table from JobPosting."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_job_feed(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Job feed rebuilt with {written} open jobs."))
@@ -0,0 +1,57 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.events import fetch_events_after
+
+
+class Command(BaseCommand):
+    help = (
+        "Print job events from the outbox as JSON lines, in batches. "
+        "With --follow keeps waiting for new events; with --checkpoint the "
+        "last sequence number is saved so a restart resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--after", type=int, default=None, help="Start after this sequence number.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--follow", action="store_true", help="Keep tailing for new events.")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument("--checkpoint", help="File storing the last sequence number read.")
+
+    def handle(self, *args, **options):
+        checkpoint = options["checkpoint"]
+        after = options["after"]
+        if after is None:
+            after = self.read_checkpoint(checkpoint)
+
+        while True:
+            events = fetch_events_after(after, options["batch_size"])
+            for event in events:
+                self.stdout.write(json.dumps(event))
+            if events:
+                after = events[-1]["id"]
+                self.stdout.flush()
+                self.write_checkpoint(checkpoint, after)
+
+            if len(events) == options["batch_size"]:
+                continue
+            if not options["follow"]:
+                break
+            time.sleep(options["poll_interval"])
+
+    def read_checkpoint(self, path):
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+
+    def write_checkpoint(self, path, seq):
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(seq))
+        os.replace(tmp, path)
@@ -0,0 +1,230 @@
+# Job-to-artisan matching engine.
+#
+# Artisans are kept in a precomputed per-trade candidate list
+# (ArtisanCandidate) ordered by a job-independent base score. When a job
+# is created only a bounded slice of that list is ranked against the job,
+# and the result is stored as JobMatch rows.
+
+from collections import defaultdict
+
+from django.db.models import Count, OuterRef, Subquery
+
+from assessments.models import Assessment
+from users.models import Artisan
+from users.utils import client_for_user
+from .models import ArtisanCandidate, JobMatch, JobPosting
+
+# Ranking weights (scores are normalised to 0..1 before weighting)
+WEIGHT_ASSESSMENT = 0.45
+WEIGHT_WORKLOAD = 0.15
+WEIGHT_LOCATION = 0.30
+WEIGHT_LANGUAGE = 0.10
+
+# Active jobs at which the workload penalty is maxed out
+WORKLOAD_CAP = 5
+
+# How many candidates are read per job, and how many matches are kept
+CANDIDATE_POOL_SIZE = 200
+MATCHES_PER_JOB = 20
+
+
+def normalize(value):
+    return " ".join((value or "").lower().replace(",", " ").split())
+
+
+def base_score(assessment_score, active_jobs):
+    """Job-independent part of the ranking, stored on ArtisanCandidate."""
+    score = (assessment_score or 0) / 100
+    workload = min(active_jobs, WORKLOAD_CAP) / WORKLOAD_CAP
+    return WEIGHT_ASSESSMENT * score - WEIGHT_WORKLOAD * workload
+
+
+def location_similarity(a, b):
+    """
+    1.0 for the same place, otherwise the share of common words
+    ("Ikeja Lagos" vs "Lagos" -> 0.5). Locations are free text, so this is
+    the closest proxy for proximity we have.
+    """
+    a, b = normalize(a), normalize(b)
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    words_a, words_b = set(a.split()), set(b.split())
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def match_score(candidate, location, language):
+    score = candidate.base_score
+    score += WEIGHT_LOCATION * location_similarity(candidate.location, location)
+    if language and candidate.language == language:
+        score += WEIGHT_LANGUAGE
+    return round(score, 6)
+
+
+# --------------------------------------------------------
+# CANDIDATE LIST MAINTENANCE
+# --------------------------------------------------------
+def latest_assessment_score(artisan_id):
+    return (
+        Assessment.objects.filter(artisan_id=artisan_id, status="completed", score__isnull=False)
+        .order_by("-updated_at")
+        .values_list("score", flat=True)
+        .first()
+    )
+
+
+def active_job_count(email):
+    return JobPosting.objects.filter(assigned_artisan__email=email, status="assigned").count()
+
+
+def refresh_candidate(artisan):
+    """Recompute the candidate row of one artisan (call after any change that affects ranking)."""
+    if artisan is None:
+        return None
+
+    if artisan.trade_category_id is None:
+        ArtisanCandidate.objects.filter(artisan_id=artisan.id).delete()
+        return None
+
+    assessment_score = latest_assessment_score(artisan.id) or 0
+    active_jobs = active_job_count(artisan.email_address)
+
+    candidate, _ = ArtisanCandidate.objects.update_or_create(
+        artisan_id=artisan.id,
+        defaults={
+            "trade_category_id": artisan.trade_category_id,
+            "location": normalize(artisan.location),
+            "language": normalize(artisan.language),
+            "assessment_score": assessment_score,
+            "active_jobs": active_jobs,
+            "base_score": base_score(assessment_score, active_jobs),
+        }
+    )
+    return candidate
+
+
+def annotated_artisans():
+    """Artisans with a trade, annotated with their latest score and active job count."""
+    latest_score = Subquery(
+        Assessment.objects.filter(artisan=OuterRef("pk"), status="completed", score__isnull=False)
+        .order_by("-updated_at")
+        .values("score")[:1]
+    )
+    active_jobs = Subquery(
+        JobPosting.objects.filter(assigned_artisan__email=OuterRef("email_address"), status="assigned")
+        .values("assigned_artisan__email")
+        .annotate(n=Count("id"))
+        .values("n")[:1]
+    )
+    return (
+        Artisan.objects.filter(trade_category__isnull=False)
+        .annotate(latest_score=latest_score, active_jobs=active_jobs)
+        .order_by("id")
+    )
+
+
+def build_candidate(artisan):
+    score = artisan.latest_score or 0
+    jobs = artisan.active_jobs or 0
+    return ArtisanCandidate(
+        artisan_id=artisan.id,
+        trade_category_id=artisan.trade_category_id,
+        location=normalize(artisan.location),
+        language=normalize(artisan.language),
+        assessment_score=score,
+        active_jobs=jobs,
+        base_score=base_score(score, jobs),
+    )
+
+
+def refresh_candidates(artisan_ids):
+    """Recompute the candidate rows of several artisans with a fixed number of queries."""
+    artisan_ids = list(artisan_ids)
+    if not artisan_ids:
+        return []
+    candidates = [build_candidate(a) for a in annotated_artisans().filter(id__in=artisan_ids)]
+    ArtisanCandidate.objects.filter(artisan_id__in=artisan_ids).delete()
+    return ArtisanCandidate.objects.bulk_create(candidates)
+
+
+def rebuild_candidates(batch_size=1000):
+    """Recompute every candidate row in batches. Returns the number of rows written."""
+    ArtisanCandidate.objects.all().delete()
+
+    written = 0
+    batch = []
+    for artisan in annotated_artisans().iterator(chunk_size=batch_size):
+        batch.append(build_candidate(artisan))
+        if len(batch) >= batch_size:
+            ArtisanCandidate.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+
+    if batch:
+        ArtisanCandidate.objects.bulk_create(batch)
+        written += len(batch)
+
+    return written
+
+
+# --------------------------------------------------------
+# RANKING
+# --------------------------------------------------------
+def candidate_pools(jobs):
+    """
+    Bounded candidate set per trade for a group of jobs: the best base
+    scores in the trade, plus artisans in exactly the same location as one
+    of the jobs (who may rank lower on base score but win on proximity).
+    Two queries per trade, however many jobs there are.
+    """
+    locations = defaultdict(set)
+    for job in jobs:
+        locations[job.trade_category_id].add(normalize(job.location))
+
+    pools = {}
+    for trade_id, trade_locations in locations.items():
+        in_trade = ArtisanCandidate.objects.filter(trade_category_id=trade_id)
+        pool = {c.artisan_id: c for c in in_trade.order_by("-base_score")[:CANDIDATE_POOL_SIZE]}
+
+        trade_locations.discard("")
+        if trade_locations:
+            nearby = in_trade.filter(location__in=trade_locations).order_by("-base_score")
+            for c in nearby[:CANDIDATE_POOL_SIZE * len(trade_locations)]:
+                pool[c.artisan_id] = c
+
+        pools[trade_id] = list(pool.values())
+    return pools
+
+
+def rank_jobs(jobs, client):
+    """
+    Rank candidates for new jobs of one client and store the top matches
+    of each with a single insert. Returns the JobMatch rows.
+    """
+    if not jobs:
+        return []
+
+    profile = client_for_user(client)
+    language = normalize(profile.language) if profile else ""
+    pools = candidate_pools(jobs)
+
+    matches = []
+    for job in jobs:
+        location = normalize(job.location)
+        scored = sorted(
+            ((match_score(c, location, language), c.artisan_id) for c in pools[job.trade_category_id]),
+            key=lambda item: (-item[0], item[1])
+        )[:MATCHES_PER_JOB]
+        matches.extend(
+            JobMatch(job=job, artisan_id=artisan_id, score=score, rank=rank)
+            for rank, (score, artisan_id) in enumerate(scored, start=1)
+        )
+
+    return JobMatch.objects.bulk_create(matches)
+
+
+def rank_job_candidates(job):
+    """Rank candidates for a job and store the top matches. Returns the JobMatch rows."""
+    JobMatch.objects.filter(job=job).delete()
+    return rank_jobs([job], job.client)
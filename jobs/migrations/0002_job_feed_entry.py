@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_job_feed(apps, schema_editor):
+    JobPosting = apps.get_model('jobs', 'JobPosting')
+    JobFeedEntry = apps.get_model('jobs', 'JobFeedEntry')
+
+    entries = []
+    for job in JobPosting.objects.filter(status='open').select_related('client', 'trade_category').iterator():
+        client = job.client
+        entries.append(JobFeedEntry(
+            job_id=job.id,
+            client_id=job.client_id,
+            client_name=f"{client.first_name} {client.last_name}".strip() or client.username,
+            trade_category_id=job.trade_category_id,
+            trade_category_name=job.trade_category.name,
+            title=job.title,
+            description=job.description,
+            budget=job.budget,
+            location=job.location,
+            created_at=job.created_at,
+        ))
+    JobFeedEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFeedEntry',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='jobs.jobposting')),
+                ('client_id', models.IntegerField()),
+                ('client_name', models.CharField(blank=True, max_length=255)),
+                ('trade_category_id', models.BigIntegerField()),
+                ('trade_category_name', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('budget', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-created_at'], name='jobs_feed_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_job_feed, migrations.RunPython.noop),
+    ]
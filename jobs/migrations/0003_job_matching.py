@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_feed_entry'),
+        ('users', '0002_artisan_bio_artisan_business_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtisanCandidate',
+            fields=[
+                ('artisan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='candidate_profile', serialize=False, to='users.artisan')),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('language', models.CharField(blank=True, max_length=50)),
+                ('assessment_score', models.FloatField(default=0)),
+                ('active_jobs', models.PositiveIntegerField(default=0)),
+                ('base_score', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('trade_category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidates', to='users.tradecategory')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trade_category', '-base_score'], name='jobs_cand_trade_score_idx'), models.Index(fields=['trade_category', 'location'], name='jobs_cand_trade_loc_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('artisan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_matches', to='users.artisan')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='jobs.jobposting')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'rank'], name='jobs_match_job_rank_idx'), models.Index(fields=['artisan', '-score'], name='jobs_match_artisan_idx')],
+                'unique_together': {('job', 'artisan')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_matching'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.BigIntegerField(db_index=True)),
+                ('event_type', models.CharField(choices=[('job.created', 'Job created')], max_length=50)),
+                ('trade_category_id', models.BigIntegerField(blank=True, null=True)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Full-text search over JobPosting.title / description.
+#
+# PostgreSQL: a generated tsvector column with a GIN index.
+# SQLite (local runs): an external-content FTS5 table kept in sync by triggers.
+
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE jobs_jobposting ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX jobs_jobposting_search_idx ON jobs_jobposting USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS jobs_jobposting_search_idx",
+    "ALTER TABLE jobs_jobposting DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE jobs_jobposting_fts USING fts5(
+        title, description, content='jobs_jobposting', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER jobs_jobposting_fts_ai AFTER INSERT ON jobs_jobposting BEGIN
+        INSERT INTO jobs_jobposting_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER jobs_jobposting_fts_ad AFTER DELETE ON jobs_jobposting BEGIN
+        INSERT INTO jobs_jobposting_fts(jobs_jobposting_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER jobs_jobposting_fts_au AFTER UPDATE OF title, description ON jobs_jobposting BEGIN
+        INSERT INTO jobs_jobposting_fts(jobs_jobposting_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO jobs_jobposting_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO jobs_jobposting_fts(jobs_jobposting_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS jobs_jobposting_fts_au",
+    "DROP TRIGGER IF EXISTS jobs_jobposting_fts_ad",
+    "DROP TRIGGER IF EXISTS jobs_jobposting_fts_ai",
+    "DROP TABLE IF EXISTS jobs_jobposting_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {"postgresql": postgres, "sqlite": sqlite}.get(schema_editor.connection.vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_event_outbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_REVERSE, SQLITE_REVERSE),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobevent',
+            name='event_type',
+            field=models.CharField(choices=[('job.created', 'Job created'), ('job.assigned', 'Job assigned'), ('job.completed', 'Job completed')], max_length=50),
+        ),
+    ]
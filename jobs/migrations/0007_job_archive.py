@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_closed_at(apps, schema_editor):
+    # The real finish time of existing jobs is unknown; created_at is the
+    # conservative lower bound
+    JobPosting = apps.get_model('jobs', 'JobPosting')
+    JobPosting.objects.filter(status__in=['completed', 'cancelled'], closed_at__isnull=True).update(closed_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_event_types'),
+        ('users', '0003_artisan_reputation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJobPosting',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('budget', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('assigned', 'Assigned'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_closed_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['status', '-created_at'], name='jobs_post_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['status', 'closed_at'], name='jobs_post_status_closed_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedjobposting',
+            name='assigned_artisan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_assigned_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedjobposting',
+            name='client',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedjobposting',
+            name='trade_category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.tradecategory'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedjobposting',
+            index=models.Index(fields=['client', '-created_at'], name='jobs_arch_client_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedjobposting',
+            index=models.Index(fields=['assigned_artisan', '-created_at'], name='jobs_arch_artisan_idx'),
+        ),
+    ]
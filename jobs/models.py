@@ -27,6 +27,160 @@ class JobPosting(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the job is completed or cancelled; drives archival
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created_at"], name="jobs_post_status_created_idx"),
+            models.Index(fields=["status", "closed_at"], name="jobs_post_status_closed_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+# Cold storage for jobs finished long ago (see jobs/archive.py).
+# Same columns and ids as JobPosting, so archived jobs read the same way.
+class ArchivedJobPosting(models.Model):
+    STATUS_CHOICES = JobPosting.STATUS_CHOICES
+
+    id = models.BigIntegerField(primary_key=True)
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_jobs"
+    )
+    trade_category = models.ForeignKey("users.TradeCategory", on_delete=models.CASCADE)
+
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    budget = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    location = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+
+    assigned_artisan = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="archived_assigned_jobs"
+    )
+
+    created_at = models.DateTimeField()
+    closed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["client", "-created_at"], name="jobs_arch_client_idx"),
+            models.Index(fields=["assigned_artisan", "-created_at"], name="jobs_arch_artisan_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+# Denormalized read model for the open-jobs feed.
+# One row per open job, holding exactly what list_jobs returns,
+# so the feed is served without joins.
+class JobFeedEntry(models.Model):
+    job = models.OneToOneField(
+        JobPosting,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="feed_entry"
+    )
+    client_id = models.IntegerField()
+    client_name = models.CharField(max_length=255, blank=True)
+    trade_category_id = models.BigIntegerField()
+    trade_category_name = models.CharField(max_length=100)
+
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    budget = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    location = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at"], name="jobs_feed_created_idx"),
+        ]
 
     def __str__(self):
         return self.title
+
+
+# Precomputed per-trade candidate list used by the matching engine.
+# One row per artisan with a trade category; base_score folds in the
+# job-independent signals (assessment score, workload).
+class ArtisanCandidate(models.Model):
+    artisan = models.OneToOneField(
+        "users.Artisan",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="candidate_profile"
+    )
+    trade_category = models.ForeignKey(
+        "users.TradeCategory",
+        on_delete=models.CASCADE,
+        related_name="candidates"
+    )
+    location = models.CharField(max_length=100, blank=True)
+    language = models.CharField(max_length=50, blank=True)
+    assessment_score = models.FloatField(default=0)
+    active_jobs = models.PositiveIntegerField(default=0)
+    base_score = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["trade_category", "-base_score"], name="jobs_cand_trade_score_idx"),
+            models.Index(fields=["trade_category", "location"], name="jobs_cand_trade_loc_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.artisan_id} - {self.trade_category_id} ({self.base_score:.2f})"
+
+
+# Ranked artisans for a job, computed when the job is created.
+class JobMatch(models.Model):
+    job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name="matches")
+    artisan = models.ForeignKey("users.Artisan", on_delete=models.CASCADE, related_name="job_matches")
+    score = models.FloatField()
+    rank = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("job", "artisan")
+        indexes = [
+            models.Index(fields=["job", "rank"], name="jobs_match_job_rank_idx"),
+            models.Index(fields=["artisan", "-score"], name="jobs_match_artisan_idx"),
+        ]
+
+    def __str__(self):
+        return f"Job {self.job_id} -> Artisan {self.artisan_id} (#{self.rank})"
+
+
+# Append-only outbox of job events, written in the same transaction
+# as the change. Workers relay new rows to their live subscribers.
+class JobEvent(models.Model):
+    EVENT_CHOICES = [
+        ("job.created", "Job created"),
+        ("job.assigned", "Job assigned"),
+        ("job.completed", "Job completed"),
+        ("job.cancelled", "Job cancelled"),
+    ]
+
+    job_id = models.BigIntegerField(db_index=True)
+    event_type = models.CharField(max_length=50, choices=EVENT_CHOICES)
+    trade_category_id = models.BigIntegerField(null=True, blank=True)
+    location = models.CharField(max_length=255, blank=True)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"#{self.id} {self.event_type} (job {self.job_id})"
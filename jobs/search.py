@@ -0,0 +1,123 @@
+# Ranked full-text search over open job postings.
+#
+# Backed by the search_vector column + GIN index on PostgreSQL and by the
+# jobs_jobposting_fts FTS5 table on SQLite (see migration 0005). Text
+# relevance is combined with recency so that, between equally relevant
+# postings, newer ones come first.
+#
+# Highlights are HTML: the database marks matches with private-use
+# characters, the text (user input) is escaped, and only then do the marks
+# become <mark> tags.
+
+import html
+import re
+
+from django.db import connection
+
+# Age (in days) at which a posting's relevance is halved
+RECENCY_HALF_LIFE_DAYS = 30
+
+MAX_RESULTS = 50
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+MATCH_START = "\ue000"
+MATCH_STOP = "\ue001"
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+POSTGRES_SQL = f"""
+    SELECT hit.id, hit.score,
+           ts_headline('english', hit.title, hit.query,
+                       'StartSel={MATCH_START}, StopSel={MATCH_STOP}, HighlightAll=true'),
+           ts_headline('english', hit.description, hit.query,
+                       'StartSel={MATCH_START}, StopSel={MATCH_STOP}, MaxFragments=2, MaxWords=20, MinWords=8')
+    FROM (
+        SELECT j.id, j.title, j.description, q.query,
+               ts_rank_cd(j.search_vector, q.query)
+                 / (1 + EXTRACT(EPOCH FROM (now() - j.created_at)) / 86400 / %s) AS score
+        FROM jobs_jobposting j, websearch_to_tsquery('english', %s) AS q(query)
+        WHERE j.search_vector @@ q.query AND j.status = 'open' {{trade_filter}}
+        ORDER BY score DESC, j.id DESC
+        LIMIT %s
+    ) hit
+    ORDER BY hit.score DESC, hit.id DESC
+"""
+
+SQLITE_SQL = f"""
+    SELECT j.id,
+           -bm25(jobs_jobposting_fts, 2.0, 1.0)
+             / (1 + (julianday('now') - julianday(j.created_at)) / %s) AS score,
+           highlight(jobs_jobposting_fts, 0, '{MATCH_START}', '{MATCH_STOP}'),
+           snippet(jobs_jobposting_fts, 1, '{MATCH_START}', '{MATCH_STOP}', '…', 16)
+    FROM jobs_jobposting_fts
+    JOIN jobs_jobposting j ON j.id = jobs_jobposting_fts.rowid
+    WHERE jobs_jobposting_fts MATCH %s AND j.status = 'open' {{trade_filter}}
+    ORDER BY score DESC, j.id DESC
+    LIMIT %s
+"""
+
+
+class SearchNotSupported(Exception):
+    pass
+
+
+def highlight_html(text):
+    """Escape text for HTML and wrap the matches marked by the database in <mark>."""
+    if text is None:
+        return None
+    return html.escape(text).replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_STOP, HIGHLIGHT_STOP)
+
+
+def fts5_query(text):
+    """
+    Turn free text into a safe FTS5 expression: every word quoted (so
+    user input cannot inject query syntax), all words required, and the
+    last word matched as a prefix for search-as-you-type.
+    """
+    words = WORD_RE.findall(text)
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_jobs(text, trade_category_id=None, limit=20):
+    """
+    Return up to `limit` hits as dicts: id, score, title_highlight,
+    description_snippet. Best match first.
+    """
+    limit = max(1, min(int(limit), MAX_RESULTS))
+    trade_filter = "AND j.trade_category_id = %s" if trade_category_id else ""
+
+    if connection.vendor == "postgresql":
+        sql = POSTGRES_SQL.format(trade_filter=trade_filter)
+        query = text
+    elif connection.vendor == "sqlite":
+        sql = SQLITE_SQL.format(trade_filter=trade_filter)
+        query = fts5_query(text)
+    else:
+        raise SearchNotSupported(f"Job search is not available on {connection.vendor}")
+
+    if not query.strip():
+        return []
+
+    params = [RECENCY_HALF_LIFE_DAYS, query]
+    if trade_category_id:
+        params.append(trade_category_id)
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "id": job_id,
+            "score": round(float(score), 6),
+            "title_highlight": highlight_html(title),
+            "description_snippet": highlight_html(snippet),
+        }
+        for job_id, score, title, snippet in rows
+    ]
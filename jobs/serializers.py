@@ -1,8 +1,76 @@
 from rest_framework import serializers
-from .models import JobPosting
+from .models import JobPosting, ArchivedJobPosting, JobFeedEntry, JobMatch
 
 class JobPostingSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobPosting
         fields = "__all__"
-        read_only_fields = ["id", "client", "status", "assigned_artisan", "created_at"]
+        read_only_fields = ["id", "client", "status", "assigned_artisan", "created_at", "closed_at"]
+
+
+class ArchivedJobPostingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedJobPosting
+        fields = "__all__"
+
+
+def serialize_job(job):
+    """Serialize a live or archived job, flagging which one it is."""
+    if isinstance(job, ArchivedJobPosting):
+        data = ArchivedJobPostingSerializer(job).data
+        data["archived"] = True
+    else:
+        data = JobPostingSerializer(job).data
+        data["archived"] = False
+    return data
+
+
+# Serves the open-jobs feed straight from JobFeedEntry.
+# Output keeps the JobPostingSerializer shape plus the display names.
+class JobFeedSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="job_id")
+    client = serializers.IntegerField(source="client_id")
+    trade_category = serializers.IntegerField(source="trade_category_id")
+    status = serializers.SerializerMethodField()
+    assigned_artisan = serializers.SerializerMethodField()
+
+    class Meta:
+        model = JobFeedEntry
+        fields = [
+            "id", "client", "client_name", "trade_category", "trade_category_name",
+            "title", "description", "budget", "location", "status",
+            "assigned_artisan", "created_at",
+        ]
+
+    def get_status(self, obj):
+        return "open"
+
+    def get_assigned_artisan(self, obj):
+        return None
+
+
+# Feed entry with the matching score, for an artisan's recommendations
+class RecommendedJobSerializer(JobFeedSerializer):
+    match_score = serializers.FloatField()
+
+    class Meta(JobFeedSerializer.Meta):
+        fields = JobFeedSerializer.Meta.fields + ["match_score"]
+
+
+class JobMatchSerializer(serializers.ModelSerializer):
+    artisan_id = serializers.IntegerField(source="artisan.id")
+    full_name = serializers.SerializerMethodField()
+    location = serializers.CharField(source="artisan.location")
+    language = serializers.CharField(source="artisan.language")
+    assessment_score = serializers.FloatField(source="artisan.candidate_profile.assessment_score")
+    active_jobs = serializers.IntegerField(source="artisan.candidate_profile.active_jobs")
+
+    class Meta:
+        model = JobMatch
+        fields = [
+            "rank", "score", "artisan_id", "full_name", "location",
+            "language", "assessment_score", "active_jobs",
+        ]
+
+    def get_full_name(self, obj):
+        return f"{obj.artisan.first_name} {obj.artisan.last_name}"
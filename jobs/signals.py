@@ -0,0 +1,22 @@
+# Cache invalidation for job data (see craftconnect/cache.py).
+#
+# Bulk writes (QuerySet.update / delete, bulk_create) send no signals; code
+# that uses them calls invalidate_tags itself (jobs/feed.py, jobs/batch.py,
+# assign_job).
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from craftconnect.cache import invalidate_tags
+
+from .models import JobFeedEntry, JobPosting
+
+
+@receiver([post_save, post_delete], sender=JobPosting)
+def job_changed(sender, instance, **kwargs):
+    invalidate_tags(f"job:{instance.pk}", "jobs:feed")
+
+
+@receiver(post_save, sender=JobFeedEntry)
+def feed_entry_saved(sender, instance, **kwargs):
+    invalidate_tags("jobs:feed")
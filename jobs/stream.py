@@ -0,0 +1,161 @@
+# Push delivery of job events over Server-Sent Events and WebSocket.
+#
+# Both transports need the ASGI app (craftconnect.asgi); under WSGI an
+# open stream would pin a whole worker thread.
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+
+from craftconnect.authentication import CachedJWTAuthentication
+from users.utils import artisan_for_user
+from .broker import DEFAULT_EVENT_TYPES, broker
+from .events import fetch_events_after
+from .models import JobEvent
+
+HEARTBEAT_INTERVAL = getattr(settings, "JOB_STREAM_HEARTBEAT", 15)
+BACKLOG_LIMIT = 100
+
+
+def authenticate_token(raw_token):
+    """Return the user for a raw JWT, or None if it is missing or invalid."""
+    if not raw_token:
+        return None
+    auth = CachedJWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def token_from_request(request):
+    # EventSource cannot set headers, so ?token= is accepted as well
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header.split(" ", 1)[1]
+    return request.GET.get("token")
+
+
+def resolve_filters(user, trade_category, location):
+    """Default an artisan's subscription to their own trade."""
+    if trade_category:
+        return int(trade_category), location
+    artisan = artisan_for_user(user)
+    if artisan:
+        return artisan.trade_category_id, location
+    return None, location
+
+
+def parse_event_types(value):
+    """?events=job.created,job.assigned -> event types; new jobs only by default. Raises ValueError."""
+    if not value:
+        return DEFAULT_EVENT_TYPES
+    types = frozenset(part.strip() for part in value.split(",") if part.strip())
+    known = {choice for choice, _ in JobEvent.EVENT_CHOICES}
+    if not types or not types <= known:
+        raise ValueError(f"events must be a comma-separated list of: {', '.join(sorted(known))}")
+    return types
+
+
+def format_sse(message):
+    return (
+        f"id: {message['id']}\n"
+        f"event: {message['event']}\n"
+        f"data: {json.dumps(message)}\n\n"
+    )
+
+
+async def job_event_stream(sub, last_event_id=None, heartbeat=HEARTBEAT_INTERVAL, fmt=format_sse):
+    """
+    Yield formatted events for a subscription: first the backlog after
+    last_event_id (for reconnecting clients), then live events.
+    Sends a heartbeat when idle and unsubscribes when the client goes away.
+    """
+    sent_id = 0
+    try:
+        # Page through everything missed (e.g. across a worker restart):
+        # live events published meanwhile wait in the queue
+        after = last_event_id
+        while after:
+            backlog = await sync_to_async(fetch_events_after)(after, BACKLOG_LIMIT)
+            for message in backlog:
+                after = message["id"]
+                if sub.matches(message):
+                    sent_id = message["id"]
+                    yield fmt(message)
+            if len(backlog) < BACKLOG_LIMIT:
+                break
+
+        while True:
+            try:
+                message = await asyncio.wait_for(sub.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if message["id"] <= sent_id:
+                continue
+            sent_id = message["id"]
+            yield fmt(message)
+    finally:
+        broker.unsubscribe(sub)
+
+
+async def sse_events(sub, last_event_id=None):
+    async for chunk in job_event_stream(sub, last_event_id):
+        yield chunk if chunk is not None else ": keep-alive\n\n"
+
+
+# --------------------------------------------------------
+# WEBSOCKET (plain ASGI, routed from craftconnect.asgi)
+# --------------------------------------------------------
+async def job_events_websocket(scope, receive, send):
+    """
+    ws://<host>/ws/jobs/?token=<jwt>&trade_category=<id>&location=<text>&last_event_id=<seq>&events=<types>
+
+    Sends each job event as a JSON text frame (new jobs only unless
+    events lists other types).
+    """
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    params = {k: v[0] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+    user = await sync_to_async(authenticate_token)(params.get("token"))
+    if user is None:
+        await send({"type": "websocket.close", "code": 4401})
+        return
+
+    try:
+        trade_category_id, location = await sync_to_async(resolve_filters)(
+            user, params.get("trade_category"), params.get("location")
+        )
+        last_event_id = int(params.get("last_event_id") or 0)
+        event_types = parse_event_types(params.get("events"))
+    except ValueError:
+        await send({"type": "websocket.close", "code": 4400})
+        return
+
+    await send({"type": "websocket.accept"})
+
+    sub = broker.subscribe(trade_category_id, location, event_types=event_types)
+    await broker.ensure_relay()
+
+    async def pump():
+        async for payload in job_event_stream(sub, last_event_id, fmt=json.dumps):
+            if payload is not None:
+                await send({"type": "websocket.send", "text": payload})
+
+    async def wait_for_disconnect():
+        while (await receive())["type"] != "websocket.disconnect":
+            pass
+
+    sender = asyncio.create_task(pump())
+    closer = asyncio.create_task(wait_for_disconnect())
+    done, pending = await asyncio.wait({sender, closer}, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    broker.unsubscribe(sub)
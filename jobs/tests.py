@@ -1,3 +1,527 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import threading
+import unittest
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from assessments.models import Assessment
+from craftconnect.querycheck import QueryBudgetMixin
+from users.models import Artisan, TradeCategory
+from .feed import check_job_feed, rebuild_job_feed
+from .matching import rank_job_candidates, refresh_candidate
+from .archive import archive_finished_jobs
+from .broker import Subscription
+from .events import fetch_events_after, settled_event_id
+from .models import ArchivedJobPosting, ArtisanCandidate, JobPosting, JobFeedEntry, JobEvent
+from .stream import parse_event_types
+from .views import assign_job
+
+
+class BatchJobsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="estate-manager")
+        self.other = User.objects.create(username="someone-else")
+        self.category = TradeCategory.objects.create(name="Plumber")
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def create_ops(self, n):
+        return [
+            {"op": "create", "title": f"Job {i}", "description": "Fix it", "trade_category": self.category.id}
+            for i in range(n)
+        ]
+
+    def post(self, operations):
+        return self.api.post("/api/jobs/batch/", {"operations": operations}, format="json")
+
+    def make_jobs(self, n, client=None, status="open"):
+        return JobPosting.objects.bulk_create([
+            JobPosting(client=client or self.user, trade_category=self.category,
+                       title=f"Existing {i}", description="d", status=status)
+            for i in range(n)
+        ])
+
+    def test_create_cancel_complete(self):
+        open_job, assigned_job = self.make_jobs(2)
+        JobPosting.objects.filter(id=assigned_job.id).update(status="assigned")
+
+        response = self.post(self.create_ops(2) + [
+            {"op": "cancel", "job_id": open_job.id},
+            {"op": "complete", "job_id": assigned_job.id},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([r["status"] for r in results], [201, 201, 200, 200])
+        self.assertEqual(JobFeedEntry.objects.count(), 2)
+        self.assertEqual(JobPosting.objects.get(id=open_job.id).status, "cancelled")
+        self.assertEqual(JobPosting.objects.get(id=assigned_job.id).status, "completed")
+        self.assertIsNotNone(JobPosting.objects.get(id=assigned_job.id).closed_at)
+        self.assertEqual(
+            sorted(JobEvent.objects.values_list("event_type", flat=True)),
+            ["job.cancelled", "job.completed", "job.created", "job.created"]
+        )
+
+    def test_per_item_errors(self):
+        others_job, = self.make_jobs(1, client=self.other)
+        done_job, = self.make_jobs(1, status="completed")
+
+        results = self.post([
+            {"op": "delete", "job_id": 1},
+            {"op": "create", "title": "No category", "description": "d", "trade_category": 999},
+            {"op": "cancel", "job_id": 999999},
+            {"op": "cancel", "job_id": others_job.id},
+            {"op": "cancel", "job_id": done_job.id},
+            {"op": "complete", "job_id": done_job.id},
+        ]).json()["results"]
+
+        self.assertEqual([r["status"] for r in results], [400, 400, 404, 403, 409, 200])
+        self.assertEqual(JobPosting.objects.get(id=others_job.id).status, "open")
+
+    def test_boolean_job_id_is_rejected(self):
+        self.make_jobs(2)
+
+        results = self.post([
+            {"op": "complete", "job_id": True},
+            {"op": "cancel", "job_id": False},
+        ]).json()["results"]
+
+        self.assertEqual([r["status"] for r in results], [400, 400])
+        self.assertFalse(JobPosting.objects.exclude(status="open").exists())
+
+    def count_queries(self, operations):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post(operations)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_create_query_count_does_not_grow_with_batch_size(self):
+        small = self.count_queries(self.create_ops(3))
+        large = self.count_queries(self.create_ops(60))
+        self.assertEqual(small, large)
+
+    def test_transition_query_count_does_not_grow_with_batch_size(self):
+        def ops(n):
+            jobs = self.make_jobs(2 * n)
+            return (
+                [{"op": "cancel", "job_id": job.id} for job in jobs[:n]]
+                + [{"op": "complete", "job_id": job.id} for job in jobs[n:]]
+            )
+
+        small = self.count_queries(ops(2))
+        large = self.count_queries(ops(40))
+        self.assertEqual(small, large)
+
+
+class JobFeedTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create(username="client", first_name="Bisi", last_name="Ade")
+        self.category = TradeCategory.objects.create(name="Plumber")
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def create(self, title="Leaking pipe"):
+        response = self.api.post(
+            "/api/jobs/create/",
+            {"title": title, "description": "Kitchen sink", "trade_category": self.category.id, "location": "Yaba"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["job"]["id"]
+
+    def test_create_adds_feed_row(self):
+        job_id = self.create()
+        entry = JobFeedEntry.objects.get(job_id=job_id)
+        self.assertEqual(
+            (entry.title, entry.client_name, entry.trade_category_name, entry.location),
+            ("Leaking pipe", "Bisi Ade", "Plumber", "Yaba"),
+        )
+        self.assertEqual(check_job_feed(), {"missing": [], "stale": [], "orphaned": []})
+        self.assertEqual([job["id"] for job in self.api.get("/api/jobs/all/").json()], [job_id])
+
+    def test_assign_drops_feed_row(self):
+        job_id = self.create()
+        artisan = APIClient()
+        artisan.force_authenticate(User.objects.create(username="artisan"))
+        self.assertEqual(artisan.post(f"/api/jobs/{job_id}/assign/").status_code, 200)
+        self.assertFalse(JobFeedEntry.objects.filter(job_id=job_id).exists())
+        self.assertEqual(self.api.get("/api/jobs/all/").json(), [])
+
+    def test_cancel_drops_feed_row(self):
+        job_id, other_id = self.create(), self.create("Broken tap")
+        response = self.api.post("/api/jobs/batch/", {"operations": [{"op": "cancel", "job_id": job_id}]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(JobFeedEntry.objects.values_list("job_id", flat=True)), [other_id])
+        self.assertEqual(check_job_feed(), {"missing": [], "stale": [], "orphaned": []})
+
+
+class JobMatchingTests(TestCase):
+    def setUp(self):
+        self.category = TradeCategory.objects.create(name="Tailor")
+        self.user = User.objects.create(username="client")
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+        self.near_expert = self.artisan("Near", "Ikeja Lagos", 90)
+        self.near_novice = self.artisan("Novice", "Ikeja Lagos", 20)
+        self.far_expert = self.artisan("Far", "Abuja", 80)
+
+    def artisan(self, name, location, score):
+        artisan = Artisan.objects.create(
+            first_name=name, last_name="Artisan", phone_number=f"080{name}", email_address=f"{name}@example.com",
+            password="pw", trade_category=self.category, location=location, language="English",
+        )
+        Assessment.objects.create(artisan=artisan, trade_category="Tailor", questions=[], status="completed", score=score)
+        refresh_candidate(artisan)
+        return artisan
+
+    def ranking(self):
+        response = self.api.post(
+            "/api/jobs/create/",
+            {"title": "Agbada", "description": "d", "trade_category": self.category.id, "location": "Ikeja, Lagos"},
+            format="json",
+        )
+        job_id = response.json()["job"]["id"]
+        matches = self.api.get(f"/api/jobs/{job_id}/candidates/").json()
+        self.assertEqual([match["rank"] for match in matches], list(range(1, len(matches) + 1)))
+        return [match["artisan_id"] for match in matches]
+
+    def test_ranks_score_and_location(self):
+        # Same location outweighs a higher assessment score elsewhere
+        self.assertEqual(self.ranking(), [self.near_expert.id, self.near_novice.id, self.far_expert.id])
+
+    def test_profile_update_refreshes_candidate(self):
+        response = self.api.put(
+            "/api/users/profile/update/",
+            {"user_type": "artisan", "user_id": self.far_expert.id, "location": "Ikeja Lagos"},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ArtisanCandidate.objects.get(artisan=self.far_expert).location, "ikeja lagos")
+        self.assertEqual(self.ranking(), [self.near_expert.id, self.far_expert.id, self.near_novice.id])
+
+    def test_assignment_refreshes_workload(self):
+        job = JobPosting.objects.create(client=self.user, trade_category=self.category, title="Old", description="d")
+        artisan_user = User.objects.create(username="near", email=self.near_expert.email_address)
+        api = APIClient()
+        api.force_authenticate(artisan_user)
+        self.assertEqual(api.post(f"/api/jobs/{job.id}/assign/").status_code, 200)
+        candidate = ArtisanCandidate.objects.get(artisan=self.near_expert)
+        self.assertEqual(candidate.active_jobs, 1)
+        self.assertLess(candidate.base_score, 0.45 * 0.9)
+
+
+class JobSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="client")
+        self.plumber = TradeCategory.objects.create(name="Plumber")
+        self.welder = TradeCategory.objects.create(name="Welder")
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def job(self, title, description, category=None, days_old=0):
+        job = JobPosting.objects.create(
+            client=self.user, trade_category=category or self.plumber, title=title, description=description,
+        )
+        if days_old:
+            JobPosting.objects.filter(id=job.id).update(created_at=timezone.now() - datetime.timedelta(days=days_old))
+        return job.id
+
+    def search(self, query):
+        rebuild_job_feed()
+        return self.api.get(f"/api/jobs/search/?{query}")
+
+    def ids(self, query):
+        response = self.search(query)
+        self.assertEqual(response.status_code, 200)
+        return [result["id"] for result in response.json()["results"]]
+
+    def test_title_match_ranks_first(self):
+        in_description = self.job("Bathroom work", "Replace the pipe under the sink")
+        in_title = self.job("Burst pipe", "Water everywhere")
+        self.job("Gate repair", "Weld the hinges")
+        self.assertEqual(self.ids("q=pipe"), [in_title, in_description])
+
+    def test_newer_ranks_first_between_equal_matches(self):
+        old = self.job("Burst pipe", "Water everywhere", days_old=60)
+        new = self.job("Burst pipe", "Water everywhere")
+        self.assertEqual(self.ids("q=pipe"), [new, old])
+
+    def test_closed_jobs_are_not_found(self):
+        self.job("Burst pipe", "Water everywhere")
+        JobPosting.objects.update(status="assigned")
+        self.assertEqual(self.ids("q=pipe"), [])
+
+    def test_trade_category_filter(self):
+        self.job("Burst pipe", "Water everywhere")
+        welding = self.job("Pipe welding", "Steel pipe joint", category=self.welder)
+        self.assertEqual(self.ids(f"q=pipe&trade_category={self.welder.id}"), [welding])
+
+    def test_highlights_escape_job_text(self):
+        self.job("<script>alert(1)</script> pipe", 'Fix the "pipe" & <b>tap</b>')
+        highlights = self.search("q=pipe").json()["results"][0]["highlights"]
+        self.assertEqual(highlights["title"], "&lt;script&gt;alert(1)&lt;/script&gt; <mark>pipe</mark>")
+        self.assertEqual(highlights["description"], "Fix the &quot;<mark>pipe</mark>&quot; &amp; &lt;b&gt;tap&lt;/b&gt;")
+
+    def test_limit(self):
+        for i in range(3):
+            self.job(f"Burst pipe {i}", "Water everywhere")
+        self.assertEqual(len(self.ids("q=pipe&limit=2")), 2)
+        self.assertEqual(len(self.ids("q=pipe&limit=0")), 1)
+        self.assertEqual(len(self.ids("q=pipe&limit=500")), 3)
+        self.assertEqual(self.search("q=pipe&limit=ten").status_code, 400)
+        self.assertEqual(self.search("q=pipe&trade_category=plumber").status_code, 400)
+        self.assertEqual(self.search("limit=2").status_code, 400)
+
+
+class JobArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="client")
+        self.category = TradeCategory.objects.create(name="Painter")
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def job(self, title, status="open", closed_days_ago=None, created_days_ago=0):
+        job = JobPosting.objects.create(
+            client=self.user, trade_category=self.category, title=title, description="d", status=status,
+        )
+        now = timezone.now()
+        JobPosting.objects.filter(id=job.id).update(
+            created_at=now - datetime.timedelta(days=created_days_ago),
+            closed_at=None if closed_days_ago is None else now - datetime.timedelta(days=closed_days_ago),
+        )
+        return job.id
+
+    def test_only_long_finished_jobs_move(self):
+        old = self.job("Old", "completed", closed_days_ago=90, created_days_ago=100)
+        cancelled = self.job("Cancelled", "cancelled", closed_days_ago=60, created_days_ago=70)
+        recent = self.job("Recent", "completed", closed_days_ago=5, created_days_ago=10)
+        live = self.job("Live")
+
+        self.assertEqual(archive_finished_jobs(days=30, pause=0), 2)
+        self.assertEqual(set(JobPosting.objects.values_list("id", flat=True)), {recent, live})
+        self.assertEqual(set(ArchivedJobPosting.objects.values_list("id", flat=True)), {old, cancelled})
+        self.assertEqual(archive_finished_jobs(days=30, pause=0), 0)
+
+    def test_archived_jobs_are_still_served(self):
+        old = self.job("Old", "completed", closed_days_ago=90, created_days_ago=100)
+        live = self.job("Live", created_days_ago=1)
+        archive_finished_jobs(days=30, pause=0)
+
+        detail = self.api.get(f"/api/jobs/{old}/").json()
+        self.assertEqual((detail["id"], detail["title"], detail["status"], detail["archived"]), (old, "Old", "completed", True))
+        self.assertFalse(self.api.get(f"/api/jobs/{live}/").json()["archived"])
+        self.assertEqual(self.api.get("/api/jobs/999999/").status_code, 404)
+
+        history = self.api.get("/api/jobs/history/").json()["jobs"]
+        self.assertEqual([(job["id"], job["archived"]) for job in history], [(live, False), (old, True)])
+        other = APIClient()
+        other.force_authenticate(User.objects.create(username="other"))
+        self.assertEqual(other.get("/api/jobs/history/").json()["jobs"], [])
+
+    def test_history_pages_through_equal_timestamps(self):
+        created = timezone.now() - datetime.timedelta(days=100)
+        ids = [self.job(f"Job {i}", "completed", closed_days_ago=90) for i in range(5)]
+        JobPosting.objects.update(created_at=created)
+        archive_finished_jobs(days=30, pause=0, batch_size=2, max_batches=1)
+
+        seen, params = [], {"limit": 2}
+        while True:
+            jobs = self.api.get("/api/jobs/history/", params).json()["jobs"]
+            if not jobs:
+                break
+            seen += [job["id"] for job in jobs]
+            params = {"limit": 2, "before": jobs[-1]["created_at"], "before_id": jobs[-1]["id"]}
+        self.assertEqual(seen, sorted(ids, reverse=True))
+        self.assertEqual(self.api.get("/api/jobs/history/", {"before_id": ids[0]}).status_code, 400)
+
+
+class JobQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets per endpoint; none may grow with the number of rows."""
+
+    def setUp(self):
+        self.category = TradeCategory.objects.create(name="Tailor")
+        self.user = User.objects.create(username="client")
+        for i in range(10):
+            refresh_candidate(Artisan.objects.create(
+                first_name="Ada", last_name=str(i), phone_number=f"080{i}", email_address=f"ada{i}@example.com",
+                password="pw", trade_category=self.category, location="Lagos", language="English",
+            ))
+        self.jobs = JobPosting.objects.bulk_create([
+            JobPosting(client=self.user, trade_category=self.category, title=f"Job {i}", description="d")
+            for i in range(10)
+        ])
+        rebuild_job_feed()
+        for job in self.jobs:
+            rank_job_candidates(job)
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def get(self, url, limit):
+        with self.assertMaxQueries(limit, threshold=3):
+            response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_jobs(self):
+        self.assertEqual(len(self.get("/api/jobs/all/", 1).json()), 10)
+
+    def test_job_detail(self):
+        self.get(f"/api/jobs/{self.jobs[0].id}/", 1)
+
+    def test_job_candidates(self):
+        self.assertEqual(len(self.get(f"/api/jobs/{self.jobs[0].id}/candidates/", 2).json()), 10)
+
+    def test_job_history(self):
+        self.get("/api/jobs/history/", 2)
+
+    def test_create_job(self):
+        with self.assertMaxQueries(10, threshold=3):
+            response = self.api.post(
+                "/api/jobs/create/", {"title": "New", "description": "d", "trade_category": self.category.id},
+                format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+
+class ExportJobsTests(TestCase):
+    def setUp(self):
+        client = User.objects.create_user(username="client")
+        tailor = TradeCategory.objects.create(name="Tailor")
+        welder = TradeCategory.objects.create(name="Welder")
+        for n, (category, job_status) in enumerate([(tailor, "open"), (welder, "open"), (tailor, "completed")]):
+            JobPosting.objects.create(
+                client=client, trade_category=category, title=f"Job {n}", description="Details, with a comma",
+                budget=Decimal("1500.50"), location="Lagos", status=job_status,
+            )
+        old = timezone.now() - datetime.timedelta(days=100)
+        JobPosting.objects.filter(status="completed").update(created_at=old, closed_at=old)
+        archive_finished_jobs(days=30, pause=0)
+
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user(username="admin", is_staff=True))
+
+    def export(self, **params):
+        response = self.api.get("/api/jobs/export/", params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_includes_archived_jobs(self):
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual([(row["title"], row["archived"]) for row in rows],
+                         [("Job 0", "False"), ("Job 1", "False"), ("Job 2", "True")])
+        self.assertEqual(rows[0]["description"], "Details, with a comma")
+        self.assertEqual(rows[0]["budget"], "1500.50")
+
+    def test_jsonl_filters(self):
+        lines = [json.loads(line) for line in self.export(fmt="jsonl", trade="tailor").splitlines()]
+        self.assertEqual([line["title"] for line in lines], ["Job 0", "Job 2"])
+
+        since = (timezone.now() - datetime.timedelta(days=1)).date().isoformat()
+        lines = [json.loads(line) for line in self.export(fmt="jsonl", trade="tailor", since=since).splitlines()]
+        self.assertEqual([line["title"] for line in lines], ["Job 0"])
+
+    def test_invalid_parameters_and_permissions(self):
+        self.assertEqual(self.api.get("/api/jobs/export/", {"since": "yesterday"}).status_code, 400)
+        self.assertEqual(self.api.get("/api/jobs/export/", {"fmt": "xml"}).status_code, 400)
+        self.api.force_authenticate(User.objects.create_user(username="someone"))
+        self.assertEqual(self.api.get("/api/jobs/export/").status_code, 403)
+
+
+class JobEventOutboxTests(TestCase):
+    def event(self, event_id, **fields):
+        return JobEvent.objects.create(id=event_id, job_id=1, event_type="job.created", payload={}, **fields)
+
+    def test_out_of_order_commit_is_not_skipped(self):
+        self.event(1)
+        # Event 3 commits while the transaction holding event 2 is still open
+        self.event(3)
+        self.assertEqual([e["id"] for e in fetch_events_after(0)], [1])
+        self.assertEqual(fetch_events_after(1), [])
+
+        self.event(2)
+        self.assertEqual([e["id"] for e in fetch_events_after(1)], [2, 3])
+
+    def test_settled_gap_is_skipped(self):
+        self.event(1)
+        self.event(3)
+        JobEvent.objects.filter(id=3).update(created_at=timezone.now() - datetime.timedelta(seconds=60))
+        # Event 2 was rolled back
+        self.assertEqual([e["id"] for e in fetch_events_after(1)], [3])
+
+    def test_relay_starts_below_unsettled_events(self):
+        self.event(1)
+        self.event(2)
+        JobEvent.objects.filter(id=1).update(created_at=timezone.now() - datetime.timedelta(seconds=60))
+        # Event 2 may still have an uncommitted neighbour below it
+        self.assertEqual(settled_event_id(), 1)
+
+
+class JobStreamFilterTests(TestCase):
+    def message(self, event):
+        return {"id": 1, "event": event, "job_id": 1, "trade_category_id": None, "location": "", "data": {}}
+
+    def test_new_jobs_only_by_default(self):
+        sub = Subscription()
+        self.assertTrue(sub.matches(self.message("job.created")))
+        self.assertFalse(sub.matches(self.message("job.assigned")))
+
+    def test_event_types_filter(self):
+        sub = Subscription(event_types=parse_event_types("job.assigned, job.cancelled"))
+        self.assertTrue(sub.matches(self.message("job.assigned")))
+        self.assertFalse(sub.matches(self.message("job.created")))
+        with self.assertRaises(ValueError):
+            parse_event_types("job.created,job.deleted")
+
+
+class AssignJobRaceTests(TransactionTestCase):
+    def setUp(self):
+        category = TradeCategory.objects.create(name="Plumber")
+        self.job = JobPosting.objects.create(
+            client=User.objects.create(username="client"), trade_category=category, title="Leak", description="d",
+        )
+        self.artisans = [User.objects.create(username=f"artisan-{i}") for i in range(2)]
+
+    def assign(self, user):
+        request = APIRequestFactory().post(f"/api/jobs/{self.job.id}/assign/")
+        force_authenticate(request, user=user)
+        return assign_job(request, job_id=self.job.id).status_code
+
+    def assert_assigned_once(self, outcomes):
+        self.assertEqual(sorted(outcomes.values()), [200, 409])
+        winner = next(user_id for user_id, outcome in outcomes.items() if outcome == 200)
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.assigned_artisan_id), ("assigned", winner))
+        self.assertEqual(JobEvent.objects.filter(job_id=self.job.id, event_type="job.assigned").count(), 1)
+
+    def test_late_accept_conflicts(self):
+        self.assert_assigned_once({user.id: self.assign(user) for user in self.artisans})
+
+    # In-memory SQLite shares one table lock between threads: the loser
+    # fails with "database table is locked" instead of waiting
+    @unittest.skipIf(connection.vendor == "sqlite", "needs a database with row locking")
+    def test_one_of_two_racing_accepts_wins(self):
+        barrier = threading.Barrier(2)
+        outcomes = {}
+
+        def accept(user):
+            try:
+                barrier.wait()
+                outcomes[user.id] = self.assign(user)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=accept, args=(user,)) for user in self.artisans]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assert_assigned_once(outcomes)
@@ -3,7 +3,16 @@ from .views import (
     create_job, 
     list_jobs, 
     assign_job, 
-    complete_job
+    complete_job,
+    job_candidates,
+    recommended_jobs,
+    job_stream,
+    search_job_postings,
+    job_events,
+    job_detail,
+    my_job_history,
+    batch_jobs,
+    export_jobs,
 )
 
 urlpatterns = [
@@ -11,4 +20,13 @@ urlpatterns = [
     path("all/", list_jobs, name="list-jobs"),
     path("<int:job_id>/assign/", assign_job, name="assign-job"),
     path("<int:job_id>/complete/", complete_job, name="complete-job"),
+    path("<int:job_id>/candidates/", job_candidates, name="job-candidates"),
+    path("recommended/", recommended_jobs, name="recommended-jobs"),
+    path("stream/", job_stream, name="job-stream"),
+    path("search/", search_job_postings, name="search-jobs"),
+    path("events/", job_events, name="job-events"),
+    path("history/", my_job_history, name="job-history"),
+    path("batch/", batch_jobs, name="batch-jobs"),
+    path("export/", export_jobs, name="export-jobs"),
+    path("<int:job_id>/", job_detail, name="job-detail"),
 ]
\ No newline at end of file
@@ -1,14 +1,39 @@
 from django.shortcuts import render
+from django.http import JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import JobPosting
-from .serializers import JobPostingSerializer
+from .models import JobPosting, JobFeedEntry, JobMatch
+from .serializers import (
+    JobPostingSerializer,
+    JobFeedSerializer,
+    JobMatchSerializer,
+    RecommendedJobSerializer,
+    serialize_job,
+)
+from .feed import sync_job_feed
+from .matching import rank_job_candidates, refresh_candidate
+from .events import record_job_event, wait_for_events
+from .broker import broker
+from .stream import authenticate_token, token_from_request, resolve_filters, parse_event_types, sse_events
+from .search import search_jobs, SearchNotSupported
+from .archive import get_job, job_history
+from .batch import process_batch, MAX_OPERATIONS
+from .exports import JOB_COLUMNS, job_export
+from users.utils import get_request_artisan, artisan_for_user
+from craftconnect.cache import cached_view, invalidate_tags
+from craftconnect.exports import EXPORT_PARAMETERS, parse_filters, streaming_export
+from users.reputation import record_job_assigned, record_job_completed
 
 
 
@@ -32,7 +57,11 @@ def create_job(request):
 
     serializer = JobPostingSerializer(data=data)
     if serializer.is_valid():
-        serializer.save()
+        with transaction.atomic():
+            job = serializer.save(client=request.user)
+            entry = sync_job_feed(job)
+            rank_job_candidates(job)
+            record_job_event(job, "job.created", JobFeedSerializer(entry).data)
         return Response({
             "message": "Job created successfully",
             "job": serializer.data
@@ -47,12 +76,14 @@ def create_job(request):
     operation_summary="List all open job postings",
     operation_description="Retrieve all job postings with status 'open'.",
     tags=["Job Posting"],
-    responses={200: JobPostingSerializer(many=True)}
+    responses={200: JobFeedSerializer(many=True)}
 )
 @api_view(["GET"])
+@cached_view(ttl=30, tags=lambda request: ["jobs:feed"])
 def list_jobs(request):
-    jobs = JobPosting.objects.filter(status="open").order_by("-created_at")
-    serializer = JobPostingSerializer(jobs, many=True)
+    # Served from the denormalized feed table: no joins, one index scan
+    jobs = JobFeedEntry.objects.order_by("-created_at")
+    serializer = JobFeedSerializer(jobs, many=True)
     return Response(serializer.data)
 
 
@@ -61,28 +92,41 @@ def list_jobs(request):
 @swagger_auto_schema(
     method="post",
     operation_summary="Assign job to an artisan",
-    operation_description="Artisan accepts a job. Changes status from 'open' to 'assigned'.",
+    operation_description=(
+        "Artisan accepts a job. Changes status from 'open' to 'assigned'. "
+        "When several artisans accept the same job at once exactly one wins; "
+        "the others get 409."
+    ),
     tags=["Job Posting"],
     responses={
         200: "Job assigned successfully",
         404: "Job not found",
-        400: "Invalid job state"
+        409: "Job is no longer open"
     }
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def assign_job(request, job_id):
-    try:
-        job = JobPosting.objects.get(id=job_id)
-    except JobPosting.DoesNotExist:
-        return Response({"error": "Job not found"}, status=404)
+    with transaction.atomic():
+        # Compare-and-set on status: a single conditional UPDATE, so racing
+        # accepts cannot both see "open" and double-assign the job
+        assigned = JobPosting.objects.filter(id=job_id, status="open").update(
+            status="assigned",
+            assigned_artisan=request.user
+        )
 
-    if job.status != "open":
-        return Response({"error": "Job is not open for assignment"}, status=400)
+        if not assigned:
+            if not JobPosting.objects.filter(id=job_id).exists():
+                return Response({"error": "Job not found"}, status=404)
+            return Response({"error": "Job is not open for assignment"}, status=409)
 
-    job.assigned_artisan = request.user
-    job.status = "assigned"
-    job.save()
+        job = JobPosting.objects.get(id=job_id)
+        invalidate_tags(f"job:{job_id}")
+        sync_job_feed(job)
+        artisan = artisan_for_user(request.user)
+        record_job_assigned(artisan)
+        refresh_candidate(artisan)
+        record_job_event(job, "job.assigned", JobPostingSerializer(job).data)
 
     return Response({
         "message": "Job assigned to artisan",
@@ -114,11 +158,350 @@ def complete_job(request, job_id):
     if job.client != request.user:
         return Response({"error": "Only the client can complete the job"}, status=403)
 
+    # Completing twice is a no-op for the counters and the event log
+    already_completed = job.status == "completed"
     job.status = "completed"
-    job.save()
+    if not already_completed:
+        job.closed_at = timezone.now()
+    with transaction.atomic():
+        job.save()
+        sync_job_feed(job)
+        if not already_completed:
+            artisan = artisan_for_user(job.assigned_artisan)
+            record_job_completed(artisan)
+            refresh_candidate(artisan)
+            record_job_event(job, "job.completed", JobPostingSerializer(job).data)
 
     return Response({
         "message": "Job marked as completed",
         "job": JobPostingSerializer(job).data
     })
 
+
+
+# BATCH OPERATIONS (Client)
+@swagger_auto_schema(
+    method="post",
+    operation_summary="Create, cancel or complete many jobs at once",
+    operation_description=(
+        f"Runs up to {MAX_OPERATIONS} operations in one transaction and returns a result per operation, "
+        "in the same order. Each operation is an object with `op` ('create', 'cancel' or 'complete'); "
+        "create takes the job fields, cancel and complete take `job_id`. Invalid operations get their "
+        "own error status without affecting the others."
+    ),
+    tags=["Job Posting"],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=["operations"],
+        properties={
+            "operations": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "op": openapi.Schema(type=openapi.TYPE_STRING, enum=["create", "cancel", "complete"]),
+                        "job_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+                        "title": openapi.Schema(type=openapi.TYPE_STRING),
+                        "description": openapi.Schema(type=openapi.TYPE_STRING),
+                        "budget": openapi.Schema(type=openapi.TYPE_STRING),
+                        "location": openapi.Schema(type=openapi.TYPE_STRING),
+                        "trade_category": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    }
+                )
+            )
+        }
+    ),
+    responses={
+        200: "Per-operation results",
+        400: "Invalid batch"
+    }
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def batch_jobs(request):
+    operations = request.data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return Response({"error": "operations (non-empty list) is required"}, status=400)
+    if len(operations) > MAX_OPERATIONS:
+        return Response({"error": f"At most {MAX_OPERATIONS} operations per batch"}, status=400)
+
+    return Response({"results": process_batch(request.user, operations)})
+
+
+
+# JOB DETAIL (live or archived)
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Get a job posting",
+    operation_description="Returns a job by ID, including jobs that have been moved to the archive.",
+    tags=["Job Posting"],
+    responses={
+        200: "Job details",
+        404: "Job not found"
+    }
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@cached_view(ttl=300, tags=lambda request, job_id: [f"job:{job_id}"])
+def job_detail(request, job_id):
+    job = get_job(job_id)
+    if job is None:
+        return Response({"error": "Job not found"}, status=404)
+    return Response(serialize_job(job))
+
+
+
+# JOB HISTORY (Client or Artisan)
+@swagger_auto_schema(
+    method="get",
+    operation_summary="List my job history",
+    operation_description=(
+        "Jobs the logged-in user created or was assigned, newest first, including archived jobs. "
+        "Pass the created_at and id of the last item as `before` and `before_id` to get the next page."
+    ),
+    tags=["Job Posting"],
+    manual_parameters=[
+        openapi.Parameter("limit", openapi.IN_QUERY, description="Page size (default 50, max 200)", type=openapi.TYPE_INTEGER),
+        openapi.Parameter("before", openapi.IN_QUERY, description="ISO datetime cursor", type=openapi.TYPE_STRING),
+        openapi.Parameter("before_id", openapi.IN_QUERY, description="Job ID cursor (with before)", type=openapi.TYPE_INTEGER),
+    ],
+    responses={
+        200: "Job history",
+        400: "Invalid parameters"
+    }
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def my_job_history(request):
+    try:
+        limit = min(max(int(request.query_params.get("limit", 50)), 1), 200)
+        before_id = request.query_params.get("before_id")
+        before_id = int(before_id) if before_id else None
+    except ValueError:
+        return Response({"error": "limit and before_id must be integers"}, status=400)
+
+    before = request.query_params.get("before")
+    if before:
+        before = parse_datetime(before)
+        if before is None:
+            return Response({"error": "before must be an ISO datetime"}, status=400)
+    elif before_id is not None:
+        return Response({"error": "before_id needs before"}, status=400)
+
+    jobs = job_history(request.user, limit=limit, before=before, before_id=before_id)
+    return Response({"jobs": [serialize_job(job) for job in jobs]})
+
+
+
+# SEARCH OPEN JOBS
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Search open job postings",
+    operation_description=(
+        "Full-text search over job titles and descriptions. Results are ranked by "
+        "relevance combined with recency and include highlighted snippets: HTML-escaped "
+        "text with the matches wrapped in <mark>."
+    ),
+    tags=["Job Posting"],
+    manual_parameters=[
+        openapi.Parameter("q", openapi.IN_QUERY, description="Search text", type=openapi.TYPE_STRING, required=True),
+        openapi.Parameter("trade_category", openapi.IN_QUERY, description="Trade category ID", type=openapi.TYPE_INTEGER),
+        openapi.Parameter("limit", openapi.IN_QUERY, description="Max results (default 20, max 50)", type=openapi.TYPE_INTEGER),
+    ],
+    responses={
+        200: "Search results",
+        400: "Missing or invalid query"
+    }
+)
+@api_view(["GET"])
+@cached_view(ttl=30, tags=lambda request: ["jobs:feed"])
+def search_job_postings(request):
+    text = (request.query_params.get("q") or "").strip()
+    if not text:
+        return Response({"error": "q is required"}, status=400)
+
+    try:
+        trade_category = request.query_params.get("trade_category")
+        trade_category = int(trade_category) if trade_category else None
+        limit = int(request.query_params.get("limit", 20))
+    except ValueError:
+        return Response({"error": "trade_category and limit must be integers"}, status=400)
+
+    try:
+        hits = search_jobs(text, trade_category_id=trade_category, limit=limit)
+    except SearchNotSupported as e:
+        return Response({"error": str(e)}, status=501)
+
+    entries = JobFeedEntry.objects.in_bulk([hit["id"] for hit in hits])
+    results = []
+    for hit in hits:
+        entry = entries.get(hit["id"])
+        if entry is None:
+            continue
+        item = JobFeedSerializer(entry).data
+        item["score"] = hit["score"]
+        item["highlights"] = {
+            "title": hit["title_highlight"],
+            "description": hit["description_snippet"],
+        }
+        results.append(item)
+
+    return Response({"count": len(results), "results": results})
+
+
+
+# RANKED CANDIDATES FOR A JOB (Client)
+@swagger_auto_schema(
+    method="get",
+    operation_summary="List ranked candidate artisans for a job",
+    operation_description="Returns the artisans ranked for this job when it was created. Only the client who created the job can see them.",
+    tags=["Job Posting"],
+    responses={
+        200: JobMatchSerializer(many=True),
+        403: "Unauthorized",
+        404: "Job not found"
+    }
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def job_candidates(request, job_id):
+    try:
+        job = JobPosting.objects.get(id=job_id)
+    except JobPosting.DoesNotExist:
+        return Response({"error": "Job not found"}, status=404)
+
+    if job.client_id != request.user.id:
+        return Response({"error": "Only the client can view candidates"}, status=403)
+
+    matches = (
+        JobMatch.objects.filter(job=job)
+        .select_related("artisan__candidate_profile")
+        .order_by("rank")
+    )
+    return Response(JobMatchSerializer(matches, many=True).data)
+
+
+
+# RECOMMENDED JOBS (Artisan)
+@swagger_auto_schema(
+    method="get",
+    operation_summary="List open jobs recommended for the logged-in artisan",
+    operation_description="Open jobs the artisan was matched to, best match first.",
+    tags=["Job Posting"],
+    responses={
+        200: RecommendedJobSerializer(many=True),
+        404: "Artisan profile not found"
+    }
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def recommended_jobs(request):
+    artisan = get_request_artisan(request)
+    if not artisan:
+        return Response({"error": "Artisan profile not found"}, status=404)
+
+    jobs = (
+        JobFeedEntry.objects.filter(job__matches__artisan=artisan)
+        .annotate(match_score=F("job__matches__score"))
+        .order_by("-match_score", "-created_at")[:50]
+    )
+    return Response(RecommendedJobSerializer(jobs, many=True).data)
+
+
+
+# JOB EVENT LOG (long-poll)
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Read the job event log",
+    operation_description=(
+        "Append-only log of job lifecycle events (job.created, job.assigned, job.completed). "
+        "Returns events with a sequence number greater than `after`. If there are none yet, "
+        "the request waits up to `wait` seconds for new ones. Pass `next_after` back as "
+        "`after` on the next call."
+    ),
+    tags=["Job Posting"],
+    manual_parameters=[
+        openapi.Parameter("after", openapi.IN_QUERY, description="Last sequence number already read", type=openapi.TYPE_INTEGER),
+        openapi.Parameter("limit", openapi.IN_QUERY, description="Max events (default 100, max 1000)", type=openapi.TYPE_INTEGER),
+        openapi.Parameter("wait", openapi.IN_QUERY, description="Seconds to wait for new events (default 0, max 30)", type=openapi.TYPE_NUMBER),
+    ],
+    responses={
+        200: "Events",
+        400: "Invalid parameters"
+    }
+)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def job_events(request):
+    try:
+        after = int(request.query_params.get("after", 0))
+        limit = min(max(int(request.query_params.get("limit", 100)), 1), 1000)
+        wait = min(max(float(request.query_params.get("wait", 0)), 0), 30)
+    except ValueError:
+        return Response({"error": "after, limit and wait must be numbers"}, status=400)
+
+    events = wait_for_events(after, limit=limit, timeout=wait)
+    return Response({
+        "events": events,
+        "next_after": events[-1]["id"] if events else after,
+    })
+
+
+
+
+# EXPORT JOBS (admin)
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Export job postings",
+    operation_description=(
+        "Streams every job posting, live and archived, as CSV or JSON Lines, oldest first. "
+        "Filter by creation date and trade category name."
+    ),
+    tags=["Job Posting"],
+    manual_parameters=EXPORT_PARAMETERS,
+    responses={
+        200: "CSV or JSON Lines file",
+        400: "Invalid parameters"
+    }
+)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def export_jobs(request):
+    try:
+        fmt, since, until, trade = parse_filters(**{
+            name: request.query_params.get(name) for name in ("since", "until", "trade", "fmt")
+        })
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    return streaming_export(job_export(since, until, trade), JOB_COLUMNS, fmt, "jobs")
+
+
+# LIVE JOB EVENTS (Server-Sent Events, ASGI only)
+# GET /api/jobs/stream/?trade_category=<id>&location=<text>&events=<types>
+# New jobs (job.created) only, unless events lists other types.
+# Auth with the Authorization header or ?token=<access token>.
+# Reconnecting clients send Last-Event-ID to receive what they missed.
+async def job_stream(request):
+    user = await sync_to_async(authenticate_token)(token_from_request(request))
+    if user is None:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    try:
+        trade_category_id, location = await sync_to_async(resolve_filters)(
+            user, request.GET.get("trade_category"), request.GET.get("location")
+        )
+        last_event_id = int(request.headers.get("Last-Event-ID") or request.GET.get("last_event_id") or 0)
+    except ValueError:
+        return JsonResponse({"error": "trade_category and last_event_id must be integers"}, status=400)
+    try:
+        event_types = parse_event_types(request.GET.get("events"))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    sub = broker.subscribe(trade_category_id, location, event_types=event_types)
+    await broker.ensure_relay()
+
+    response = StreamingHttpResponse(sse_events(sub, last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
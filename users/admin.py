@@ -1,5 +1,7 @@
 from django.contrib import admin
 from .models import Artisan, Client, TradeCategory
+from jobs.models import JobFeedEntry
+from jobs.matching import refresh_candidate
 
 
 @admin.register(TradeCategory)
@@ -7,6 +9,12 @@ class TradeCategoryAdmin(admin.ModelAdmin):
     list_display = ('id', 'name')
     search_fields = ('name',)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # The job feed stores the category name, refresh it on rename
+        if change:
+            JobFeedEntry.objects.filter(trade_category_id=obj.id).update(trade_category_name=obj.name)
+
 
 @admin.register(Artisan)
 class ArtisanAdmin(admin.ModelAdmin):
@@ -15,6 +23,10 @@ class ArtisanAdmin(admin.ModelAdmin):
     list_filter = ('trade_category', 'location', 'language')
     ordering = ('-created_at',)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_candidate(obj)
+
 
 @admin.register(Client)
 class ClientAdmin(admin.ModelAdmin):
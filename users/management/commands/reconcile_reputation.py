@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from users.reputation import reconcile_reputation
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute artisan reputation from JobPosting and Assessment in batches "
+        "and report drift against the stored summaries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--fix", action="store_true", help="Overwrite drifted or missing summaries.")
+
+    def handle(self, *args, **options):
+        report = reconcile_reputation(batch_size=options["batch_size"], fix=options["fix"])
+        self.stdout.write(json.dumps(report, indent=2, default=str))
+
+        if report["drifted"] or report["missing"]:
+            action = "Fixed" if options["fix"] else "Found"
+            self.stdout.write(self.style.WARNING(
+                f"{action} {report['drifted']} drifted and {report['missing']} missing summaries."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("Reputation summaries match the source data."))
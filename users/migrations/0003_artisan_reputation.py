@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_artisan_bio_artisan_business_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtisanReputation',
+            fields=[
+                ('artisan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reputation', serialize=False, to='users.artisan')),
+                ('assigned_jobs', models.PositiveIntegerField(default=0)),
+                ('completed_jobs', models.PositiveIntegerField(default=0)),
+                ('assessments_completed', models.PositiveIntegerField(default=0)),
+                ('best_score', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -56,3 +56,28 @@ class Client(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+
+
+# Reputation summary per artisan, updated incrementally when jobs are
+# assigned/completed and assessments finish (see users/reputation.py).
+class ArtisanReputation(models.Model):
+    artisan = models.OneToOneField(
+        Artisan,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='reputation'
+    )
+    assigned_jobs = models.PositiveIntegerField(default=0)
+    completed_jobs = models.PositiveIntegerField(default=0)
+    assessments_completed = models.PositiveIntegerField(default=0)
+    best_score = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def completion_rate(self):
+        if not self.assigned_jobs:
+            return None
+        return round(self.completed_jobs / self.assigned_jobs, 4)
+
+    def __str__(self):
+        return f"Reputation of artisan {self.artisan_id}"
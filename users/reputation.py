@@ -0,0 +1,189 @@
+# Incremental maintenance of ArtisanReputation.
+#
+# Counters are bumped with F() expressions so concurrent updates never
+# lose increments; reconcile_reputation() recomputes them from
+# JobPosting and Assessment to catch any drift. None of these writes go
+# through save(), so each sets updated_at itself.
+
+from django.db.models import Case, Count, F, Max, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from craftconnect.cache import invalidate_tags
+
+from .models import Artisan, ArtisanReputation
+
+FIELDS = ["assigned_jobs", "completed_jobs", "assessments_completed", "best_score"]
+
+
+def _bump(artisan_id, **updates):
+    ArtisanReputation.objects.get_or_create(artisan_id=artisan_id)
+    ArtisanReputation.objects.filter(artisan_id=artisan_id).update(updated_at=timezone.now(), **updates)
+    invalidate_tags(f"artisan:{artisan_id}")
+
+
+def record_job_assigned(artisan):
+    if artisan is not None:
+        _bump(artisan.id, assigned_jobs=F("assigned_jobs") + 1)
+
+
+def record_job_completed(artisan):
+    if artisan is not None:
+        _bump(artisan.id, completed_jobs=F("completed_jobs") + 1)
+
+
+def record_jobs_completed(counts):
+    """Bulk version of record_job_completed: counts maps artisan id -> completed jobs."""
+    if not counts:
+        return
+    ArtisanReputation.objects.bulk_create(
+        [ArtisanReputation(artisan_id=artisan_id) for artisan_id in counts],
+        ignore_conflicts=True
+    )
+    ArtisanReputation.objects.filter(artisan_id__in=counts).update(
+        completed_jobs=F("completed_jobs") + Case(
+            *[When(artisan_id=artisan_id, then=Value(n)) for artisan_id, n in counts.items()],
+            default=Value(0)
+        ),
+        updated_at=timezone.now(),
+    )
+    invalidate_tags(*(f"artisan:{artisan_id}" for artisan_id in counts))
+
+
+def record_assessment_completed(artisan_id, score):
+    updates = {"assessments_completed": F("assessments_completed") + 1}
+    if score is not None:
+        updates["best_score"] = Greatest(Coalesce(F("best_score"), score), score)
+    _bump(artisan_id, **updates)
+
+
+def record_assessment_rescored(artisan_id, previous, score):
+    """A completed assessment got a new score: best_score may have to come down as well as up."""
+    if score == previous:
+        return
+    if previous is not None and (score is None or score < previous):
+        refresh_best_scores([artisan_id])
+    else:
+        _bump(artisan_id, best_score=Greatest(Coalesce(F("best_score"), score), score))
+
+
+def refresh_best_scores(artisan_ids):
+    """Recompute best_score of several artisans after their scores were rewritten in bulk."""
+    from assessments.models import Assessment
+
+    artisan_ids = list(artisan_ids)
+    best = dict(
+        Assessment.objects.filter(artisan_id__in=artisan_ids, status="completed")
+        .values("artisan_id")
+        .annotate(best=Max("score"))
+        .values_list("artisan_id", "best")
+    )
+    reputations = list(ArtisanReputation.objects.filter(artisan_id__in=artisan_ids))
+    now = timezone.now()
+    for rep in reputations:
+        rep.best_score = best.get(rep.artisan_id)
+        rep.updated_at = now
+    ArtisanReputation.objects.bulk_update(reputations, ["best_score", "updated_at"])
+    invalidate_tags(*(f"artisan:{artisan_id}" for artisan_id in artisan_ids))
+
+
+def reputation_data(artisan):
+    """Reputation as a dict for serializers; zeros if nothing was recorded yet."""
+    try:
+        rep = artisan.reputation
+    except ArtisanReputation.DoesNotExist:
+        rep = ArtisanReputation(artisan=artisan)
+    return {
+        "assigned_jobs": rep.assigned_jobs,
+        "completed_jobs": rep.completed_jobs,
+        "completion_rate": rep.completion_rate,
+        "assessments_completed": rep.assessments_completed,
+        "best_score": rep.best_score,
+    }
+
+
+# --------------------------------------------------------
+# RECONCILE FROM SOURCE
+# --------------------------------------------------------
+def compute_batch(artisans):
+    """Recompute reputation for a batch of artisans from JobPosting and Assessment."""
+    from assessments.models import Assessment
+    from jobs.models import JobPosting, ArchivedJobPosting
+
+    emails = {a.email_address: a.id for a in artisans}
+    expected = {a.id: {"assigned_jobs": 0, "completed_jobs": 0, "assessments_completed": 0, "best_score": None}
+                for a in artisans}
+
+    # Finished jobs may have been moved to the archive: count both tables
+    for model in (JobPosting, ArchivedJobPosting):
+        jobs = (
+            model.objects.filter(assigned_artisan__email__in=emails)
+            .values("assigned_artisan__email")
+            .annotate(assigned=Count("id"), completed=Count("id", filter=Q(status="completed")))
+        )
+        for row in jobs:
+            values = expected[emails[row["assigned_artisan__email"]]]
+            values["assigned_jobs"] += row["assigned"]
+            values["completed_jobs"] += row["completed"]
+
+    assessments = (
+        Assessment.objects.filter(artisan_id__in=expected, status="completed")
+        .values("artisan_id")
+        .annotate(n=Count("id"), best=Max("score"))
+    )
+    for row in assessments:
+        expected[row["artisan_id"]]["assessments_completed"] = row["n"]
+        expected[row["artisan_id"]]["best_score"] = row["best"]
+
+    return expected
+
+
+def reconcile_reputation(batch_size=1000, fix=False):
+    """
+    Walk all artisans in id order, batch by batch, compare stored reputation
+    with the recomputed values and optionally overwrite it.
+    Returns a drift report.
+    """
+    report = {"artisans": 0, "drifted": 0, "missing": 0, "fields": {f: 0 for f in FIELDS}, "sample": []}
+    last_id = 0
+
+    while True:
+        artisans = list(Artisan.objects.filter(id__gt=last_id).order_by("id").only("id", "email_address")[:batch_size])
+        if not artisans:
+            break
+        last_id = artisans[-1].id
+        report["artisans"] += len(artisans)
+
+        expected = compute_batch(artisans)
+        stored = ArtisanReputation.objects.in_bulk(list(expected))
+        to_create, to_update = [], []
+
+        for artisan_id, values in expected.items():
+            rep = stored.get(artisan_id)
+            if rep is None:
+                if not any(values.values()):
+                    continue
+                report["missing"] += 1
+                to_create.append(ArtisanReputation(artisan_id=artisan_id, **values))
+                continue
+
+            drift = {f: (getattr(rep, f), values[f]) for f in FIELDS if getattr(rep, f) != values[f]}
+            if not drift:
+                continue
+
+            report["drifted"] += 1
+            for f in drift:
+                report["fields"][f] += 1
+            if len(report["sample"]) < 20:
+                report["sample"].append({"artisan_id": artisan_id, "drift": drift})
+            for f, value in values.items():
+                setattr(rep, f, value)
+            rep.updated_at = timezone.now()
+            to_update.append(rep)
+
+        if fix:
+            ArtisanReputation.objects.bulk_create(to_create)
+            ArtisanReputation.objects.bulk_update(to_update, FIELDS + ["updated_at"])
+            invalidate_tags(*(f"artisan:{rep.artisan_id}" for rep in to_create + to_update))
+
+    return report
@@ -1,13 +1,19 @@
 from rest_framework import serializers
 from .models import Artisan, Client, TradeCategory
+from .reputation import reputation_data
 
 # Artisan Registration Serializer
 class ArtisanSerializer(serializers.ModelSerializer):
+    reputation = serializers.SerializerMethodField()
+
     class Meta:
         model = Artisan
         fields = '__all__'
         extra_kwargs = {'password': {'write_only': True}}
 
+    def get_reputation(self, obj):
+        return reputation_data(obj)
+
 
 # Client Registration Serializer
 class ClientSerializer(serializers.ModelSerializer):
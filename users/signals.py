@@ -0,0 +1,32 @@
+# Cache invalidation for user data (see craftconnect/cache.py).
+#
+# Bulk writes (QuerySet.update, bulk_create) send no signals; code that
+# uses them calls invalidate_tags itself (users/reputation.py).
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from craftconnect.cache import invalidate_tags
+
+from .models import Artisan, ArtisanReputation, Client, TradeCategory
+
+
+@receiver([post_save, post_delete], sender=Artisan)
+def artisan_changed(sender, instance, **kwargs):
+    invalidate_tags(f"artisan:{instance.pk}")
+
+
+@receiver([post_save, post_delete], sender=Client)
+def client_changed(sender, instance, **kwargs):
+    invalidate_tags(f"client:{instance.pk}")
+
+
+@receiver([post_save, post_delete], sender=ArtisanReputation)
+def reputation_changed(sender, instance, **kwargs):
+    invalidate_tags(f"artisan:{instance.artisan_id}")
+
+
+@receiver([post_save, post_delete], sender=TradeCategory)
+def trade_category_changed(sender, instance, **kwargs):
+    # The job feed shows category names
+    invalidate_tags("trade_categories", "jobs:feed")
@@ -1,3 +1,134 @@
+import datetime
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from assessments.models import Assessment
+from craftconnect.querycheck import QueryBudgetMixin
+from jobs.models import JobPosting
+from .models import Artisan, ArtisanReputation, TradeCategory
+from .reputation import record_assessment_completed, record_assessment_rescored, record_job_assigned
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.category = TradeCategory.objects.create(name="Welder")
+        self.artisan = Artisan.objects.create(
+            first_name="Tunde", last_name="Bello", phone_number="08011112222", email_address="tunde@example.com",
+            password="secret-pass", trade_category=self.category, location="Ibadan", language="Yoruba",
+        )
+        self.api = APIClient()
+
+    def test_login(self):
+        with self.assertMaxQueries(2):
+            response = self.api.post(
+                "/api/users/login/", {"email_address": "tunde@example.com", "password": "secret-pass"}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_artisan_profile(self):
+        with self.assertMaxQueries(2):
+            response = self.api.get("/api/users/profile/", {"user_type": "artisan", "user_id": self.artisan.id})
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_trade_categories(self):
+        TradeCategory.objects.bulk_create([TradeCategory(name=f"Trade {i}") for i in range(20)])
+        with self.assertMaxQueries(1):
+            response = self.api.get("/api/users/trade-categories/")
+        self.assertEqual(len(response.json()), 21)
+
+
+class ReputationTests(TestCase):
+    def setUp(self):
+        category = TradeCategory.objects.create(name="Welder")
+        self.artisan = Artisan.objects.create(
+            first_name="Tunde", last_name="Bello", phone_number="08011112222", email_address="tunde@example.com",
+            password="secret-pass", trade_category=category, location="Ibadan", language="Yoruba",
+        )
+        self.client_user = User.objects.create(username="client")
+        self.jobs = JobPosting.objects.bulk_create([
+            JobPosting(client=self.client_user, trade_category=category, title=f"Gate {i}", description="d")
+            for i in range(2)
+        ])
+        self.as_artisan = APIClient()
+        self.as_artisan.force_authenticate(User.objects.create(username="tunde", email="tunde@example.com"))
+        self.as_client = APIClient()
+        self.as_client.force_authenticate(self.client_user)
+
+    def reputation(self):
+        response = APIClient().get("/api/users/profile/", {"user_type": "artisan", "user_id": self.artisan.id})
+        return response.json()["user"]["reputation"]
+
+    def reconcile(self, *args):
+        out = io.StringIO()
+        call_command("reconcile_reputation", *args, stdout=out)
+        return json.loads(out.getvalue()[:out.getvalue().rindex("}") + 1])
+
+    def test_counts_follow_assign_and_complete(self):
+        for job in self.jobs:
+            self.assertEqual(self.as_artisan.post(f"/api/jobs/{job.id}/assign/").status_code, 200)
+        self.assertEqual(self.as_client.post(f"/api/jobs/{self.jobs[0].id}/complete/").status_code, 200)
+        # Completing twice does not count twice
+        self.as_client.post(f"/api/jobs/{self.jobs[0].id}/complete/")
+
+        rep = ArtisanReputation.objects.get(artisan=self.artisan)
+        self.assertEqual((rep.assigned_jobs, rep.completed_jobs, rep.completion_rate), (2, 1, 0.5))
+        self.assertEqual(self.reputation()["completed_jobs"], 1)
+        self.assertEqual(self.reconcile()["drifted"], 0)
+
+    def test_best_score_only_rises(self):
+        record_assessment_completed(self.artisan.id, 60)
+        record_assessment_completed(self.artisan.id, 40)
+        record_assessment_completed(self.artisan.id, None)
+        rep = ArtisanReputation.objects.get(artisan=self.artisan)
+        self.assertEqual((rep.assessments_completed, rep.best_score), (3, 60))
+
+    def test_updates_set_updated_at(self):
+        record_job_assigned(self.artisan)
+        long_ago = timezone.now() - datetime.timedelta(days=1)
+        ArtisanReputation.objects.update(updated_at=long_ago)
+        record_job_assigned(self.artisan)
+        self.assertGreater(ArtisanReputation.objects.get(artisan=self.artisan).updated_at, long_ago)
+
+    def test_rescored_assessment_can_lower_best_score(self):
+        first, second = [
+            Assessment.objects.create(artisan=self.artisan, trade_category="Welder", questions=[], status="completed", score=score)
+            for score in (80, 50)
+        ]
+        record_assessment_completed(self.artisan.id, 80)
+        record_assessment_completed(self.artisan.id, 50)
+
+        Assessment.objects.filter(id=first.id).update(score=30)
+        record_assessment_rescored(self.artisan.id, 80, 30)
+        self.assertEqual(ArtisanReputation.objects.get(artisan=self.artisan).best_score, 50)
+
+        Assessment.objects.filter(id=second.id).update(score=90)
+        record_assessment_rescored(self.artisan.id, 50, 90)
+        rep = ArtisanReputation.objects.get(artisan=self.artisan)
+        self.assertEqual((rep.assessments_completed, rep.best_score), (2, 90))
+
+    def test_reconcile_fixes_drift(self):
+        JobPosting.objects.filter(id=self.jobs[0].id).update(
+            status="completed", assigned_artisan=User.objects.get(username="tunde")
+        )
+        Assessment.objects.create(artisan=self.artisan, trade_category="Welder", questions=[], status="completed", score=70)
+        ArtisanReputation.objects.create(artisan=self.artisan, assigned_jobs=5, best_score=10)
+
+        report = self.reconcile()
+        self.assertEqual(report["drifted"], 1)
+        self.assertEqual(ArtisanReputation.objects.get(artisan=self.artisan).assigned_jobs, 5)
 
-# Create your tests here.
+        report = self.reconcile("--fix")
+        self.assertEqual(report["fields"], {
+            "assigned_jobs": 1, "completed_jobs": 1, "assessments_completed": 1, "best_score": 1,
+        })
+        rep = ArtisanReputation.objects.get(artisan=self.artisan)
+        self.assertEqual(
+            (rep.assigned_jobs, rep.completed_jobs, rep.assessments_completed, rep.best_score), (1, 1, 1, 70)
+        )
+        self.assertEqual(self.reconcile()["drifted"], 0)
@@ -0,0 +1,36 @@
+# Helpers linking authenticated requests to Artisan / Client profiles.
+#
+# Tokens issued by user_login carry the profile's email_address claim,
+# which is how the rest of the API finds the matching profile row.
+
+from .models import Artisan, Client
+
+
+def get_request_email(request):
+    """Return the email of the caller, from the JWT claims or the auth user."""
+    token = getattr(request, "auth", None)
+    if token is not None and hasattr(token, "get"):
+        email = token.get("email_address")
+        if email:
+            return email
+    return getattr(request.user, "email", None) or None
+
+
+def get_request_artisan(request):
+    email = get_request_email(request)
+    if not email:
+        return None
+    return Artisan.objects.filter(email_address=email).first()
+
+
+def artisan_for_user(user):
+    """Artisan profile for an auth user (jobs reference auth users)."""
+    if user is None or not getattr(user, "email", None):
+        return None
+    return Artisan.objects.filter(email_address=user.email).first()
+
+
+def client_for_user(user):
+    if user is None or not getattr(user, "email", None):
+        return None
+    return Client.objects.filter(email_address=user.email).first()
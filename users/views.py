@@ -10,8 +10,9 @@ from .models import Artisan, Client, TradeCategory
 from .serializers import ArtisanSerializer, ClientSerializer, TradeCategorySerializer
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.backends import TokenBackend
+from jobs.matching import refresh_candidate
+from craftconnect.cache import cached_view
+from craftconnect.ratelimit import rate_limit
 
 
 
@@ -23,16 +24,19 @@ from rest_framework_simplejwt.backends import TokenBackend
     responses={
         201: "Artisan registered successfully",
         400: "Validation error",
+        429: "Too many registrations from this address.",
         500: "Internal server error"
     }
 )
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@rate_limit(ip="20/h")
 def artisan_register(request):
     try:
         serializer = ArtisanSerializer(data=request.data)
         if serializer.is_valid():
             artisan = serializer.save()
+            refresh_candidate(artisan)
             return Response({
                 "message": "Artisan registered successfully",
                 "artisan_id": artisan.id,
@@ -54,11 +58,13 @@ def artisan_register(request):
     responses={
         201: "Client registered successfully",
         400: "Validation error",
+        429: "Too many registrations from this address.",
         500: "Internal server error"
     }
 )
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@rate_limit(ip="20/h")
 def client_register(request):
     try:
         serializer = ClientSerializer(data=request.data)
@@ -94,12 +100,14 @@ def client_register(request):
         400: "Missing or invalid credentials.",
         401: "Invalid password.",
         404: "User not found.",
+        429: "Too many login attempts.",
         500: "Internal server error."
     }
 )
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@rate_limit(ip="20/m")
 def user_login(request):
     try:
         email = request.data.get('email_address')
@@ -165,6 +173,11 @@ def user_login(request):
     
 
 
+def profile_tag(request):
+    user_type = (request.query_params.get('user_type') or '').lower()
+    return f"{'artisan' if user_type == 'artisan' else 'client'}:{request.query_params.get('user_id')}"
+
+
 #Get all user
 @swagger_auto_schema(
     method='get',
@@ -180,6 +193,7 @@ def user_login(request):
 )
 @api_view(['GET'])
 #@permission_classes([IsAuthenticated])
+@cached_view(ttl=300, tags=lambda request: [profile_tag(request)])
 def get_user_profile(request):
     try:
         user_type = request.query_params.get('user_type')
@@ -270,6 +284,8 @@ def update_user_profile(request):
         serializer = serializer_class(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            if serializer_class is ArtisanSerializer:
+                refresh_candidate(user)
             data = serializer.data
             data.pop('password', None)
             if user.profile_picture:
@@ -314,19 +330,11 @@ def update_user_profile(request):
 @permission_classes([IsAuthenticated])
 def get_logged_in_user(request):
     try:
-        # Get raw token from header
-        auth_header = request.headers.get("Authorization")
-
-        if not auth_header or "Bearer" not in auth_header:
+        # Claims of the token verified by the authentication class
+        if request.auth is None:
             return Response({"error": "Token missing"}, status=401)
 
-        raw_token = auth_header.split(" ")[1]
-
-        # Decode token manually
-        backend = TokenBackend(algorithm='HS256')
-        decoded = backend.decode(raw_token, verify=False)
-
-        email = decoded.get("email_address")
+        email = request.auth.get("email_address")
 
         if not email:
             return Response({"error": "Email missing in token"}, status=400)
@@ -410,6 +418,7 @@ def add_trade_category(request):
     }
 )
 @api_view(["GET"])
+@cached_view(ttl=3600, tags=lambda request: ["trade_categories"])
 def list_trade_categories(request):
     categories = TradeCategory.objects.all().order_by("name")
     serializer = TradeCategorySerializer(categories, many=True)